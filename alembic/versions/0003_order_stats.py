@@ -0,0 +1,84 @@
+"""order stats counters
+
+Revision ID: 0003_order_stats
+Revises: 0002_notification_outbox
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003_order_stats"
+down_revision = "0002_notification_outbox"
+branch_labels = None
+depends_on = None
+
+
+TRIGGERS = (
+    """
+    CREATE TRIGGER trg_orders_stats_insert AFTER INSERT ON orders
+    BEGIN
+        INSERT INTO order_stats (dimension, value, count)
+        VALUES ('total', '', 1), ('status', NEW.status, 1), ('source', NEW.source, 1)
+        ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER trg_orders_stats_delete AFTER DELETE ON orders
+    BEGIN
+        UPDATE order_stats SET count = count - 1
+        WHERE (dimension = 'total' AND value = '')
+            OR (dimension = 'status' AND value = OLD.status)
+            OR (dimension = 'source' AND value = OLD.source);
+    END
+    """,
+    """
+    CREATE TRIGGER trg_orders_stats_status AFTER UPDATE OF status ON orders
+    WHEN OLD.status IS NOT NEW.status
+    BEGIN
+        UPDATE order_stats SET count = count - 1 WHERE dimension = 'status' AND value = OLD.status;
+        INSERT INTO order_stats (dimension, value, count) VALUES ('status', NEW.status, 1)
+        ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER trg_orders_stats_source AFTER UPDATE OF source ON orders
+    WHEN OLD.source IS NOT NEW.source
+    BEGIN
+        UPDATE order_stats SET count = count - 1 WHERE dimension = 'source' AND value = OLD.source;
+        INSERT INTO order_stats (dimension, value, count) VALUES ('source', NEW.source, 1)
+        ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+    END
+    """,
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "order_stats",
+        sa.Column("dimension", sa.String(length=16), nullable=False),
+        sa.Column("value", sa.String(length=64), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("dimension", "value"),
+    )
+    op.execute(
+        """
+        INSERT INTO order_stats (dimension, value, count)
+        SELECT 'total', '', COUNT(*) FROM orders
+        UNION ALL
+        SELECT 'status', status, COUNT(*) FROM orders GROUP BY status
+        UNION ALL
+        SELECT 'source', source, COUNT(*) FROM orders GROUP BY source
+        """
+    )
+    for statement in TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for name in ("trg_orders_stats_source", "trg_orders_stats_status", "trg_orders_stats_delete", "trg_orders_stats_insert"):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table("order_stats")
@@ -0,0 +1,30 @@
+"""composite indexes for filtered order listings
+
+Revision ID: 0004_order_filter_indexes
+Revises: 0003_order_stats
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0004_order_filter_indexes"
+down_revision = "0003_order_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_orders_created_at_id", "orders", ["created_at", "id"], unique=False)
+    op.create_index("ix_orders_status_created_at", "orders", ["status", "created_at", "id"], unique=False)
+    op.create_index("ix_orders_source_created_at", "orders", ["source", "created_at", "id"], unique=False)
+    op.drop_index("ix_orders_created_at", table_name="orders")
+
+
+def downgrade() -> None:
+    op.create_index("ix_orders_created_at", "orders", ["created_at"], unique=False)
+    op.drop_index("ix_orders_source_created_at", table_name="orders")
+    op.drop_index("ix_orders_status_created_at", table_name="orders")
+    op.drop_index("ix_orders_created_at_id", table_name="orders")
@@ -0,0 +1,70 @@
+"""full-text search over orders
+
+Revision ID: 0005_orders_fts
+Revises: 0004_order_filter_indexes
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_orders_fts"
+down_revision = "0004_order_filter_indexes"
+branch_labels = None
+depends_on = None
+
+
+PHONE_DIGITS = "replace(replace(replace(replace(replace(replace({column}, ' ', ''), '-', ''), '(', ''), ')', ''), '+', ''), '.', '')"
+
+# Index rows share the rowid of their order, so the triggers find them without a scan.
+TRIGGERS = (
+    f"""
+    CREATE TRIGGER trg_orders_fts_insert AFTER INSERT ON orders
+    BEGIN
+        INSERT INTO orders_fts (rowid, name, telephone, phone_digits, email, subject, message)
+        VALUES (NEW.rowid, NEW.name, NEW.telephone, {PHONE_DIGITS.format(column="NEW.telephone")}, NEW.email, NEW.subject, NEW.message);
+    END
+    """,
+    """
+    CREATE TRIGGER trg_orders_fts_delete AFTER DELETE ON orders
+    BEGIN
+        DELETE FROM orders_fts WHERE rowid = OLD.rowid;
+    END
+    """,
+    f"""
+    CREATE TRIGGER trg_orders_fts_update
+    AFTER UPDATE OF name, telephone, email, subject, message ON orders
+    BEGIN
+        DELETE FROM orders_fts WHERE rowid = OLD.rowid;
+        INSERT INTO orders_fts (rowid, name, telephone, phone_digits, email, subject, message)
+        VALUES (NEW.rowid, NEW.name, NEW.telephone, {PHONE_DIGITS.format(column="NEW.telephone")}, NEW.email, NEW.subject, NEW.message);
+    END
+    """,
+)
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE orders_fts USING fts5(
+            name, telephone, phone_digits, email, subject, message,
+            tokenize = 'trigram'
+        )
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO orders_fts (rowid, name, telephone, phone_digits, email, subject, message)
+        SELECT rowid, name, telephone, {PHONE_DIGITS.format(column="telephone")}, email, subject, message FROM orders
+        """
+    )
+    for statement in TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for name in ("trg_orders_fts_update", "trg_orders_fts_delete", "trg_orders_fts_insert"):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.execute("DROP TABLE IF EXISTS orders_fts")
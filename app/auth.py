@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import hmac
+from http import HTTPStatus
+
+
+def check_bearer(authorization: str, token: str) -> HTTPStatus | None:
+    # Token-protected endpoints do not exist while their token is unset. Returns the status to
+    # answer with, or None when the Authorization header carries the right bearer token.
+    if not token:
+        return HTTPStatus.NOT_FOUND
+    scheme, _, value = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(value.strip(), token):
+        return HTTPStatus.UNAUTHORIZED
+    return None
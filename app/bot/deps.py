@@ -1,20 +1,32 @@
 from __future__ import annotations
 
+from typing import Any
+
 from aiogram.types import CallbackQuery, Message
 
 from app.services.users import UserService
 
 
 ALLOWED_ROLES = ("user", "admin", "developer")
+ADMIN_ROLES = ("admin", "developer")
+DEVELOPER_ROLES = ("developer",)
+DENIED_TEXT = "🚫 Недостаточно прав."
+
+
+def requires_role(*roles: str, denied_text: str = DENIED_TEXT) -> dict[str, Any]:
+    return {"roles": roles, "denied_text": denied_text}
 
 
 async def ensure_message_role(
     message: Message,
     user_service: UserService,
     allowed_roles: tuple[str, ...],
-    denied_text: str = "🚫 Недостаточно прав.",
+    denied_text: str = DENIED_TEXT,
+    *,
+    role: str | None = None,
 ) -> str | None:
-    role = await user_service.get_role(message.chat.id)
+    if role is None:
+        role = await user_service.get_role(message.chat.id)
     if role not in allowed_roles:
         await message.answer(denied_text)
         return None
@@ -25,7 +37,9 @@ async def ensure_callback_role(
     call: CallbackQuery,
     user_service: UserService,
     allowed_roles: tuple[str, ...],
-    denied_text: str = "🚫 Недостаточно прав.",
+    denied_text: str = DENIED_TEXT,
+    *,
+    role: str | None = None,
 ) -> str | None:
     if call.message is None:
         await call.answer("Сообщение недоступно", show_alert=True)
@@ -34,7 +48,8 @@ async def ensure_callback_role(
         await call.answer("Пользователь не определён", show_alert=True)
         return None
 
-    role = await user_service.get_role(call.from_user.id)
+    if role is None:
+        role = await user_service.get_role(call.from_user.id)
     if role not in allowed_roles:
         await call.answer(denied_text, show_alert=True)
         return None
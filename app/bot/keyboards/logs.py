@@ -11,3 +11,11 @@ def logs_kb(offset: int) -> InlineKeyboardMarkup:
         ]
     )
 
+
+def logs_search_kb(token: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text="🔎 Найти ещё", callback_data=f"logs_find:{token}")],
+            [InlineKeyboardButton(text="🏠 Меню", callback_data="main_menu")],
+        ]
+    )
@@ -2,12 +2,24 @@ from __future__ import annotations
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
-from app.db.models import Order
+from app.db.repositories import OrderPage, OrderSearchPage
 
 
-def orders_list_kb(items: list[Order]) -> InlineKeyboardMarkup:
-    rows: list[list[InlineKeyboardButton]] = []
-    for item in items[:10]:
+STATUS_FILTERS: dict[str, str] = {"": "Все", "new": "🆕 Новые", "in_progress": "🟡 В работе", "done": "🟢 Готово"}
+
+
+def orders_list_kb(page: OrderPage, status: str | None = None) -> InlineKeyboardMarkup:
+    current = status or ""
+    rows: list[list[InlineKeyboardButton]] = [
+        [
+            InlineKeyboardButton(
+                text=f"• {label}" if value == current else label,
+                callback_data=f"orders_page:older:{value}:",
+            )
+            for value, label in STATUS_FILTERS.items()
+        ]
+    ]
+    for item in page.items:
         rows.append(
             [
                 InlineKeyboardButton(
@@ -16,6 +28,29 @@ def orders_list_kb(items: list[Order]) -> InlineKeyboardMarkup:
                 )
             ]
         )
+    pager: list[InlineKeyboardButton] = []
+    if page.has_newer and page.items:
+        pager.append(InlineKeyboardButton(text="⬅️ Новее", callback_data=f"orders_page:newer:{current}:{page.items[0].id}"))
+    if page.has_older and page.items:
+        pager.append(InlineKeyboardButton(text="Старее ➡️", callback_data=f"orders_page:older:{current}:{page.items[-1].id}"))
+    if pager:
+        rows.append(pager)
+    rows.append([InlineKeyboardButton(text="🏠 Меню", callback_data="main_menu")])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+def search_results_kb(page: OrderSearchPage, page_size: int) -> InlineKeyboardMarkup:
+    rows: list[list[InlineKeyboardButton]] = [
+        [InlineKeyboardButton(text=f"{item.name} | {item.telephone}", callback_data=f"order:{item.id}")]
+        for item in page.items
+    ]
+    pager: list[InlineKeyboardButton] = []
+    if page.offset > 0:
+        pager.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"find:{max(page.offset - page_size, 0)}"))
+    if page.offset + len(page.items) < page.total:
+        pager.append(InlineKeyboardButton(text="Дальше ➡️", callback_data=f"find:{page.offset + page_size}"))
+    if pager:
+        rows.append(pager)
     rows.append([InlineKeyboardButton(text="🏠 Меню", callback_data="main_menu")])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import CallbackQuery, Message, TelegramObject, Update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bot.deps import DENIED_TEXT, ensure_callback_role, ensure_message_role
+from app.db.session import shared_session
+from app.metrics import BOT_UPDATE_DURATION, BOT_UPDATE_ERRORS
+from app.services.users import UserService
+
+
+Handler = Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]]
+
+
+def actor_id(update: Update) -> int | None:
+    if update.message is not None:
+        return update.message.chat.id
+    if update.callback_query is not None and update.callback_query.from_user is not None:
+        return update.callback_query.from_user.id
+    return None
+
+
+class RoleMiddleware(BaseMiddleware):
+    def __init__(self, user_service: UserService, session_factory: Callable[[], AsyncSession]) -> None:
+        self.user_service = user_service
+        self.session_factory = session_factory
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: dict[str, Any]) -> Any:
+        async with shared_session(self.session_factory):
+            telegram_id = actor_id(event) if isinstance(event, Update) else None
+            data["role"] = "guest" if telegram_id is None else await self.user_service.get_role(telegram_id)
+            return await handler(event, data)
+
+
+class RoleGuard(BaseMiddleware):
+    async def __call__(self, handler: Handler, event: TelegramObject, data: dict[str, Any]) -> Any:
+        allowed_roles = get_flag(data, "roles")
+        if allowed_roles is None:
+            return await handler(event, data)
+
+        denied_text = get_flag(data, "denied_text", default=DENIED_TEXT)
+        user_service: UserService = data["user_service"]
+        if isinstance(event, CallbackQuery):
+            role = await ensure_callback_role(event, user_service, allowed_roles, denied_text, role=data.get("role"))
+        elif isinstance(event, Message):
+            role = await ensure_message_role(event, user_service, allowed_roles, denied_text, role=data.get("role"))
+        else:
+            role = None
+        if role is None:
+            return None
+        data["role"] = role
+        return await handler(event, data)
+
+
+class MetricsMiddleware(BaseMiddleware):
+    # Registered as an inner middleware, so the matched handler is already known.
+    async def __call__(self, handler: Handler, event: TelegramObject, data: dict[str, Any]) -> Any:
+        handler_object = data.get("handler")
+        callback = getattr(handler_object, "callback", None)
+        labels = {
+            "event": getattr(data.get("event_update"), "event_type", None) or type(event).__name__.lower(),
+            "handler": getattr(callback, "__name__", "unknown"),
+        }
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            BOT_UPDATE_ERRORS.inc(**labels)
+            raise
+        finally:
+            BOT_UPDATE_DURATION.observe(time.perf_counter() - started, **labels)
@@ -3,16 +3,20 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+import secrets
 import sys
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
 
 from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.types import CallbackQuery, Message
 
-from app.bot.deps import ensure_callback_role, ensure_message_role
-from app.bot.keyboards.logs import logs_kb
+from app.bot.deps import DEVELOPER_ROLES, requires_role
+from app.bot.keyboards.logs import logs_kb, logs_search_kb
 from app.container import settings
+from app.services.logs import LogCursor, LogFilter, LogLineIndex, parse_log_filter, read_log_page, scan_log
 from app.services.users import UserService
 
 
@@ -20,7 +24,24 @@ logger = logging.getLogger(__name__)
 router = Router(name="admin")
 
 LOGS_PAGE_SIZE = 30
-LOGS_READ_CHUNK_SIZE = 4096
+LOGS_SEARCH_PAGE_SIZE = 10
+LOGS_SEARCHES_LIMIT = 64
+LOGS_USAGE = (
+    "Использование: /logs [level=error] [logger=app.bot] [since=2h|2024-05-01T12:00] "
+    "[until=...] [re=регулярное_выражение] [текст]"
+)
+# One line index per log file, kept for the lifetime of the process.
+_log_indexes: dict[Path, LogLineIndex] = {}
+
+
+@dataclass(slots=True)
+class LogSearch:
+    log_filter: LogFilter
+    cursor: LogCursor | None = None
+
+
+# Filters do not fit into 64 bytes of callback data, so "Найти ещё" refers to them by token.
+_log_searches: OrderedDict[str, LogSearch] = OrderedDict()
 
 
 def _command_args(message: Message) -> list[str]:
@@ -44,28 +65,10 @@ def _parse_logs_offset(data: str | None) -> int | None:
 
 
 def _read_log_page(path: Path, offset: int, page_size: int = LOGS_PAGE_SIZE) -> list[str]:
-    if offset < 0:
-        raise ValueError("offset must be non-negative")
-
-    required_lines = offset + page_size
-    chunks: list[bytes] = []
-
-    with path.open("rb") as file_obj:
-        file_obj.seek(0, os.SEEK_END)
-        position = file_obj.tell()
-        newline_count = 0
-
-        while position > 0 and newline_count <= required_lines:
-            read_size = min(LOGS_READ_CHUNK_SIZE, position)
-            position -= read_size
-            file_obj.seek(position)
-            chunk = file_obj.read(read_size)
-            chunks.append(chunk)
-            newline_count += chunk.count(b"\n")
-
-    content = b"".join(reversed(chunks)).decode("utf-8", errors="ignore")
-    lines = content.splitlines(keepends=True)
-    return lines[-required_lines : -offset if offset else None]
+    index = _log_indexes.get(path)
+    if index is None:
+        index = _log_indexes.setdefault(path, LogLineIndex(path))
+    return read_log_page(index, offset, page_size)
 
 
 async def _send_logs(bot_message: Message, offset: int) -> None:
@@ -83,12 +86,38 @@ async def _send_logs(bot_message: Message, offset: int) -> None:
     await bot_message.answer(text[-4000:], reply_markup=logs_kb(offset + LOGS_PAGE_SIZE))
 
 
-@router.message(Command("grant"))
-async def cmd_grant(message: Message, user_service: UserService) -> None:
-    role = await ensure_message_role(message, user_service, ("developer",), denied_text="Нет доступа.")
-    if role is None:
+def _remember_search(search: LogSearch) -> str:
+    token = secrets.token_urlsafe(6)
+    _log_searches[token] = search
+    while len(_log_searches) > LOGS_SEARCHES_LIMIT:
+        _log_searches.popitem(last=False)
+    return token
+
+
+async def _send_log_search(bot_message: Message, token: str, search: LogSearch) -> None:
+    path = Path(settings.bot_log_path)
+    if not path.exists():
+        await bot_message.answer("📜 Лог-файл не найден.")
         return
 
+    records, search.cursor = await asyncio.to_thread(
+        scan_log, path, search.log_filter, limit=LOGS_SEARCH_PAGE_SIZE, cursor=search.cursor
+    )
+    if not records:
+        _log_searches.pop(token, None)
+        await bot_message.answer("📜 Подходящих записей больше нет.")
+        return
+
+    text = "Найденные записи:\n\n" + "\n".join(records)
+    if search.cursor is None:
+        _log_searches.pop(token, None)
+        await bot_message.answer(text[-4000:])
+        return
+    await bot_message.answer(text[-4000:], reply_markup=logs_search_kb(token))
+
+
+@router.message(Command("grant"), flags=requires_role(*DEVELOPER_ROLES, denied_text="Нет доступа."))
+async def cmd_grant(message: Message, user_service: UserService) -> None:
     args = _command_args(message)
     if len(args) != 2:
         await message.answer("Использование: /grant <user_id> <role>")
@@ -108,12 +137,8 @@ async def cmd_grant(message: Message, user_service: UserService) -> None:
     await message.answer(f"✅ Пользователю {uid} выдана роль {target_role}")
 
 
-@router.message(Command("revoke"))
+@router.message(Command("revoke"), flags=requires_role(*DEVELOPER_ROLES, denied_text="Нет доступа."))
 async def cmd_revoke(message: Message, user_service: UserService) -> None:
-    role = await ensure_message_role(message, user_service, ("developer",), denied_text="Нет доступа.")
-    if role is None:
-        return
-
     args = _command_args(message)
     if len(args) != 1 or not args[0].lstrip("-").isdigit():
         await message.answer("Использование: /revoke <user_id>")
@@ -124,37 +149,39 @@ async def cmd_revoke(message: Message, user_service: UserService) -> None:
     await message.answer("✅ Роль удалена." if removed else "Пользователь не найден.")
 
 
-@router.message(Command("restart"))
-async def cmd_restart(message: Message, user_service: UserService) -> None:
-    role = await ensure_message_role(message, user_service, ("developer",))
-    if role is None:
-        return
-
+@router.message(Command("restart"), flags=requires_role(*DEVELOPER_ROLES))
+async def cmd_restart(message: Message) -> None:
     await message.answer("♻️ Перезапуск бота...")
     os.execl(sys.executable, sys.executable, *sys.argv)
 
 
-@router.message(Command("logs"))
-async def cmd_logs(message: Message, user_service: UserService) -> None:
-    role = await ensure_message_role(message, user_service, ("developer",))
-    if role is None:
+@router.message(Command("logs"), flags=requires_role(*DEVELOPER_ROLES))
+async def cmd_logs(message: Message) -> None:
+    args = _command_args(message)
+    if not args:
+        await _send_logs(message, 0)
         return
-    await _send_logs(message, 0)
 
+    try:
+        log_filter = parse_log_filter(args)
+    except ValueError as exc:
+        await message.answer(f"{exc}\n{LOGS_USAGE}")
+        return
+    search = LogSearch(log_filter)
+    await _send_log_search(message, _remember_search(search), search)
 
-@router.callback_query(F.data == "logs_open")
-async def cb_logs_open(call: CallbackQuery, user_service: UserService) -> None:
-    role = await ensure_callback_role(call, user_service, ("developer",))
-    if role is None or call.message is None:
+
+@router.callback_query(F.data == "logs_open", flags=requires_role(*DEVELOPER_ROLES))
+async def cb_logs_open(call: CallbackQuery) -> None:
+    if call.message is None:
         return
     await call.answer()
     await _send_logs(call.message, 0)
 
 
-@router.callback_query(F.data.startswith("logs_more:"))
-async def cb_logs_more(call: CallbackQuery, user_service: UserService) -> None:
-    role = await ensure_callback_role(call, user_service, ("developer",))
-    if role is None or call.message is None:
+@router.callback_query(F.data.startswith("logs_more:"), flags=requires_role(*DEVELOPER_ROLES))
+async def cb_logs_more(call: CallbackQuery) -> None:
+    if call.message is None:
         return
 
     offset = _parse_logs_offset(call.data)
@@ -168,3 +195,22 @@ async def cb_logs_more(call: CallbackQuery, user_service: UserService) -> None:
     except OSError:
         logger.exception("Failed to read bot logs")
         await call.message.answer("Не удалось прочитать лог-файл.")
+
+
+@router.callback_query(F.data.startswith("logs_find:"), flags=requires_role(*DEVELOPER_ROLES))
+async def cb_logs_find(call: CallbackQuery) -> None:
+    if call.message is None:
+        return
+
+    token = (call.data or "").split(":", maxsplit=1)[-1]
+    search = _log_searches.get(token)
+    if search is None:
+        await call.answer("Поиск устарел, повторите команду /logs", show_alert=True)
+        return
+
+    await call.answer()
+    try:
+        await _send_log_search(call.message, token, search)
+    except OSError:
+        logger.exception("Failed to search bot logs")
+        await call.message.answer("Не удалось прочитать лог-файл.")
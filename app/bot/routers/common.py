@@ -7,9 +7,8 @@ from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
 from aiogram.types import CallbackQuery, Message
 
-from app.bot.deps import ALLOWED_ROLES, ensure_callback_role, ensure_message_role
+from app.bot.deps import ADMIN_ROLES, ALLOWED_ROLES, requires_role
 from app.bot.keyboards.main import main_menu_kb
-from app.services.users import UserService
 
 
 logger = logging.getLogger(__name__)
@@ -29,26 +28,18 @@ def _command_args(message: Message) -> str:
     return parts[1].strip()
 
 
-@router.message(Command("start"))
-async def cmd_start(message: Message, user_service: UserService) -> None:
-    role = await ensure_message_role(message, user_service, ALLOWED_ROLES)
-    if role is None:
-        return
+@router.message(Command("start"), flags=requires_role(*ALLOWED_ROLES))
+async def cmd_start(message: Message, role: str) -> None:
     await message.answer(_menu_text(role), reply_markup=main_menu_kb(role))
 
 
 @router.message(Command("id"))
-async def cmd_id(message: Message, user_service: UserService) -> None:
-    role = await user_service.get_role(message.chat.id)
+async def cmd_id(message: Message, role: str) -> None:
     await message.answer(f"Ваш chat_id: {message.chat.id}\nВаша роль: {role}")
 
 
-@router.message(Command("getid"))
-async def cmd_getid(message: Message, user_service: UserService) -> None:
-    role = await ensure_message_role(message, user_service, ("admin", "developer"), denied_text="Нет доступа.")
-    if role is None:
-        return
-
+@router.message(Command("getid"), flags=requires_role(*ADMIN_ROLES, denied_text="Нет доступа."))
+async def cmd_getid(message: Message) -> None:
     raw = _command_args(message)
     if not raw:
         await message.answer("Использование: /getid @username")
@@ -63,10 +54,9 @@ async def cmd_getid(message: Message, user_service: UserService) -> None:
         await message.answer(f"Не удалось найти @{username}. Проверьте username и попробуйте снова.")
 
 
-@router.callback_query(F.data == "main_menu")
-async def cb_main_menu(call: CallbackQuery, user_service: UserService) -> None:
-    role = await ensure_callback_role(call, user_service, ALLOWED_ROLES)
-    if role is None or call.message is None:
+@router.callback_query(F.data == "main_menu", flags=requires_role(*ALLOWED_ROLES))
+async def cb_main_menu(call: CallbackQuery, role: str) -> None:
+    if call.message is None:
         return
     await call.answer()
     try:
@@ -1,20 +1,29 @@
 from __future__ import annotations
 
+import tempfile
+from pathlib import Path
+
 from aiogram import F, Router
 from aiogram.exceptions import TelegramBadRequest
-from aiogram.types import CallbackQuery
+from aiogram.filters import Command
+from aiogram.types import CallbackQuery, FSInputFile, Message
 
-from app.bot.deps import ALLOWED_ROLES, ensure_callback_role
-from app.bot.keyboards.orders import order_details_kb, orders_list_kb
+from app.bot.deps import ADMIN_ROLES, ALLOWED_ROLES, requires_role
+from app.bot.keyboards.orders import order_details_kb, orders_list_kb, search_results_kb
 from app.db.models import Order
+from app.db.repositories import MIN_SEARCH_TERM_LENGTH, OrderFilter, OrderSearchPage, OrderStats
+from app.schemas.order import OrderView
+from app.services.export import EXPORT_CHUNK_SIZE, available_formats, export_filename, write_export
 from app.services.orders import OrderService
-from app.services.users import UserService
 
 
 router = Router(name="orders")
 
+ORDERS_PAGE_SIZE = 10
+SEARCH_HEADER = "🔎 Поиск: "
+
 
-def _format_order(order: Order) -> str:
+def _format_order(order: Order | OrderView) -> str:
     return (
         f"🆔 ID: {order.id}\n"
         f"👤 Имя: {order.name}\n"
@@ -27,30 +36,127 @@ def _format_order(order: Order) -> str:
     )
 
 
-async def _render_orders_list(call: CallbackQuery, order_service: OrderService) -> None:
+def _format_stats(stats: OrderStats) -> str:
+    lines = [f"📊 Всего заказов: {stats.total}", "", "По статусам:"]
+    lines.extend(f"• {status}: {count}" for status, count in stats.by_status.items())
+    lines.extend(["", "По источникам:"])
+    lines.extend(f"• {source}: {count}" for source, count in stats.by_source.items())
+    return "\n".join(lines)
+
+
+def _search_text(page: OrderSearchPage) -> str:
+    # The query is kept in the first line so pagination callbacks can recover it from the message.
+    if not page.total:
+        return f"{SEARCH_HEADER}{page.query}\nНичего не найдено."
+    last = page.offset + len(page.items)
+    return f"{SEARCH_HEADER}{page.query}\nНайдено заказов: {page.total} (показаны {page.offset + 1}–{last})"
+
+
+async def _render_orders_list(
+    call: CallbackQuery,
+    order_service: OrderService,
+    *,
+    anchor_id: str | None = None,
+    direction: str = "older",
+    status: str | None = None,
+) -> None:
     if call.message is None:
         return
-    all_orders = await order_service.list_orders()
-    latest_orders = list(reversed(all_orders))[:10]
-    await call.message.edit_text(
-        f"Найдено заказов: {len(all_orders)}",
-        reply_markup=orders_list_kb(latest_orders),
+    filters = OrderFilter(status=status or None)
+    page = await order_service.list_orders_page(
+        anchor_id=anchor_id,
+        direction="newer" if direction == "newer" else "older",
+        limit=ORDERS_PAGE_SIZE,
+        filters=filters,
     )
+    if not page.items and anchor_id is not None:
+        page = await order_service.list_orders_page(limit=ORDERS_PAGE_SIZE, filters=filters)
+    try:
+        await call.message.edit_text(
+            f"Найдено заказов: {page.total}",
+            reply_markup=orders_list_kb(page, filters.status),
+        )
+    except TelegramBadRequest as exc:
+        if "message is not modified" not in str(exc).lower():
+            raise
+
+
+@router.message(Command("stats"), flags=requires_role(*ADMIN_ROLES))
+async def cmd_stats(message: Message, order_service: OrderService) -> None:
+    stats = await order_service.get_stats()
+    await message.answer(_format_stats(stats))
+
+
+@router.message(Command("export"), flags=requires_role(*ADMIN_ROLES))
+async def cmd_export(message: Message, order_service: OrderService) -> None:
+    parts = (message.text or "").split(maxsplit=1)
+    fmt = parts[1].strip().lower() if len(parts) > 1 else "csv"
+    formats = available_formats()
+    if fmt not in formats:
+        await message.answer(f"Использование: /export [{'|'.join(formats)}]")
+        return
 
+    # The export is written to disk chunk by chunk and uploaded from there,
+    # so it is never held in memory as a whole.
+    with tempfile.NamedTemporaryFile(suffix=f".{fmt}", delete=False) as tmp:
+        path = Path(tmp.name)
+    try:
+        count = await write_export(path, order_service.iter_orders(chunk_size=EXPORT_CHUNK_SIZE), fmt)
+        await message.answer_document(
+            FSInputFile(path, filename=export_filename(fmt)),
+            caption=f"Выгружено заказов: {count}",
+        )
+    finally:
+        path.unlink(missing_ok=True)
+
+
+@router.message(Command("find"), flags=requires_role(*ALLOWED_ROLES))
+async def cmd_find(message: Message, order_service: OrderService) -> None:
+    parts = (message.text or "").split(maxsplit=1)
+    query = parts[1].strip() if len(parts) > 1 else ""
+    if len(query) < MIN_SEARCH_TERM_LENGTH:
+        await message.answer(f"Использование: /find <телефон, имя или текст> (от {MIN_SEARCH_TERM_LENGTH} символов)")
+        return
+    page = await order_service.search(query, limit=ORDERS_PAGE_SIZE)
+    await message.answer(_search_text(page), reply_markup=search_results_kb(page, ORDERS_PAGE_SIZE))
 
-@router.callback_query(F.data == "view_orders")
-async def cb_view_orders(call: CallbackQuery, user_service: UserService, order_service: OrderService) -> None:
-    role = await ensure_callback_role(call, user_service, ALLOWED_ROLES)
-    if role is None:
+
+@router.callback_query(F.data.startswith("find:"), flags=requires_role(*ALLOWED_ROLES))
+async def cb_find_page(call: CallbackQuery, order_service: OrderService) -> None:
+    if call.message is None:
         return
+    header = (call.message.text or "").split("\n", 1)[0]
+    offset_raw = (call.data or "").split(":", 1)[1]
+    if not header.startswith(SEARCH_HEADER) or not offset_raw.isdigit():
+        await call.answer("Поиск устарел, повторите /find", show_alert=True)
+        return
+    await call.answer()
+    page = await order_service.search(header.removeprefix(SEARCH_HEADER), limit=ORDERS_PAGE_SIZE, offset=int(offset_raw))
+    await call.message.edit_text(_search_text(page), reply_markup=search_results_kb(page, ORDERS_PAGE_SIZE))
+
+
+@router.callback_query(F.data == "view_orders", flags=requires_role(*ALLOWED_ROLES))
+async def cb_view_orders(call: CallbackQuery, order_service: OrderService) -> None:
     await call.answer()
     await _render_orders_list(call, order_service)
 
 
-@router.callback_query(F.data.startswith("order:"))
-async def cb_order_details(call: CallbackQuery, user_service: UserService, order_service: OrderService) -> None:
-    role = await ensure_callback_role(call, user_service, ALLOWED_ROLES)
-    if role is None or call.message is None:
+@router.callback_query(F.data.startswith("orders_page:"), flags=requires_role(*ALLOWED_ROLES))
+async def cb_orders_page(call: CallbackQuery, order_service: OrderService) -> None:
+    _, direction, status, anchor_id = (call.data or "orders_page:::").split(":", 3)
+    await call.answer()
+    await _render_orders_list(
+        call,
+        order_service,
+        anchor_id=anchor_id or None,
+        direction=direction,
+        status=status or None,
+    )
+
+
+@router.callback_query(F.data.startswith("order:"), flags=requires_role(*ALLOWED_ROLES))
+async def cb_order_details(call: CallbackQuery, role: str, order_service: OrderService) -> None:
+    if call.message is None:
         return
 
     order_id = (call.data or "").split(":", 1)[1]
@@ -63,10 +169,9 @@ async def cb_order_details(call: CallbackQuery, user_service: UserService, order
     await call.message.edit_text(_format_order(order), reply_markup=order_details_kb(order_id, role))
 
 
-@router.callback_query(F.data.startswith("order_status:"))
-async def cb_order_status(call: CallbackQuery, user_service: UserService, order_service: OrderService) -> None:
-    role = await ensure_callback_role(call, user_service, ALLOWED_ROLES)
-    if role is None or call.message is None:
+@router.callback_query(F.data.startswith("order_status:"), flags=requires_role(*ALLOWED_ROLES))
+async def cb_order_status(call: CallbackQuery, role: str, order_service: OrderService) -> None:
+    if call.message is None:
         return
 
     _, order_id, status = (call.data or "").split(":", 2)
@@ -82,10 +187,9 @@ async def cb_order_status(call: CallbackQuery, user_service: UserService, order_
             raise
 
 
-@router.callback_query(F.data.startswith("order_del:"))
-async def cb_order_delete(call: CallbackQuery, user_service: UserService, order_service: OrderService) -> None:
-    role = await ensure_callback_role(call, user_service, ("admin", "developer"))
-    if role is None or call.message is None:
+@router.callback_query(F.data.startswith("order_del:"), flags=requires_role(*ADMIN_ROLES))
+async def cb_order_delete(call: CallbackQuery, order_service: OrderService) -> None:
+    if call.message is None:
         return
     order_id = (call.data or "").split(":", 1)[1]
     await call.answer("Удалено")
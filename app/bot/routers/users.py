@@ -6,7 +6,7 @@ from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.types import CallbackQuery, Message
 
-from app.bot.deps import ensure_callback_role, ensure_message_role
+from app.bot.deps import ADMIN_ROLES, DEVELOPER_ROLES, requires_role
 from app.bot.keyboards.users import users_menu_kb
 from app.services.notifications import NOTIFICATION_ROLES
 from app.services.users import ROLE_PRIORITY, UserService
@@ -132,7 +132,7 @@ def _developer_help_text() -> str:
             "",
             "/grant <user_id> <role>",
             "/revoke <user_id>",
-            "/logs",
+            "/logs [level=error] [logger=app.bot] [since=2h] [until=...] [re=...] [текст]",
             "/restart",
             "",
             "Для обычной работы удобнее использовать:",
@@ -141,33 +141,21 @@ def _developer_help_text() -> str:
     )
 
 
-@router.message(Command("users"))
-async def cmd_users(message: Message, user_service: UserService) -> None:
-    actor_role = await ensure_message_role(message, user_service, ("admin", "developer"))
-    if actor_role is None:
-        return
-
+@router.message(Command("users"), flags=requires_role(*ADMIN_ROLES))
+async def cmd_users(message: Message, user_service: UserService, role: str) -> None:
     groups = await user_service.users_by_role()
-    await message.answer(_users_text(groups), reply_markup=users_menu_kb(actor_role))
-
+    await message.answer(_users_text(groups), reply_markup=users_menu_kb(role))
 
-@router.message(Command("notify_list"))
-async def cmd_notify_list(message: Message, user_service: UserService) -> None:
-    actor_role = await ensure_message_role(message, user_service, ("admin", "developer"))
-    if actor_role is None:
-        return
 
+@router.message(Command("notify_list"), flags=requires_role(*ADMIN_ROLES))
+async def cmd_notify_list(message: Message, user_service: UserService, role: str) -> None:
     recipients = await _list_notification_recipients(user_service)
-    await message.answer(_notify_text(recipients), reply_markup=users_menu_kb(actor_role))
-
+    await message.answer(_notify_text(recipients), reply_markup=users_menu_kb(role))
 
-@router.message(Command("role_set"))
-@router.message(Command("user_add"))
-async def cmd_role_set(message: Message, user_service: UserService) -> None:
-    actor_role = await ensure_message_role(message, user_service, ("admin", "developer"))
-    if actor_role is None:
-        return
 
+@router.message(Command("role_set"), flags=requires_role(*ADMIN_ROLES))
+@router.message(Command("user_add"), flags=requires_role(*ADMIN_ROLES))
+async def cmd_role_set(message: Message, user_service: UserService, role: str) -> None:
     args = _command_args(message)
     if len(args) < 2:
         await message.answer("Использование: /role_set <@username|id> <role=user|admin|developer>")
@@ -182,7 +170,7 @@ async def cmd_role_set(message: Message, user_service: UserService) -> None:
     if target_role not in VALID_ROLES:
         await message.answer("Роль должна быть: user | admin | developer")
         return
-    if not _can_manage_role(actor_role, target_role):
+    if not _can_manage_role(role, target_role):
         await message.answer("Эту роль может назначать только developer")
         return
 
@@ -191,13 +179,9 @@ async def cmd_role_set(message: Message, user_service: UserService) -> None:
     await message.answer(f"✅ Пользователю {label} назначена роль {target_role}")
 
 
-@router.message(Command("role_del"))
-@router.message(Command("user_del"))
-async def cmd_role_del(message: Message, user_service: UserService) -> None:
-    actor_role = await ensure_message_role(message, user_service, ("admin", "developer"))
-    if actor_role is None:
-        return
-
+@router.message(Command("role_del"), flags=requires_role(*ADMIN_ROLES))
+@router.message(Command("user_del"), flags=requires_role(*ADMIN_ROLES))
+async def cmd_role_del(message: Message, user_service: UserService, role: str) -> None:
     args = _command_args(message)
     if not args:
         await message.answer("Использование: /role_del <@username|id>")
@@ -213,7 +197,7 @@ async def cmd_role_del(message: Message, user_service: UserService) -> None:
     if existing_role == "guest":
         await message.answer("Пользователь не найден в таблице ролей")
         return
-    if not _can_manage_role(actor_role, existing_role):
+    if not _can_manage_role(role, existing_role):
         await message.answer("Удалить developer может только developer")
         return
 
@@ -224,12 +208,8 @@ async def cmd_role_del(message: Message, user_service: UserService) -> None:
         await message.answer("Пользователь не найден в таблице ролей")
 
 
-@router.message(Command("notify_add"))
-async def cmd_notify_add(message: Message, user_service: UserService) -> None:
-    actor_role = await ensure_message_role(message, user_service, ("admin", "developer"))
-    if actor_role is None:
-        return
-
+@router.message(Command("notify_add"), flags=requires_role(*ADMIN_ROLES))
+async def cmd_notify_add(message: Message, user_service: UserService, role: str) -> None:
     args = _command_args(message)
     if not args:
         await message.answer("Использование: /notify_add <@username|id> [role=admin|developer]")
@@ -244,7 +224,7 @@ async def cmd_notify_add(message: Message, user_service: UserService) -> None:
     if target_role not in NOTIFICATION_ROLES:
         await message.answer("Для просмотра заявок доступны роли: admin | developer")
         return
-    if not _can_manage_role(actor_role, target_role):
+    if not _can_manage_role(role, target_role):
         await message.answer("Роль developer может назначать только developer")
         return
 
@@ -253,12 +233,8 @@ async def cmd_notify_add(message: Message, user_service: UserService) -> None:
     await message.answer(f"✅ {label} теперь получает новые заявки как {target_role}")
 
 
-@router.message(Command("notify_del"))
-async def cmd_notify_del(message: Message, user_service: UserService) -> None:
-    actor_role = await ensure_message_role(message, user_service, ("admin", "developer"))
-    if actor_role is None:
-        return
-
+@router.message(Command("notify_del"), flags=requires_role(*ADMIN_ROLES))
+async def cmd_notify_del(message: Message, user_service: UserService, role: str) -> None:
     args = _command_args(message)
     if not args:
         await message.answer("Использование: /notify_del <@username|id>")
@@ -274,7 +250,7 @@ async def cmd_notify_del(message: Message, user_service: UserService) -> None:
     if existing_role == "guest" or existing_role not in NOTIFICATION_ROLES:
         await message.answer("Пользователь не получает новые заявки")
         return
-    if not _can_manage_role(actor_role, existing_role):
+    if not _can_manage_role(role, existing_role):
         await message.answer("Удалить developer из получателей может только developer")
         return
 
@@ -285,57 +261,51 @@ async def cmd_notify_del(message: Message, user_service: UserService) -> None:
         await message.answer("Пользователь не получает новые заявки")
 
 
-@router.callback_query(F.data == "users_menu")
-async def cb_users_menu(call: CallbackQuery, user_service: UserService) -> None:
-    actor_role = await ensure_callback_role(call, user_service, ("admin", "developer"))
-    if actor_role is None or call.message is None:
+@router.callback_query(F.data == "users_menu", flags=requires_role(*ADMIN_ROLES))
+async def cb_users_menu(call: CallbackQuery, role: str) -> None:
+    if call.message is None:
         return
     await call.answer()
-    await call.message.answer("Управление доступом и получателями заявок:", reply_markup=users_menu_kb(actor_role))
+    await call.message.answer("Управление доступом и получателями заявок:", reply_markup=users_menu_kb(role))
 
 
-@router.callback_query(F.data == "users_list")
-async def cb_users_list(call: CallbackQuery, user_service: UserService) -> None:
-    actor_role = await ensure_callback_role(call, user_service, ("admin", "developer"))
-    if actor_role is None or call.message is None:
+@router.callback_query(F.data == "users_list", flags=requires_role(*ADMIN_ROLES))
+async def cb_users_list(call: CallbackQuery, user_service: UserService, role: str) -> None:
+    if call.message is None:
         return
     await call.answer()
     groups = await user_service.users_by_role()
-    await call.message.answer(_users_text(groups), reply_markup=users_menu_kb(actor_role))
+    await call.message.answer(_users_text(groups), reply_markup=users_menu_kb(role))
 
 
-@router.callback_query(F.data == "notify_list")
-async def cb_notify_list(call: CallbackQuery, user_service: UserService) -> None:
-    actor_role = await ensure_callback_role(call, user_service, ("admin", "developer"))
-    if actor_role is None or call.message is None:
+@router.callback_query(F.data == "notify_list", flags=requires_role(*ADMIN_ROLES))
+async def cb_notify_list(call: CallbackQuery, user_service: UserService, role: str) -> None:
+    if call.message is None:
         return
     await call.answer()
     recipients = await _list_notification_recipients(user_service)
-    await call.message.answer(_notify_text(recipients), reply_markup=users_menu_kb(actor_role))
+    await call.message.answer(_notify_text(recipients), reply_markup=users_menu_kb(role))
 
 
-@router.callback_query(F.data == "role_help")
-async def cb_role_help(call: CallbackQuery, user_service: UserService) -> None:
-    actor_role = await ensure_callback_role(call, user_service, ("admin", "developer"))
-    if actor_role is None or call.message is None:
+@router.callback_query(F.data == "role_help", flags=requires_role(*ADMIN_ROLES))
+async def cb_role_help(call: CallbackQuery, role: str) -> None:
+    if call.message is None:
         return
     await call.answer()
-    await call.message.answer(_role_help_text(actor_role), reply_markup=users_menu_kb(actor_role))
+    await call.message.answer(_role_help_text(role), reply_markup=users_menu_kb(role))
 
 
-@router.callback_query(F.data == "notify_help")
-async def cb_notify_help(call: CallbackQuery, user_service: UserService) -> None:
-    actor_role = await ensure_callback_role(call, user_service, ("admin", "developer"))
-    if actor_role is None or call.message is None:
+@router.callback_query(F.data == "notify_help", flags=requires_role(*ADMIN_ROLES))
+async def cb_notify_help(call: CallbackQuery, role: str) -> None:
+    if call.message is None:
         return
     await call.answer()
-    await call.message.answer(_notify_help_text(actor_role), reply_markup=users_menu_kb(actor_role))
+    await call.message.answer(_notify_help_text(role), reply_markup=users_menu_kb(role))
 
 
-@router.callback_query(F.data == "developer_help")
-async def cb_developer_help(call: CallbackQuery, user_service: UserService) -> None:
-    actor_role = await ensure_callback_role(call, user_service, ("developer",))
-    if actor_role is None or call.message is None:
+@router.callback_query(F.data == "developer_help", flags=requires_role(*DEVELOPER_ROLES))
+async def cb_developer_help(call: CallbackQuery, role: str) -> None:
+    if call.message is None:
         return
     await call.answer()
-    await call.message.answer(_developer_help_text(), reply_markup=users_menu_kb(actor_role))
+    await call.message.answer(_developer_help_text(), reply_markup=users_menu_kb(role))
@@ -2,15 +2,19 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from http import HTTPStatus
 
 from aiohttp import web
 from aiogram import Bot, Dispatcher
 from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
 
+from app.auth import check_bearer
+from app.bot.middlewares import MetricsMiddleware, RoleGuard, RoleMiddleware
 from app.bot.routers import admin, common, orders, users
 from app.container import order_service, settings, user_service
-from app.db.session import close_engine
+from app.db.session import ReadSessionFactory, close_engine
 from app.logging import configure_logging
+from app.metrics import CONTENT_TYPE, registry
 
 
 logger = logging.getLogger(__name__)
@@ -18,6 +22,14 @@ logger = logging.getLogger(__name__)
 
 def build_dispatcher() -> Dispatcher:
     dispatcher = Dispatcher()
+    # Only reads share the per-update session, and it comes from the read engine. Each write
+    # in a handler opens its own short writer session (write_scope), so an update that only
+    # reads never holds the single writer connection.
+    dispatcher.update.outer_middleware(RoleMiddleware(user_service, ReadSessionFactory))
+    dispatcher.message.middleware(MetricsMiddleware())
+    dispatcher.callback_query.middleware(MetricsMiddleware())
+    dispatcher.message.middleware(RoleGuard())
+    dispatcher.callback_query.middleware(RoleGuard())
     dispatcher.include_router(common.router)
     dispatcher.include_router(orders.router)
     dispatcher.include_router(users.router)
@@ -37,6 +49,15 @@ async def run_polling(bot: Bot, dispatcher: Dispatcher) -> None:
     await dispatcher.start_polling(bot)
 
 
+async def metrics_handler(request: web.Request) -> web.Response:
+    status = check_bearer(request.headers.get("Authorization", ""), settings.metrics_token)
+    if status == HTTPStatus.NOT_FOUND:
+        raise web.HTTPNotFound()
+    if status is not None:
+        raise web.HTTPUnauthorized()
+    return web.Response(body=registry.render().encode("utf-8"), headers={"Content-Type": CONTENT_TYPE})
+
+
 async def run_webhook(bot: Bot, dispatcher: Dispatcher) -> None:
     path = settings.bot_webhook_path
     if not path.startswith("/"):
@@ -52,6 +73,7 @@ async def run_webhook(bot: Bot, dispatcher: Dispatcher) -> None:
 
     app = web.Application()
     SimpleRequestHandler(dispatcher=dispatcher, bot=bot).register(app, path=path)
+    app.router.add_get("/metrics", metrics_handler)
     setup_application(app, dispatcher, bot=bot)
 
     runner = web.AppRunner(app)
@@ -76,7 +98,13 @@ async def run_bot() -> None:
     if not settings.bot_token:
         raise RuntimeError("BOT_TOKEN is required")
 
-    configure_logging(settings.bot_log_path)
+    configure_logging(
+        settings.bot_log_path,
+        max_bytes=settings.log_max_bytes,
+        backup_count=settings.log_backup_count,
+        rotate_interval=settings.log_rotate_interval_hours * 3600,
+        log_format=settings.log_format,
+    )
 
     bot = Bot(token=settings.bot_token)
     dispatcher = build_dispatcher()
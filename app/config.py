@@ -24,6 +24,23 @@ class Settings:
     templates_dir: Path
     static_dir: Path
     bot_log_path: Path
+    notification_workers: int
+    notification_max_attempts: int
+    users_stamp_path: Path
+    sqlite_journal_mode: str
+    sqlite_synchronous: str
+    sqlite_busy_timeout_ms: int
+    sqlite_mmap_size: int
+    sqlite_cache_size: int
+    sqlite_temp_store: str
+    sqlite_read_pool_size: int
+    sqlite_write_queue_timeout: float
+    export_token: str
+    log_format: str
+    log_max_bytes: int
+    log_backup_count: int
+    log_rotate_interval_hours: float
+    metrics_token: str
 
 
 @lru_cache(maxsize=1)
@@ -38,9 +55,34 @@ def get_settings() -> Settings:
     bot_webhook_path = os.getenv("BOT_WEBHOOK_PATH", "/webhook").strip() or "/webhook"
     bot_webhook_host = os.getenv("BOT_WEBHOOK_HOST", "0.0.0.0").strip()
     bot_webhook_port = int(os.getenv("BOT_WEBHOOK_PORT", "8081"))
+    notification_workers = int(os.getenv("NOTIFICATION_WORKERS", "2"))
+    notification_max_attempts = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "5"))
 
+    sqlite_journal_mode = os.getenv("SQLITE_JOURNAL_MODE", "WAL").strip().upper()
+    sqlite_synchronous = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").strip().upper()
+    sqlite_busy_timeout_ms = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    sqlite_mmap_size = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    sqlite_cache_size = int(os.getenv("SQLITE_CACHE_SIZE", "-64000"))
+    sqlite_temp_store = os.getenv("SQLITE_TEMP_STORE", "MEMORY").strip().upper()
+    sqlite_read_pool_size = max(1, int(os.getenv("SQLITE_READ_POOL_SIZE", "4")))
+    sqlite_write_queue_timeout = float(os.getenv("SQLITE_WRITE_QUEUE_TIMEOUT", "30"))
+    export_token = os.getenv("EXPORT_TOKEN", "").strip()
+    log_format = os.getenv("LOG_FORMAT", "text").strip().lower()
+    log_max_bytes = max(0, int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))))
+    log_backup_count = max(0, int(os.getenv("LOG_BACKUP_COUNT", "5")))
+    log_rotate_interval_hours = max(0.0, float(os.getenv("LOG_ROTATE_INTERVAL_HOURS", "0")))
+    metrics_token = os.getenv("METRICS_TOKEN", "").strip()
+
+    if sqlite_journal_mode not in {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}:
+        sqlite_journal_mode = "WAL"
+    if sqlite_synchronous not in {"OFF", "NORMAL", "FULL", "EXTRA"}:
+        sqlite_synchronous = "NORMAL"
+    if sqlite_temp_store not in {"DEFAULT", "FILE", "MEMORY"}:
+        sqlite_temp_store = "MEMORY"
     if bot_mode not in {"polling", "webhook"}:
         bot_mode = "polling"
+    if log_format not in {"text", "json"}:
+        log_format = "text"
 
     return Settings(
         bot_token=bot_token,
@@ -53,4 +95,21 @@ def get_settings() -> Settings:
         templates_dir=BASE_DIR / "templates",
         static_dir=BASE_DIR / "static",
         bot_log_path=BASE_DIR / "bot.log",
+        notification_workers=notification_workers,
+        notification_max_attempts=notification_max_attempts,
+        users_stamp_path=Path(os.getenv("USERS_STAMP_PATH", str(BASE_DIR / "users.stamp"))),
+        sqlite_journal_mode=sqlite_journal_mode,
+        sqlite_synchronous=sqlite_synchronous,
+        sqlite_busy_timeout_ms=sqlite_busy_timeout_ms,
+        sqlite_mmap_size=sqlite_mmap_size,
+        sqlite_cache_size=sqlite_cache_size,
+        sqlite_temp_store=sqlite_temp_store,
+        sqlite_read_pool_size=sqlite_read_pool_size,
+        sqlite_write_queue_timeout=sqlite_write_queue_timeout,
+        export_token=export_token,
+        log_format=log_format,
+        log_max_bytes=log_max_bytes,
+        log_backup_count=log_backup_count,
+        log_rotate_interval_hours=log_rotate_interval_hours,
+        metrics_token=metrics_token,
     )
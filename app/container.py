@@ -1,14 +1,33 @@
 from __future__ import annotations
 
 from app.config import get_settings
-from app.db.session import SessionFactory
+from app.db.session import ReadSessionFactory, SessionFactory
+from app.metrics import QUEUE_DEPTH
 from app.services.notifications import NotificationService
 from app.services.orders import OrderService
+from app.services.cache import VersionStamp
+from app.services.outbox import NotificationOutbox
 from app.services.users import UserService
+from app.web.assets import AssetManifest
+from app.web.images import ImageManifest
 
 
 settings = get_settings()
-order_service = OrderService(SessionFactory)
-user_service = UserService(SessionFactory)
+order_service = OrderService(SessionFactory, ReadSessionFactory)
+user_service = UserService(
+    SessionFactory,
+    ReadSessionFactory,
+    version_stamp=VersionStamp(settings.users_stamp_path),
+)
 notification_service = NotificationService(settings=settings, user_service=user_service)
+notification_outbox = NotificationOutbox(
+    SessionFactory,
+    notification_service,
+    read_session_factory=ReadSessionFactory,
+    workers=settings.notification_workers,
+    max_attempts=settings.notification_max_attempts,
+)
+QUEUE_DEPTH.track(lambda: notification_outbox.queue_depth, queue="notification_outbox")
+asset_manifest = AssetManifest(settings.static_dir)
+image_manifest = ImageManifest(settings.static_dir)
 
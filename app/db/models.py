@@ -2,8 +2,10 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
+from typing import Any
 
-from sqlalchemy import DateTime, Enum as SAEnum, Index, String, Text, func
+from sqlalchemy import DateTime, Enum as SAEnum, Index, Integer, String, Text, event, func, text
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -38,7 +40,12 @@ class Order(Base):
         onupdate=func.now(),
     )
 
-    __table_args__ = (Index("ix_orders_created_at", "created_at"),)
+    __table_args__ = (
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_status_created_at", "status", "created_at", "id"),
+        Index("ix_orders_source_created_at", "source", "created_at", "id"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
 
 class User(Base):
@@ -62,3 +69,176 @@ class User(Base):
         onupdate=func.now(),
     )
 
+    __mapper_args__ = {"eager_defaults": True}
+
+
+class OutboxEntry(Base):
+    __tablename__ = "notification_outbox"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    order_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pending_recipients: Mapped[str | None] = mapped_column(Text, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False),
+        nullable=False,
+        server_default=func.now(),
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False),
+        nullable=False,
+        server_default=func.now(),
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),)
+
+
+class OrderStat(Base):
+    __tablename__ = "order_stats"
+
+    dimension: Mapped[str] = mapped_column(String(16), primary_key=True)
+    value: Mapped[str] = mapped_column(String(64), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# order_stats is maintained by triggers so every writer (repositories, bulk imports,
+# manual SQL) keeps the counters in the same transaction as the row change.
+ORDER_STATS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_orders_stats_insert AFTER INSERT ON orders
+    BEGIN
+        INSERT INTO order_stats (dimension, value, count)
+        VALUES ('total', '', 1), ('status', NEW.status, 1), ('source', NEW.source, 1)
+        ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_orders_stats_delete AFTER DELETE ON orders
+    BEGIN
+        UPDATE order_stats SET count = count - 1
+        WHERE (dimension = 'total' AND value = '')
+            OR (dimension = 'status' AND value = OLD.status)
+            OR (dimension = 'source' AND value = OLD.source);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_orders_stats_status AFTER UPDATE OF status ON orders
+    WHEN OLD.status IS NOT NEW.status
+    BEGIN
+        UPDATE order_stats SET count = count - 1 WHERE dimension = 'status' AND value = OLD.status;
+        INSERT INTO order_stats (dimension, value, count) VALUES ('status', NEW.status, 1)
+        ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_orders_stats_source AFTER UPDATE OF source ON orders
+    WHEN OLD.source IS NOT NEW.source
+    BEGIN
+        UPDATE order_stats SET count = count - 1 WHERE dimension = 'source' AND value = OLD.source;
+        INSERT INTO order_stats (dimension, value, count) VALUES ('source', NEW.source, 1)
+        ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+    END
+    """,
+)
+
+ORDER_STATS_BACKFILL = """
+    INSERT INTO order_stats (dimension, value, count)
+    SELECT 'total', '', COUNT(*) FROM orders
+    UNION ALL
+    SELECT 'status', status, COUNT(*) FROM orders GROUP BY status
+    UNION ALL
+    SELECT 'source', source, COUNT(*) FROM orders GROUP BY source
+"""
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_order_stats_triggers(target: Any, connection: Connection, **kw: Any) -> None:
+    # Only when create_all() has just created order_stats, e.g. on a database predating it.
+    if connection.dialect.name != "sqlite" or OrderStat.__table__ not in kw.get("tables", ()):
+        return
+    connection.execute(text(ORDER_STATS_BACKFILL))
+    for statement in ORDER_STATS_TRIGGERS:
+        connection.execute(text(statement))
+
+
+def _phone_digits(column: str) -> str:
+    expression = column
+    for char in (" ", "-", "(", ")", "+", "."):
+        expression = f"replace({expression}, '{char}', '')"
+    return expression
+
+
+# orders_fts mirrors the searchable order columns. The trigram tokenizer allows substring
+# matches (phone fragments, parts of names) and folds case for Cyrillic as well.
+# FTS rows share the rowid of their order, so triggers update and delete them by rowid
+# instead of scanning the whole index. VACUUM may renumber orders.rowid (the table has a
+# text primary key), so call rebuild_order_search after vacuuming the database.
+ORDER_SEARCH_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS orders_fts USING fts5(
+        name, telephone, phone_digits, email, subject, message,
+        tokenize = 'trigram'
+    )
+"""
+
+ORDER_SEARCH_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_orders_fts_insert AFTER INSERT ON orders
+    BEGIN
+        INSERT INTO orders_fts (rowid, name, telephone, phone_digits, email, subject, message)
+        VALUES (NEW.rowid, NEW.name, NEW.telephone, {_phone_digits("NEW.telephone")}, NEW.email, NEW.subject, NEW.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_orders_fts_delete AFTER DELETE ON orders
+    BEGIN
+        DELETE FROM orders_fts WHERE rowid = OLD.rowid;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_orders_fts_update
+    AFTER UPDATE OF name, telephone, email, subject, message ON orders
+    BEGIN
+        DELETE FROM orders_fts WHERE rowid = OLD.rowid;
+        INSERT INTO orders_fts (rowid, name, telephone, phone_digits, email, subject, message)
+        VALUES (NEW.rowid, NEW.name, NEW.telephone, {_phone_digits("NEW.telephone")}, NEW.email, NEW.subject, NEW.message);
+    END
+    """,
+)
+ORDER_SEARCH_TRIGGER_NAMES = ("trg_orders_fts_update", "trg_orders_fts_delete", "trg_orders_fts_insert")
+
+ORDER_SEARCH_BACKFILL = f"""
+    INSERT INTO orders_fts (rowid, name, telephone, phone_digits, email, subject, message)
+    SELECT rowid, name, telephone, {_phone_digits("telephone")}, email, subject, message FROM orders
+"""
+
+
+def drop_order_search(connection: Connection) -> None:
+    for name in ORDER_SEARCH_TRIGGER_NAMES:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    connection.execute(text("DROP TABLE IF EXISTS orders_fts"))
+
+
+def rebuild_order_search(connection: Connection) -> None:
+    drop_order_search(connection)
+    connection.execute(text(ORDER_SEARCH_TABLE))
+    connection.execute(text(ORDER_SEARCH_BACKFILL))
+    for statement in ORDER_SEARCH_TRIGGERS:
+        connection.execute(text(statement))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_order_search(target: Any, connection: Connection, **kw: Any) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    exists = connection.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'orders_fts'")).first()
+    if exists is not None:
+        return
+    rebuild_order_search(connection)
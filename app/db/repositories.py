@@ -1,11 +1,121 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+import re
+from collections.abc import AsyncIterator, Collection, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Literal
 
-from sqlalchemy import delete, select
+from sqlalchemy import ColumnElement, Select, case, delete, func, insert, select, text, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Order, User, UserRole
+from app.db.models import (
+    ORDER_SEARCH_BACKFILL,
+    ORDER_SEARCH_TRIGGERS,
+    ORDER_STATS_BACKFILL,
+    ORDER_STATS_TRIGGERS,
+    Order,
+    OrderStat,
+    OutboxEntry,
+    User,
+    UserRole,
+)
+from app.schemas.order import OrderView
+from app.schemas.user import UserView
+
+
+# Column-only reads skip the identity map and attribute instrumentation: rows map
+# positionally onto the slotted view dataclasses, so keep these in field order.
+ORDER_VIEW_COLUMNS = (
+    Order.id,
+    Order.name,
+    Order.telephone,
+    Order.email,
+    Order.subject,
+    Order.message,
+    Order.status,
+    Order.source,
+    Order.created_at,
+    Order.updated_at,
+)
+USER_VIEW_COLUMNS = (User.telegram_id, User.role, User.created_at, User.updated_at)
+
+# Per-row insert triggers that a bulk import replaces with one set-based rebuild.
+BULK_INSERT_TRIGGERS = {
+    "trg_orders_stats_insert": ORDER_STATS_TRIGGERS[0],
+    "trg_orders_fts_insert": ORDER_SEARCH_TRIGGERS[0],
+}
+
+
+@dataclass(frozen=True, slots=True)
+class OrderSummary:
+    id: str
+    name: str
+    telephone: str
+    created_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class OrderFilter:
+    status: str | None = None
+    source: str | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+
+    def clauses(self) -> list[ColumnElement[bool]]:
+        clauses: list[ColumnElement[bool]] = []
+        if self.status is not None:
+            clauses.append(Order.status == self.status)
+        if self.source is not None:
+            clauses.append(Order.source == self.source)
+        if self.since is not None:
+            clauses.append(Order.created_at >= self.since)
+        if self.until is not None:
+            clauses.append(Order.created_at < self.until)
+        return clauses
+
+
+@dataclass(frozen=True, slots=True)
+class OrderPage:
+    items: list[OrderSummary]
+    total: int
+    has_newer: bool
+    has_older: bool
+
+
+@dataclass(frozen=True, slots=True)
+class OrderSearchPage:
+    query: str
+    items: list[OrderSummary]
+    total: int
+    offset: int
+
+
+# The trigram tokenizer cannot match anything shorter than three characters.
+MIN_SEARCH_TERM_LENGTH = 3
+# "sending" entries are due again when their lease (next_attempt_at) has expired.
+OUTBOX_DUE_STATUSES = ("pending", "sending")
+
+
+def build_match_query(query: str) -> str | None:
+    terms: list[str] = []
+    for word in query.split():
+        if len(word) < MIN_SEARCH_TERM_LENGTH:
+            continue
+        phrase = '"' + word.replace('"', '""') + '"'
+        digits = re.sub(r"\D", "", word)
+        if len(digits) >= MIN_SEARCH_TERM_LENGTH and digits != word:
+            phrase = f'({phrase} OR "{digits}")'
+        terms.append(phrase)
+    return " AND ".join(terms) or None
+
+
+@dataclass(frozen=True, slots=True)
+class OrderStats:
+    total: int
+    by_status: dict[str, int]
+    by_source: dict[str, int]
 
 
 class OrderRepository:
@@ -13,44 +123,196 @@ class OrderRepository:
         self.session = session
 
     async def create(self, order: Order) -> Order:
+        # Order maps with eager_defaults, so the INSERT itself returns server defaults
+        # and there is nothing left to refresh after the commit.
         self.session.add(order)
         await self.session.commit()
-        await self.session.refresh(order)
         return order
 
+    async def list_ids(self) -> set[str]:
+        return set(await self.session.scalars(select(Order.id)))
+
+    async def insert_many(self, rows: Sequence[dict[str, Any]]) -> None:
+        # Only stages the batch as one executemany in the caller's transaction;
+        # rows whose id already exists are skipped by SQLite.
+        await self.session.execute(insert(Order.__table__).prefix_with("OR IGNORE"), rows)
+
+    async def begin_bulk_insert(self) -> int:
+        # pysqlite only opens a transaction implicitly before DML, so DROP TRIGGER would
+        # autocommit; BEGIN IMMEDIATE makes the drops part of the import and a rollback restores
+        # them. Must be the first write in the session; finish_bulk_insert runs in the same one.
+        await self.session.execute(text("BEGIN IMMEDIATE"))
+        for name in BULK_INSERT_TRIGGERS:
+            await self.session.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+        return int(await self.session.scalar(text("SELECT coalesce(max(rowid), 0) FROM orders")) or 0)
+
+    async def finish_bulk_insert(self, after_rowid: int) -> None:
+        # New rows get rowids above the previous maximum, so only they are indexed here.
+        await self.session.execute(
+            text(f"{ORDER_SEARCH_BACKFILL} WHERE rowid > :after_rowid"),
+            {"after_rowid": after_rowid},
+        )
+        await self.session.execute(text("DELETE FROM order_stats"))
+        await self.session.execute(text(ORDER_STATS_BACKFILL))
+        for statement in BULK_INSERT_TRIGGERS.values():
+            await self.session.execute(text(statement))
+
     async def get_by_id(self, order_id: str) -> Order | None:
         stmt = select(Order).where(Order.id == order_id)
         return await self.session.scalar(stmt)
 
-    async def list_recent(self, limit: int = 10) -> list[Order]:
-        stmt = select(Order).order_by(Order.created_at.desc()).limit(limit)
-        result = await self.session.scalars(stmt)
-        return list(result)
+    async def get_view(self, order_id: str) -> OrderView | None:
+        row = (await self.session.execute(select(*ORDER_VIEW_COLUMNS).where(Order.id == order_id))).first()
+        return OrderView(*row) if row is not None else None
 
-    async def list_all(self) -> list[Order]:
-        stmt = select(Order).order_by(Order.created_at.asc())
-        result = await self.session.scalars(stmt)
-        return list(result)
+    async def list_views(self, limit: int | None = None, *, newest_first: bool = False) -> list[OrderView]:
+        if newest_first:
+            order_by = (Order.created_at.desc(), Order.id.desc())
+        else:
+            order_by = (Order.created_at.asc(), Order.id.asc())
+        stmt = select(*ORDER_VIEW_COLUMNS).order_by(*order_by).limit(limit)
+        rows = (await self.session.execute(stmt)).all()
+        return [OrderView(*row) for row in rows]
+
+    async def stream_views(
+        self,
+        chunk_size: int = 500,
+        filters: OrderFilter | None = None,
+    ) -> AsyncIterator[list[OrderView]]:
+        # A server-side cursor fetches chunk_size rows at a time, so memory stays flat
+        # however many orders there are.
+        stmt = (
+            select(*ORDER_VIEW_COLUMNS)
+            .where(*(filters or OrderFilter()).clauses())
+            .order_by(Order.created_at.asc(), Order.id.asc())
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self.session.stream(stmt)
+        async for rows in result.partitions():
+            yield [OrderView(*row) for row in rows]
+
+    async def count(self, filters: OrderFilter | None = None) -> int:
+        filters = filters or OrderFilter()
+        if filters.since is None and filters.until is None:
+            # Counters from order_stats cover the unfiltered total and single status/source filters.
+            if filters.status is None and filters.source is None:
+                stmt = select(OrderStat.count).where(OrderStat.dimension == "total", OrderStat.value == "")
+                return int(await self.session.scalar(stmt) or 0)
+            if filters.source is None:
+                stmt = select(OrderStat.count).where(OrderStat.dimension == "status", OrderStat.value == filters.status)
+                return int(await self.session.scalar(stmt) or 0)
+            if filters.status is None:
+                stmt = select(OrderStat.count).where(OrderStat.dimension == "source", OrderStat.value == filters.source)
+                return int(await self.session.scalar(stmt) or 0)
+        stmt = select(func.count()).select_from(Order).where(*filters.clauses())
+        return int(await self.session.scalar(stmt) or 0)
+
+    async def list_filtered(self, filters: OrderFilter, limit: int = 100) -> list[OrderSummary]:
+        rows = (await self.session.execute(self.page_statement(limit, filters=filters))).all()
+        return [OrderSummary(*row) for row in rows]
+
+    async def stats(self) -> OrderStats:
+        rows = (await self.session.execute(select(OrderStat.dimension, OrderStat.value, OrderStat.count))).all()
+        groups: dict[str, dict[str, int]] = {"total": {}, "status": {}, "source": {}}
+        for dimension, value, count in rows:
+            if count > 0:
+                groups.setdefault(dimension, {})[value] = count
+        return OrderStats(
+            total=groups["total"].get("", 0),
+            by_status=dict(sorted(groups["status"].items())),
+            by_source=dict(sorted(groups["source"].items())),
+        )
+
+    @staticmethod
+    def page_statement(
+        limit: int,
+        *,
+        anchor: tuple[datetime, str] | None = None,
+        direction: Literal["older", "newer"] = "older",
+        filters: OrderFilter | None = None,
+    ) -> Select[Any]:
+        # Keyset pagination over (created_at, id), newest first: cost depends on the page size only.
+        # Equality filters on status/source are served by the matching (column, created_at, id) index.
+        stmt = select(Order.id, Order.name, Order.telephone, Order.created_at)
+        if filters is not None:
+            stmt = stmt.where(*filters.clauses())
+        key = tuple_(Order.created_at, Order.id)
+        if anchor is not None and direction == "newer":
+            return stmt.where(key > tuple_(*anchor)).order_by(Order.created_at.asc(), Order.id.asc()).limit(limit)
+        if anchor is not None:
+            stmt = stmt.where(key < tuple_(*anchor))
+        return stmt.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit)
+
+    async def page(
+        self,
+        limit: int = 10,
+        *,
+        anchor_id: str | None = None,
+        direction: Literal["older", "newer"] = "older",
+        filters: OrderFilter | None = None,
+    ) -> OrderPage:
+        anchor = None
+        if anchor_id is not None:
+            row = (await self.session.execute(select(Order.created_at, Order.id).where(Order.id == anchor_id))).first()
+            anchor = None if row is None else (row[0], row[1])
+
+        stmt = self.page_statement(limit + 1, anchor=anchor, direction=direction, filters=filters)
+        rows = (await self.session.execute(stmt)).all()
+        has_more = len(rows) > limit
+        items = [OrderSummary(*row) for row in rows[:limit]]
+        if anchor is not None and direction == "newer":
+            items.reverse()
+            has_newer, has_older = has_more, True
+        else:
+            has_newer, has_older = anchor is not None, has_more
+        total = await self.count(filters)
+        return OrderPage(items=items, total=total, has_newer=has_newer, has_older=has_older)
+
+    async def search(self, query: str, limit: int = 10, offset: int = 0) -> OrderSearchPage:
+        match = build_match_query(query)
+        if match is None:
+            return OrderSearchPage(query=query, items=[], total=0, offset=offset)
+
+        rows = await self.session.execute(
+            text(
+                "SELECT o.id, o.name, o.telephone, o.created_at "
+                "FROM orders_fts JOIN orders AS o ON o.rowid = orders_fts.rowid "
+                "WHERE orders_fts MATCH :match ORDER BY orders_fts.rank LIMIT :limit OFFSET :offset"
+            ).columns(Order.id, Order.name, Order.telephone, Order.created_at),
+            {"match": match, "limit": limit, "offset": offset},
+        )
+        total = await self.session.scalar(
+            text("SELECT COUNT(*) FROM orders_fts WHERE orders_fts MATCH :match"),
+            {"match": match},
+        )
+        items = [OrderSummary(*row) for row in rows]
+        return OrderSearchPage(query=query, items=items, total=int(total or 0), offset=offset)
 
     async def update_status(self, order_id: str, status: str) -> Order | None:
-        order = await self.get_by_id(order_id)
-        if order is None:
-            return None
-        order.status = status
+        stmt = (
+            update(Order)
+            .where(Order.id == order_id)
+            .values(status=status)
+            .returning(Order)
+            .execution_options(populate_existing=True)
+        )
+        order = await self.session.scalar(stmt)
         await self.session.commit()
-        await self.session.refresh(order)
         return order
 
     async def delete(self, order_id: str) -> bool:
-        order = await self.get_by_id(order_id)
-        if order is None:
-            return False
-        await self.session.delete(order)
+        stmt = delete(Order).where(Order.id == order_id).returning(Order.id)
+        deleted = await self.session.scalar(stmt)
         await self.session.commit()
-        return True
+        return deleted is not None
 
     async def exists(self, order_id: str) -> bool:
-        return (await self.get_by_id(order_id)) is not None
+        return (await self.session.scalar(select(Order.id).where(Order.id == order_id))) is not None
+
+
+def _role_rank(column: Any) -> ColumnElement[int]:
+    # UserRole members are declared from the lowest to the highest privilege.
+    return case({role.name: rank for rank, role in enumerate(UserRole)}, value=column, else_=-1)
 
 
 class UserRepository:
@@ -61,25 +323,137 @@ class UserRepository:
         stmt = select(User).where(User.telegram_id == telegram_id)
         return await self.session.scalar(stmt)
 
+    async def get_role(self, telegram_id: int) -> UserRole | None:
+        return await self.session.scalar(select(User.role).where(User.telegram_id == telegram_id))
+
+    async def list_views(self, roles: Sequence[UserRole] | None = None) -> list[UserView]:
+        stmt = select(*USER_VIEW_COLUMNS).order_by(User.telegram_id.asc())
+        if roles is not None:
+            stmt = stmt.where(User.role.in_(roles))
+        rows = (await self.session.execute(stmt)).all()
+        return [UserView(telegram_id, role.value, created, updated) for telegram_id, role, created, updated in rows]
+
     async def list_by_roles(self, roles: Sequence[UserRole]) -> list[User]:
         stmt = select(User).where(User.role.in_(roles)).order_by(User.telegram_id.asc())
         result = await self.session.scalars(stmt)
         return list(result)
 
-    async def upsert_role(self, telegram_id: int, role: UserRole) -> User:
-        user = await self.get_by_telegram_id(telegram_id)
-        if user is None:
-            user = User(telegram_id=telegram_id, role=role)
-            self.session.add(user)
-        else:
-            user.role = role
+    async def list_ids_by_roles(self, roles: Sequence[UserRole]) -> list[int]:
+        stmt = select(User.telegram_id).where(User.role.in_(roles)).order_by(User.telegram_id.asc())
+        result = await self.session.scalars(stmt)
+        return list(result)
+
+    async def list_role_members(self) -> list[tuple[UserRole, int]]:
+        stmt = select(User.role, User.telegram_id).order_by(User.telegram_id.asc())
+        result = await self.session.execute(stmt)
+        return [(role, telegram_id) for role, telegram_id in result]
+
+    async def upsert_role(self, telegram_id: int, role: UserRole, *, only_upgrade: bool = False) -> User | None:
+        # Returns None when only_upgrade is set and the stored role already ranks at least as high.
+        stmt = sqlite_insert(User).values(telegram_id=telegram_id, role=role)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[User.telegram_id],
+            set_={"role": stmt.excluded.role, "updated_at": func.now()},
+            where=_role_rank(stmt.excluded.role) > _role_rank(User.role) if only_upgrade else None,
+        )
+        stmt = stmt.returning(User).execution_options(populate_existing=True)
+        user = await self.session.scalar(stmt)
         await self.session.commit()
-        await self.session.refresh(user)
         return user
 
+    async def bulk_upsert_roles(self, roles: Mapping[int, UserRole], *, only_upgrade: bool = False) -> int:
+        # One executemany upsert for the whole mapping; returns how many users were new.
+        if not roles:
+            return 0
+        existing = set(await self.session.scalars(select(User.telegram_id)))
+        table = User.__table__
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.telegram_id],
+            set_={"role": stmt.excluded.role, "updated_at": func.now()},
+            where=_role_rank(stmt.excluded.role) > _role_rank(table.c.role) if only_upgrade else None,
+        )
+        await self.session.execute(
+            stmt,
+            [{"telegram_id": telegram_id, "role": role} for telegram_id, role in roles.items()],
+        )
+        await self.session.commit()
+        return len(roles.keys() - existing)
+
     async def delete_user(self, telegram_id: int) -> bool:
-        stmt = delete(User).where(User.telegram_id == telegram_id)
-        result = await self.session.execute(stmt)
+        stmt = delete(User).where(User.telegram_id == telegram_id).returning(User.id)
+        deleted = await self.session.scalar(stmt)
+        await self.session.commit()
+        return deleted is not None
+
+
+class OutboxRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    def enqueue(self, order_id: str, now: datetime | None = None) -> OutboxEntry:
+        # Only stages the entry: it is committed together with the caller's transaction.
+        now = now or datetime.now()
+        entry = OutboxEntry(
+            order_id=order_id,
+            status="pending",
+            attempts=0,
+            next_attempt_at=now,
+            created_at=now,
+            updated_at=now,
+        )
+        self.session.add(entry)
+        return entry
+
+    async def list_due(self, now: datetime, limit: int, exclude_ids: Collection[int] = ()) -> list[OutboxEntry]:
+        stmt = (
+            select(OutboxEntry)
+            .where(OutboxEntry.status.in_(OUTBOX_DUE_STATUSES), OutboxEntry.next_attempt_at <= now)
+            .order_by(OutboxEntry.next_attempt_at.asc())
+            .limit(limit)
+        )
+        if exclude_ids:
+            stmt = stmt.where(OutboxEntry.id.not_in(exclude_ids))
+        result = await self.session.scalars(stmt)
+        return list(result)
+
+    async def next_attempt_at(self, after: datetime) -> datetime | None:
+        stmt = select(func.min(OutboxEntry.next_attempt_at)).where(
+            OutboxEntry.status.in_(OUTBOX_DUE_STATUSES),
+            OutboxEntry.next_attempt_at > after,
+        )
+        return await self.session.scalar(stmt)
+
+    async def count_pending(self) -> int:
+        stmt = select(func.count()).select_from(OutboxEntry).where(OutboxEntry.status.in_(OUTBOX_DUE_STATUSES))
+        return int(await self.session.scalar(stmt) or 0)
+
+    async def claim(self, entry_id: int, now: datetime, lease_until: datetime) -> OutboxEntry | None:
+        # Every web worker polls the same table; only the one whose UPDATE matches gets the entry.
+        # While it is "sending", next_attempt_at holds the lease expiry, so an entry left behind
+        # by a crashed worker becomes due again once the lease runs out.
+        stmt = (
+            update(OutboxEntry)
+            .where(
+                OutboxEntry.id == entry_id,
+                OutboxEntry.status.in_(OUTBOX_DUE_STATUSES),
+                OutboxEntry.next_attempt_at <= now,
+            )
+            .values(status="sending", next_attempt_at=lease_until, updated_at=now)
+            .returning(OutboxEntry)
+            .execution_options(populate_existing=True)
+        )
+        entry = await self.session.scalar(stmt)
         await self.session.commit()
-        return result.rowcount > 0
+        return entry
 
+    async def update_entry(self, entry_id: int, *, lease_until: datetime | None = None, **values: Any) -> bool:
+        # With lease_until the update only applies while that claim is still held.
+        values.setdefault("updated_at", datetime.now())
+        stmt = update(OutboxEntry).where(OutboxEntry.id == entry_id)
+        if lease_until is not None:
+            stmt = stmt.where(OutboxEntry.status == "sending", OutboxEntry.next_attempt_at == lease_until)
+        result = await self.session.execute(stmt.values(**values).returning(OutboxEntry.id))
+        updated = result.first() is not None
+        await self.session.commit()
+        return updated
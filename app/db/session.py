@@ -1,17 +1,105 @@
 from __future__ import annotations
 
-from collections.abc import AsyncIterator
+import time
+from collections.abc import AsyncIterator, Callable
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Literal
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
-from app.config import get_settings
+from app.config import Settings, get_settings
 from app.db.base import Base
+from app.metrics import DB_POOL_IN_USE, DB_QUERY_DURATION
+
+TIMED_STATEMENTS = frozenset({"select", "insert", "update", "delete", "pragma"})
+
+
+def sqlite_pragmas(settings: Settings) -> dict[str, str | int]:
+    # busy_timeout goes first so that switching to WAL waits for a concurrent writer.
+    return {
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+        "temp_store": settings.sqlite_temp_store,
+    }
+
+
+def configure_sqlite(engine: AsyncEngine, settings: Settings, *, read_only: bool = False) -> None:
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas(settings)
+    if read_only:
+        pragmas["query_only"] = 1
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    # Cursor events fire around the awaited driver call, so the timing covers the real query.
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _start_timer(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _stop_timer(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        started = conn.info["query_started_at"].pop()
+        verb = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+        DB_QUERY_DURATION.observe(
+            time.perf_counter() - started,
+            engine=name,
+            statement=verb if verb in TIMED_STATEMENTS else "other",
+        )
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _drop_timer(context: Any) -> None:
+        connection = context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
+
+    checkedout = getattr(engine.pool, "checkedout", None)
+    if checkedout is not None:
+        DB_POOL_IN_USE.track(checkedout, engine=name)
+
+
+def is_file_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def build_engine(settings: Settings, *, role: Literal["default", "write", "read"] = "default") -> AsyncEngine:
+    options: dict[str, Any] = {}
+    if role != "default" and is_file_sqlite(settings.database_url):
+        # SQLite has a single writer: one pooled connection turns concurrent writes into a queue
+        # inside the process instead of busy-waiting on the database lock.
+        if role == "write":
+            options.update(pool_size=1, max_overflow=0, pool_timeout=settings.sqlite_write_queue_timeout)
+        else:
+            options.update(pool_size=settings.sqlite_read_pool_size, max_overflow=0)
+    engine = create_async_engine(settings.database_url, echo=False, future=True, **options)
+    configure_sqlite(engine, settings, read_only=role == "read")
+    instrument_engine(engine, role)
+    return engine
 
 
 settings = get_settings()
-engine = create_async_engine(settings.database_url, echo=False, future=True)
+engine = build_engine(settings, role="write")
+# In-memory databases are private to their connection, so reads must share the writer engine.
+read_engine = build_engine(settings, role="read") if is_file_sqlite(settings.database_url) else engine
 SessionFactory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+ReadSessionFactory = async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
+
+_shared_session: ContextVar[AsyncSession | None] = ContextVar("shared_session", default=None)
 
 
 @asynccontextmanager
@@ -20,11 +108,46 @@ async def get_session() -> AsyncIterator[AsyncSession]:
         yield session
 
 
+@asynccontextmanager
+async def shared_session(session_factory: Callable[[], AsyncSession]) -> AsyncIterator[AsyncSession]:
+    async with session_factory() as session:
+        token = _shared_session.set(session)
+        try:
+            yield session
+        finally:
+            _shared_session.reset(token)
+
+
+@asynccontextmanager
+async def read_scope(session_factory: Callable[[], AsyncSession]) -> AsyncIterator[AsyncSession]:
+    session = _shared_session.get()
+    if session is None:
+        async with session_factory() as session:
+            yield session
+        return
+    try:
+        yield session
+    finally:
+        # End the read transaction so later reads in the same update see committed writes
+        # and the pooled connection is released between queries.
+        await session.commit()
+
+
+@asynccontextmanager
+async def write_scope(session_factory: Callable[[], AsyncSession]) -> AsyncIterator[AsyncSession]:
+    async with session_factory() as session:
+        yield session
+
+
 async def init_models() -> None:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # Schema setup may run in a throwaway event loop; do not keep its connection pooled.
+    await engine.dispose()
 
 
 async def close_engine() -> None:
     await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
 
@@ -1,25 +1,148 @@
 from __future__ import annotations
 
+import atexit
+import copy
+import gzip
+import json
 import logging
+import os
+import queue
+import shutil
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, WatchedFileHandler
 from pathlib import Path
 
+from app.metrics import QUEUE_DEPTH
+
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+_queue_handler: QueueHandler | None = None
+_listener: QueueListener | None = None
+_log_path: Path | None = None
+_rotating = False
+
+
+class DeferredQueueHandler(QueueHandler):
+    # The message is interpolated here, on the calling thread, so arguments are logged as they
+    # were at the call and their __repr__ never runs on another thread. Unlike the stock
+    # prepare(), exc_info is kept: the listener thread formats the traceback, and the JSON
+    # formatter can still put it under its own key.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created).astimezone().isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class CompressedRotatingFileHandler(RotatingFileHandler):
+    # Rotates by size and, optionally, on fixed UTC interval boundaries; finished segments
+    # are gzipped as bot.log.1.gz, bot.log.2.gz, ... (newest first).
+
+    def __init__(
+        self,
+        filename: Path,
+        *,
+        max_bytes: int = 0,
+        backup_count: int = 0,
+        interval: float = 0.0,
+    ) -> None:
+        super().__init__(filename, mode="a", maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.interval = interval
+        self.namer = lambda name: f"{name}.gz"
+        self.rotator = _compress_segment
+        # Counting from the last write means a restart after a boundary still rotates the old file.
+        started = os.stat(self.baseFilename).st_mtime if os.path.exists(self.baseFilename) else time.time()
+        self.rollover_at = self._next_boundary(started)
+
+    def _next_boundary(self, timestamp: float) -> float:
+        if self.interval <= 0:
+            return float("inf")
+        return (timestamp // self.interval + 1) * self.interval
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if super().shouldRollover(record):
+            return True
+        if time.time() < self.rollover_at:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        # Empty files are not worth a segment; just move on to the next boundary.
+        if self.stream.tell() == 0:
+            self.rollover_at = self._next_boundary(time.time())
+            return False
+        return True
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self.rollover_at = self._next_boundary(time.time())
+
+
+def _compress_segment(source: str, dest: str) -> None:
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def _build_formatter(log_format: str) -> logging.Formatter:
+    if log_format == "json":
+        return JsonLinesFormatter()
+    return logging.Formatter(TEXT_FORMAT)
+
+
+def configure_logging(
+    log_path: Path,
+    *,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    rotate_interval: float = 0.0,
+    log_format: str = "text",
+    rotate: bool = True,
+) -> None:
+    global _queue_handler, _listener, _log_path, _rotating
 
-def configure_logging(log_path: Path) -> None:
     log_path = log_path.resolve()
-    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
     root = logging.getLogger()
-    log_path.parent.mkdir(parents=True, exist_ok=True)
     root.setLevel(logging.INFO)
+    configured = _listener is not None and _log_path == log_path and _queue_handler in root.handlers
+    if configured and (_rotating or not rotate):
+        return
+    shutdown_logging()
+    log_path.parent.mkdir(parents=True, exist_ok=True)
 
-    has_file_handler = any(
-        isinstance(handler, logging.FileHandler)
-        and Path(getattr(handler, "baseFilename", "")).resolve() == log_path
-        for handler in root.handlers
-    )
-    if not has_file_handler:
-        file_handler = logging.FileHandler(log_path, mode="a", encoding="utf-8")
-        file_handler.setFormatter(formatter)
-        root.addHandler(file_handler)
+    # Traceback and line formatting, rotation, compression and console output happen on the
+    # listener thread; the event loop only interpolates the message and queues the record.
+    file_handler: logging.FileHandler
+    if rotate:
+        file_handler = CompressedRotatingFileHandler(
+            log_path,
+            max_bytes=max_bytes,
+            backup_count=backup_count,
+            interval=rotate_interval,
+        )
+    else:
+        # Web and bot may run as separate processes sharing bot.log. Only one of them may
+        # rotate it; the other reopens the file once the rotating process has moved it away.
+        file_handler = WatchedFileHandler(log_path, encoding="utf-8")
+    file_handler.setFormatter(_build_formatter(log_format))
+    handlers: list[logging.Handler] = [file_handler]
 
     has_stream_handler = any(
         isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler)
@@ -27,5 +150,33 @@ def configure_logging(log_path: Path) -> None:
     )
     if not has_stream_handler:
         stream_handler = logging.StreamHandler()
-        stream_handler.setFormatter(formatter)
-        root.addHandler(stream_handler)
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(stream_handler)
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    _queue_handler = DeferredQueueHandler(log_queue)
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    QUEUE_DEPTH.track(log_queue.qsize, queue="logging")
+    _log_path = log_path
+    _rotating = rotate
+    _listener.start()
+    root.addHandler(_queue_handler)
+
+
+def shutdown_logging() -> None:
+    # Flushes everything still queued and closes the log file.
+    global _queue_handler, _listener, _log_path, _rotating
+
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+    _queue_handler = None
+    _listener = None
+    _log_path = None
+    _rotating = False
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from pathlib import Path
+from typing import Generic, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+# Change marker shared by processes through the stamp file's mtime and size.
+class VersionStamp:
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self._local_version = 0
+
+    def current(self) -> tuple[int, int, int]:
+        if self.path is None:
+            return self._local_version, 0, 0
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return self._local_version, 0, 0
+        return self._local_version, stat.st_mtime_ns, stat.st_size
+
+    def bump(self) -> None:
+        self._local_version += 1
+        if self.path is None:
+            return
+        stamp = time.time_ns()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(f"{stamp}\n", encoding="utf-8")
+            os.utime(self.path, ns=(stamp, stamp))
+        except OSError:
+            pass
+
+
+class TTLCache(Generic[K, V]):
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._version: Hashable | None = None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def sync(self, version: Hashable) -> None:
+        if version != self._version:
+            self._data.clear()
+            self._version = version
+
+    def get(self, key: K) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
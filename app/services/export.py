@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from app.schemas.order import OrderView
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # pragma: no cover - openpyxl is only needed for XLSX exports
+    Workbook = None
+
+
+EXPORT_CHUNK_SIZE = 500
+EXPORT_MEDIA_TYPES: dict[str, str] = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+EXPORT_FIELDS = tuple(field.name for field in fields(OrderView))
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Spreadsheet cells starting with these characters are evaluated as formulas.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def available_formats() -> tuple[str, ...]:
+    return tuple(fmt for fmt in EXPORT_MEDIA_TYPES if fmt != "xlsx" or Workbook is not None)
+
+
+def export_filename(fmt: str, now: datetime | None = None) -> str:
+    return f"orders-{(now or datetime.now()):%Y%m%d-%H%M%S}.{fmt}"
+
+
+def _values(order: OrderView) -> list[str]:
+    values: list[str] = []
+    for name in EXPORT_FIELDS:
+        value = getattr(order, name)
+        values.append(value.strftime(DATETIME_FORMAT) if isinstance(value, datetime) else str(value))
+    return values
+
+
+def _spreadsheet_values(order: OrderView) -> list[str]:
+    # Names and messages come from the public form, so a leading quote keeps Excel from
+    # running "=HYPERLINK(...)" and the like. JSON Lines output stays raw.
+    return [f"'{value}" if value.startswith(FORMULA_PREFIXES) else value for value in _values(order)]
+
+
+async def encode_csv(chunks: AsyncIterable[list[OrderView]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # The BOM lets Excel detect UTF-8 and show Cyrillic names correctly.
+    buffer.write("\ufeff")
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue().encode("utf-8")
+    async for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_spreadsheet_values(order) for order in chunk)
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def encode_jsonl(chunks: AsyncIterable[list[OrderView]]) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        lines = (
+            json.dumps(dict(zip(EXPORT_FIELDS, _values(order))), ensure_ascii=False) + "\n"
+            for order in chunk
+        )
+        yield "".join(lines).encode("utf-8")
+
+
+def _new_workbook() -> tuple[Any, Any]:
+    # A write-only workbook spills rows to a temporary file instead of keeping cells in memory.
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("orders")
+    sheet.append(list(EXPORT_FIELDS))
+    return workbook, sheet
+
+
+def _append_rows(sheet: Any, chunk: list[OrderView]) -> None:
+    for order in chunk:
+        sheet.append(_spreadsheet_values(order))
+
+
+def stream_export(chunks: AsyncIterable[list[OrderView]], fmt: str) -> AsyncIterator[bytes]:
+    if fmt == "csv":
+        return encode_csv(chunks)
+    if fmt == "jsonl":
+        return encode_jsonl(chunks)
+    raise ValueError(f"Format {fmt!r} cannot be streamed")
+
+
+async def write_export(path: Path, chunks: AsyncIterable[list[OrderView]], fmt: str) -> int:
+    if fmt not in available_formats():
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    count = 0
+
+    async def counted() -> AsyncIterator[list[OrderView]]:
+        nonlocal count
+        async for chunk in chunks:
+            count += len(chunk)
+            yield chunk
+
+    if fmt == "xlsx":
+        # Rows are read from the database on the event loop, but every workbook call runs in
+        # a worker thread, one chunk at a time, so a large export does not stall the bot.
+        workbook, sheet = await asyncio.to_thread(_new_workbook)
+        async for chunk in counted():
+            await asyncio.to_thread(_append_rows, sheet, chunk)
+        await asyncio.to_thread(workbook.save, path)
+        return count
+
+    with path.open("wb") as file_obj:
+        async for data in stream_export(counted(), fmt):
+            await asyncio.to_thread(file_obj.write, data)
+    return count
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+
+from aiogram.exceptions import TelegramRetryAfter
+
+
+logger = logging.getLogger(__name__)
+
+# Telegram Bot API limits: about 30 messages per second overall and
+# no more than one message per second to the same chat.
+TELEGRAM_GLOBAL_RATE = 30.0
+TELEGRAM_PER_CHAT_RATE = 1.0
+MAX_TRACKED_CHATS = 10_000
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def is_full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.capacity
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass(slots=True)
+class DeliveryResult:
+    chat_id: int
+    ok: bool
+    attempts: int
+    elapsed: float
+    retry_after: float = 0.0
+    error: str | None = None
+
+
+@dataclass(slots=True)
+class FanOutReport:
+    results: list[DeliveryResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def sent(self) -> list[int]:
+        return [result.chat_id for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> list[int]:
+        return [result.chat_id for result in self.results if not result.ok]
+
+
+class FanOut:
+    def __init__(
+        self,
+        *,
+        concurrency: int = 10,
+        global_rate: float = TELEGRAM_GLOBAL_RATE,
+        per_chat_rate: float = TELEGRAM_PER_CHAT_RATE,
+        max_retries: int = 3,
+        max_retry_after: float = 60.0,
+        max_tracked_chats: int = MAX_TRACKED_CHATS,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.per_chat_rate = per_chat_rate
+        self.max_retries = max_retries
+        self.max_retry_after = max_retry_after
+        self.max_tracked_chats = max(1, max_tracked_chats)
+        self._global = TokenBucket(global_rate)
+        self._per_chat: dict[int, TokenBucket] = {}
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._per_chat.get(chat_id)
+        if bucket is None:
+            if len(self._per_chat) >= self.max_tracked_chats:
+                self._evict_idle_buckets()
+            bucket = TokenBucket(self.per_chat_rate, capacity=1.0)
+            self._per_chat[chat_id] = bucket
+        return bucket
+
+    def _evict_idle_buckets(self) -> None:
+        # A full bucket behaves exactly like a new one, so forgetting it loses nothing.
+        for chat_id in [chat_id for chat_id, bucket in self._per_chat.items() if bucket.is_full()]:
+            del self._per_chat[chat_id]
+        # Every tracked chat was sent to within the last second: drop the oldest ones.
+        while len(self._per_chat) >= self.max_tracked_chats:
+            del self._per_chat[next(iter(self._per_chat))]
+
+    async def send(self, chat_ids: Iterable[int], send: Callable[[int], Awaitable[object]]) -> FanOutReport:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self._deliver(chat_id, send) for chat_id in dict.fromkeys(chat_ids)))
+        return FanOutReport(results=list(results), elapsed=time.perf_counter() - started)
+
+    async def _deliver(self, chat_id: int, send: Callable[[int], Awaitable[object]]) -> DeliveryResult:
+        started = time.perf_counter()
+        attempts = 0
+        waited = 0.0
+        while True:
+            attempts += 1
+            try:
+                await self._chat_bucket(chat_id).acquire()
+                async with self._get_semaphore():
+                    await self._global.acquire()
+                    await send(chat_id)
+            except TelegramRetryAfter as exc:
+                if attempts > self.max_retries or exc.retry_after > self.max_retry_after:
+                    return DeliveryResult(
+                        chat_id=chat_id,
+                        ok=False,
+                        attempts=attempts,
+                        elapsed=time.perf_counter() - started,
+                        retry_after=waited,
+                        error=str(exc),
+                    )
+                logger.warning("Telegram asked to retry %s after %ss", chat_id, exc.retry_after)
+                waited += exc.retry_after
+                # Sleep outside the semaphore so other recipients keep flowing.
+                await asyncio.sleep(exc.retry_after)
+                continue
+            except Exception as exc:
+                logger.exception("Failed to send notification to %s", chat_id)
+                return DeliveryResult(
+                    chat_id=chat_id,
+                    ok=False,
+                    attempts=attempts,
+                    elapsed=time.perf_counter() - started,
+                    retry_after=waited,
+                    error=str(exc) or type(exc).__name__,
+                )
+            return DeliveryResult(
+                chat_id=chat_id,
+                ok=True,
+                attempts=attempts,
+                elapsed=time.perf_counter() - started,
+                retry_after=waited,
+            )
@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO
+
+
+LOG_INDEX_CHUNK_SIZE = 1 << 16
+
+
+class LogLineIndex:
+    # Byte offsets where every complete line of the log ends. The index only scans what
+    # was appended since the last call and starts over when the file is rotated or truncated,
+    # so any page is one seek and one read no matter how far back it is.
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._line_ends = array("Q")
+        self._indexed_size = 0
+        self._identity: tuple[int, int] | None = None
+        self._lock = threading.Lock()
+
+    def _reset(self, identity: tuple[int, int] | None) -> None:
+        self._line_ends = array("Q")
+        self._indexed_size = 0
+        self._identity = identity
+
+    def refresh(self) -> int:
+        stat = os.stat(self.path)
+        identity = (stat.st_dev, stat.st_ino)
+        if identity != self._identity or stat.st_size < self._indexed_size:
+            self._reset(identity)
+        if stat.st_size > self._indexed_size:
+            self._scan(stat.st_size)
+        return stat.st_size
+
+    def _scan(self, size: int) -> None:
+        # Only complete lines are indexed; a trailing partial line is rescanned next time.
+        position = self._line_ends[-1] if self._line_ends else 0
+        with self.path.open("rb") as file_obj:
+            file_obj.seek(position)
+            while position < size:
+                chunk = file_obj.read(min(LOG_INDEX_CHUNK_SIZE, size - position))
+                if not chunk:
+                    break
+                start = 0
+                while (newline := chunk.find(b"\n", start)) != -1:
+                    self._line_ends.append(position + newline + 1)
+                    start = newline + 1
+                position += len(chunk)
+        self._indexed_size = size
+
+    def line_count(self, size: int) -> int:
+        last_end = self._line_ends[-1] if self._line_ends else 0
+        return len(self._line_ends) + (1 if size > last_end else 0)
+
+    def _line_end(self, index: int, size: int) -> int:
+        return self._line_ends[index] if index < len(self._line_ends) else size
+
+    def read_page(self, offset: int, page_size: int) -> list[str]:
+        return self._read_page(offset, page_size)[0]
+
+    def _read_page(self, offset: int, page_size: int) -> tuple[list[str], int]:
+        if offset < 0:
+            raise ValueError("offset must be non-negative")
+
+        with self._lock:
+            size = self.refresh()
+            total = self.line_count(size)
+            stop = total - offset
+            if stop <= 0:
+                return [], total
+            start = max(0, stop - page_size)
+            begin = self._line_end(start - 1, size) if start else 0
+            end = self._line_end(stop - 1, size)
+
+        with self.path.open("rb") as file_obj:
+            file_obj.seek(begin)
+            content = file_obj.read(end - begin)
+        return content.decode("utf-8", errors="ignore").splitlines(keepends=True), total
+
+
+def rotated_segments(path: Path) -> list[Path]:
+    # Segments written by CompressedRotatingFileHandler, newest first.
+    segments: list[Path] = []
+    number = 1
+    while True:
+        for candidate in (path.with_name(f"{path.name}.{number}.gz"), path.with_name(f"{path.name}.{number}")):
+            if candidate.exists():
+                segments.append(candidate)
+                break
+        else:
+            return segments
+        number += 1
+
+
+def _open_segment(path: Path) -> BinaryIO:
+    return gzip.open(path, "rb") if path.suffix == ".gz" else path.open("rb")
+
+
+@lru_cache(maxsize=16)
+def _segment_line_ends(path: Path, mtime_ns: int, size: int) -> array:
+    # Rotated segments never change, so their line offsets (into the decompressed text) are
+    # recorded once, streaming the segment line by line; the text itself is not kept.
+    line_ends = array("Q")
+    position = 0
+    with _open_segment(path) as file_obj:
+        for line in file_obj:
+            position += len(line)
+            line_ends.append(position)
+    return line_ends
+
+
+def _read_segment_lines(path: Path, line_ends: array, start: int, stop: int) -> list[str]:
+    begin = line_ends[start - 1] if start else 0
+    with _open_segment(path) as file_obj:
+        file_obj.seek(begin)
+        content = file_obj.read(line_ends[stop - 1] - begin)
+    return content.decode("utf-8", errors="ignore").splitlines(keepends=True)
+
+
+def read_log_page(index: LogLineIndex, offset: int, page_size: int) -> list[str]:
+    lines, total = index._read_page(offset, page_size)
+    pages = [lines]
+    remaining = page_size - len(lines)
+    offset = max(0, offset - total)
+    for segment in rotated_segments(index.path):
+        if remaining <= 0:
+            break
+        try:
+            stat = segment.stat()
+            line_ends = _segment_line_ends(segment, stat.st_mtime_ns, stat.st_size)
+            stop = len(line_ends) - offset
+            if stop <= 0:
+                offset -= len(line_ends)
+                continue
+            older = _read_segment_lines(segment, line_ends, max(0, stop - remaining), stop)
+        except (FileNotFoundError, EOFError, gzip.BadGzipFile):
+            # The segment was rotated away or is still being compressed.
+            break
+        pages.append(older)
+        remaining -= len(older)
+        offset = 0
+    return [line for page in reversed(pages) for line in page]
+
+
+LOG_SCAN_CHUNK_SIZE = 1 << 20
+LOG_CURSOR_HEAD_SIZE = 64
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+LOG_LEVELS = logging.getLevelNamesMapping()
+TEXT_RECORD_RE = re.compile(r"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)(?:,\d+)? \[(\w+)\] ([^:\s]+): ")
+RELATIVE_TIME_RE = re.compile(r"^(\d+)([mhd])$")
+RELATIVE_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+
+@dataclass(frozen=True, slots=True)
+class LogFilter:
+    min_level: int | None = None
+    logger: str | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+    text: str | None = None
+    pattern: re.Pattern[str] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class LogCursor:
+    # Where scan_log stopped: a byte offset into bot.log (source 0) or into the decompressed
+    # text of a rotated segment, together with the identity and size of that file when it was read.
+    # The first bytes guard against a new bot.log reusing the inode of the rotated one.
+    source: int
+    position: int
+    device: int
+    inode: int
+    size: int
+    head: bytes
+
+
+@dataclass(slots=True)
+class LogRecordHeader:
+    # "YYYY-MM-DD HH:MM:SS" in local time: such strings sort chronologically, so headers are
+    # compared without parsing a datetime for every line.
+    timestamp: str | None
+    level: int | None
+    logger: str | None
+
+
+def _parse_time(value: str, now: datetime) -> datetime:
+    relative = RELATIVE_TIME_RE.match(value)
+    if relative:
+        return now - timedelta(**{RELATIVE_UNITS[relative.group(2)]: int(relative.group(1))})
+    parsed = datetime.fromisoformat(value)
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def parse_log_filter(args: list[str], now: datetime | None = None) -> LogFilter:
+    # /logs level=error logger=app.bot since=2h until=2024-05-01T12:00 re=timeout|refused текст
+    now = now or datetime.now()
+    options: dict[str, object] = {}
+    words: list[str] = []
+    for arg in args:
+        key, sep, value = arg.partition("=")
+        key = key.lower()
+        if not sep or key not in {"level", "logger", "since", "until", "re"}:
+            words.append(arg)
+            continue
+        if not value:
+            raise ValueError(f"Пустое значение для {key}")
+        if key == "level":
+            if value.upper() not in LOG_LEVELS:
+                raise ValueError(f"Неизвестный уровень: {value}")
+            options["min_level"] = LOG_LEVELS[value.upper()]
+        elif key == "logger":
+            options["logger"] = value
+        elif key in {"since", "until"}:
+            try:
+                options[key] = _parse_time(value, now)
+            except ValueError:
+                raise ValueError(f"Некорректное время: {value}") from None
+        else:
+            try:
+                options["pattern"] = re.compile(value, re.IGNORECASE)
+            except re.error:
+                raise ValueError(f"Некорректное регулярное выражение: {value}") from None
+    if words:
+        options["text"] = " ".join(words).casefold()
+    return LogFilter(**options)
+
+
+def parse_record_header(line: str) -> LogRecordHeader | None:
+    # Returns None for continuation lines such as traceback frames.
+    if line.startswith("{"):
+        try:
+            payload = json.loads(line)
+            timestamp = f"{datetime.fromisoformat(payload['ts']).astimezone():{TIMESTAMP_FORMAT}}"
+        except (ValueError, KeyError, TypeError):
+            return None
+        return LogRecordHeader(timestamp, LOG_LEVELS.get(str(payload.get("level"))), payload.get("logger"))
+    match = TEXT_RECORD_RE.match(line)
+    if match is None:
+        return None
+    return LogRecordHeader(match.group(1), LOG_LEVELS.get(match.group(2)), match.group(3))
+
+
+def _time_key(value: datetime | None) -> str | None:
+    return None if value is None else f"{value:{TIMESTAMP_FORMAT}}"
+
+
+def _matches(
+    log_filter: LogFilter,
+    header: LogRecordHeader | None,
+    text: str,
+    since: str | None,
+    until: str | None,
+) -> bool:
+    if log_filter.min_level is not None:
+        if header is None or header.level is None or header.level < log_filter.min_level:
+            return False
+    if log_filter.logger is not None:
+        name = header.logger if header else None
+        if name is None or not (name == log_filter.logger or name.startswith(f"{log_filter.logger}.")):
+            return False
+    if since is not None or until is not None:
+        if header is None or header.timestamp is None:
+            return False
+        if since is not None and header.timestamp < since:
+            return False
+        if until is not None and header.timestamp > until:
+            return False
+    if log_filter.text is not None and log_filter.text not in text.casefold():
+        return False
+    if log_filter.pattern is not None and log_filter.pattern.search(text) is None:
+        return False
+    return True
+
+
+def _read_lines_backwards(file_obj: BinaryIO, end: int) -> Iterator[tuple[int, str]]:
+    # Yields (start offset, line) from `end` towards the start of the file, reading large chunks.
+    position = end
+    carry = b""
+    while position > 0:
+        read_size = min(LOG_SCAN_CHUNK_SIZE, position)
+        position -= read_size
+        file_obj.seek(position)
+        data = file_obj.read(read_size) + carry
+        lines = data.split(b"\n")
+        # The first piece may continue in the previous chunk, so it waits for the next read.
+        carry = lines[0]
+        start = position + len(data)
+        for line in reversed(lines[1:]):
+            start -= len(line) + 1
+            if line:
+                yield start + 1, line.decode("utf-8", errors="ignore")
+    if carry:
+        yield 0, carry.decode("utf-8", errors="ignore")
+
+
+def _iter_lines_backwards(path: Path, end: int | None) -> Iterator[tuple[int, str]]:
+    with path.open("rb") as file_obj:
+        yield from _read_lines_backwards(file_obj, file_obj.seek(0, os.SEEK_END) if end is None else end)
+
+
+def _iter_segment_backwards(path: Path, end: int | None) -> Iterator[tuple[int, str]]:
+    # A gzip stream cannot seek from its end, so the line index supplies the decompressed size.
+    # Seeking back rewinds and decompresses again, but only one chunk is held at a time.
+    if end is None:
+        stat = path.stat()
+        line_ends = _segment_line_ends(path, stat.st_mtime_ns, stat.st_size)
+        end = line_ends[-1] if line_ends else 0
+    with _open_segment(path) as file_obj:
+        yield from _read_lines_backwards(file_obj, end)
+
+
+def _file_head(path: Path) -> bytes:
+    with path.open("rb") as file_obj:
+        return file_obj.read(LOG_CURSOR_HEAD_SIZE)
+
+
+def _resume_source(sources: list[Path], cursor: LogCursor) -> int | None:
+    # Rotation renames segments (bot.log.1.gz becomes bot.log.2.gz), so a segment is looked up
+    # by inode. bot.log itself is compressed into a new file when it rotates; a replaced or
+    # truncated bot.log no longer matches and the scan has to start over.
+    candidates = [0] if cursor.source == 0 else range(1, len(sources))
+    for number in candidates:
+        try:
+            stat = sources[number].stat()
+            if (stat.st_dev, stat.st_ino) != (cursor.device, cursor.inode) or stat.st_size < cursor.size:
+                continue
+            if _file_head(sources[number]) == cursor.head:
+                return number
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def scan_log(
+    path: Path,
+    log_filter: LogFilter,
+    *,
+    limit: int,
+    cursor: LogCursor | None = None,
+) -> tuple[list[str], LogCursor | None]:
+    # Walks bot.log and then its rotated segments from newest to oldest and stops as soon as
+    # `limit` records matched. The returned cursor resumes the scan right before the oldest
+    # record returned; None means there is nothing older left. If the file the cursor points
+    # into was rotated away in between, the scan restarts from the newest record.
+    sources = [path, *rotated_segments(path)]
+    source_number, end = 0, None
+    if cursor is not None:
+        resumed = _resume_source(sources, cursor)
+        if resumed is not None:
+            source_number, end = resumed, cursor.position
+    since, until = _time_key(log_filter.since), _time_key(log_filter.until)
+    found: list[str] = []
+
+    for number in range(source_number, len(sources)):
+        source = sources[number]
+        iterator = _iter_lines_backwards if number == 0 else _iter_segment_backwards
+        pending: list[str] = []
+        try:
+            stat = source.stat()
+            head = _file_head(source)
+            for start, line in iterator(source, end if number == source_number else None):
+                line = line.rstrip("\r")
+                header = parse_record_header(line)
+                if header is None and start > 0:
+                    # Continuation lines belong to the record header that precedes them.
+                    pending.append(line)
+                    continue
+                text = "\n".join([line, *reversed(pending)])
+                pending.clear()
+                if since is not None and header is not None and header.timestamp is not None:
+                    if header.timestamp < since:
+                        # Records are chronological, everything further back is older still.
+                        return list(reversed(found)), None
+                if _matches(log_filter, header, text, since, until):
+                    found.append(text)
+                    if len(found) >= limit:
+                        next_cursor = LogCursor(number, start, stat.st_dev, stat.st_ino, stat.st_size, head)
+                        return list(reversed(found)), next_cursor
+        except (FileNotFoundError, EOFError, gzip.BadGzipFile):
+            # The segment was rotated away or is still being compressed.
+            break
+    return list(reversed(found)), None
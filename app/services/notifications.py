@@ -6,6 +6,9 @@ from aiogram import Bot
 
 from app.config import Settings
 from app.db.models import Order
+from app.metrics import NOTIFICATION_MESSAGES, NOTIFICATION_SEND_DURATION
+from app.schemas.order import OrderView
+from app.services.fanout import FanOut, FanOutReport
 from app.services.users import UserService
 
 
@@ -13,7 +16,7 @@ logger = logging.getLogger(__name__)
 NOTIFICATION_ROLES = ("admin", "developer")
 
 
-def format_order_message(order: Order) -> str:
+def format_order_message(order: Order | OrderView) -> str:
     return (
         f"📩 Новый заказ (ID: {order.id})\n"
         f"👤 Имя: {order.name}\n"
@@ -27,9 +30,10 @@ def format_order_message(order: Order) -> str:
 
 
 class NotificationService:
-    def __init__(self, settings: Settings, user_service: UserService) -> None:
+    def __init__(self, settings: Settings, user_service: UserService, fanout: FanOut | None = None) -> None:
         self.settings = settings
         self.user_service = user_service
+        self.fanout = fanout or FanOut()
         self._bot: Bot | None = None
 
     def _get_bot(self) -> Bot | None:
@@ -39,22 +43,42 @@ class NotificationService:
             self._bot = Bot(token=self.settings.bot_token)
         return self._bot
 
-    async def notify_new_order(self, order: Order) -> None:
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.settings.bot_token)
+
+    async def recipients(self) -> list[int]:
+        recipients = await self.user_service.list_ids_by_roles(NOTIFICATION_ROLES)
+        return list(dict.fromkeys(recipients))
+
+    async def send_order(self, order: Order | OrderView, recipients: list[int]) -> list[int]:
+        report = await self.fan_out_order(order, recipients)
+        return report.failed
+
+    async def fan_out_order(self, order: Order | OrderView, recipients: list[int]) -> FanOutReport:
         bot = self._get_bot()
         if bot is None:
             logger.warning("BOT_TOKEN is not configured, notification skipped")
-            return
-
-        recipients = await self.user_service.list_ids_by_roles(NOTIFICATION_ROLES)
-        if not recipients:
-            return
+            NOTIFICATION_MESSAGES.inc(len(recipients), outcome="skipped")
+            return FanOutReport()
 
         text = format_order_message(order)
-        for chat_id in set(recipients):
-            try:
-                await bot.send_message(chat_id=chat_id, text=text)
-            except Exception:
-                logger.exception("Failed to send notification to %s", chat_id)
+
+        async def send(chat_id: int) -> None:
+            await bot.send_message(chat_id=chat_id, text=text)
+
+        report = await self.fanout.send(recipients, send)
+        for result in report.results:
+            NOTIFICATION_MESSAGES.inc(outcome="sent" if result.ok else "failed")
+            NOTIFICATION_SEND_DURATION.observe(result.elapsed)
+        logger.info(
+            "Order %s notification: %s sent, %s failed in %.3fs",
+            order.id,
+            len(report.sent),
+            len(report.failed),
+            report.elapsed,
+        )
+        return report
 
     async def close(self) -> None:
         if self._bot is not None:
@@ -1,22 +1,44 @@
 from __future__ import annotations
 
 import uuid
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable
 from datetime import datetime
+from typing import Literal
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Order
-from app.db.repositories import OrderRepository
+from app.db.repositories import (
+    OrderFilter,
+    OrderPage,
+    OrderRepository,
+    OrderSearchPage,
+    OrderStats,
+    OrderSummary,
+    OutboxRepository,
+)
+from app.db.session import read_scope, write_scope
 from app.schemas.feedback import FeedbackPayload
+from app.schemas.order import OrderView
 
 
 class OrderService:
-    def __init__(self, session_factory: Callable[[], AsyncSession]) -> None:
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        read_session_factory: Callable[[], AsyncSession] | None = None,
+    ) -> None:
         self.session_factory = session_factory
+        self.read_session_factory = read_session_factory or session_factory
 
-    async def create_from_feedback(self, payload: FeedbackPayload, source: str = "web") -> Order:
-        async with self.session_factory() as session:
+    async def create_from_feedback(
+        self,
+        payload: FeedbackPayload,
+        source: str = "web",
+        *,
+        enqueue_notification: bool = False,
+    ) -> Order:
+        async with write_scope(self.session_factory) as session:
             repo = OrderRepository(session)
             order = Order(
                 id=uuid.uuid4().hex[:12],
@@ -30,35 +52,75 @@ class OrderService:
                 created_at=datetime.now(),
                 updated_at=datetime.now(),
             )
+            if enqueue_notification:
+                OutboxRepository(session).enqueue(order.id)
             return await repo.create(order)
 
-    async def list_recent_orders(self, limit: int = 10) -> list[Order]:
-        async with self.session_factory() as session:
+    async def list_recent_orders(self, limit: int = 10) -> list[OrderView]:
+        async with read_scope(self.read_session_factory) as session:
             repo = OrderRepository(session)
-            return await repo.list_recent(limit)
+            return await repo.list_views(limit, newest_first=True)
 
-    async def list_orders(self) -> list[Order]:
-        async with self.session_factory() as session:
+    async def list_orders(self) -> list[OrderView]:
+        async with read_scope(self.read_session_factory) as session:
             repo = OrderRepository(session)
-            return await repo.list_all()
+            return await repo.list_views()
 
-    async def get_order(self, order_id: str) -> Order | None:
-        async with self.session_factory() as session:
+    async def list_orders_page(
+        self,
+        *,
+        anchor_id: str | None = None,
+        direction: Literal["older", "newer"] = "older",
+        limit: int = 10,
+        filters: OrderFilter | None = None,
+    ) -> OrderPage:
+        async with read_scope(self.read_session_factory) as session:
             repo = OrderRepository(session)
-            return await repo.get_by_id(order_id)
+            return await repo.page(limit, anchor_id=anchor_id, direction=direction, filters=filters)
+
+    async def iter_orders(
+        self,
+        *,
+        chunk_size: int = 500,
+        filters: OrderFilter | None = None,
+    ) -> AsyncIterator[list[OrderView]]:
+        async with read_scope(self.read_session_factory) as session:
+            repo = OrderRepository(session)
+            async for chunk in repo.stream_views(chunk_size, filters):
+                yield chunk
+
+    async def list_filtered(self, filters: OrderFilter, limit: int = 100) -> list[OrderSummary]:
+        async with read_scope(self.read_session_factory) as session:
+            repo = OrderRepository(session)
+            return await repo.list_filtered(filters, limit)
+
+    async def search(self, query: str, *, limit: int = 10, offset: int = 0) -> OrderSearchPage:
+        async with read_scope(self.read_session_factory) as session:
+            repo = OrderRepository(session)
+            return await repo.search(query, limit, offset)
+
+    async def get_stats(self) -> OrderStats:
+        async with read_scope(self.read_session_factory) as session:
+            repo = OrderRepository(session)
+            return await repo.stats()
+
+    async def get_order(self, order_id: str) -> OrderView | None:
+        async with read_scope(self.read_session_factory) as session:
+            repo = OrderRepository(session)
+            return await repo.get_view(order_id)
 
     async def update_order_status(self, order_id: str, status: str) -> Order | None:
-        async with self.session_factory() as session:
+        async with write_scope(self.session_factory) as session:
             repo = OrderRepository(session)
             return await repo.update_status(order_id, status)
 
     async def delete_order(self, order_id: str) -> bool:
-        async with self.session_factory() as session:
+        async with write_scope(self.session_factory) as session:
             repo = OrderRepository(session)
             return await repo.delete(order_id)
 
     async def order_exists(self, order_id: str) -> bool:
-        async with self.session_factory() as session:
+        async with read_scope(self.read_session_factory) as session:
             repo = OrderRepository(session)
             return await repo.exists(order_id)
 
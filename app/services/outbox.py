@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.repositories import OrderRepository, OutboxRepository
+from app.metrics import OUTBOX_DELIVERIES
+from app.services.notifications import NotificationService
+
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationOutbox:
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        notification_service: NotificationService,
+        *,
+        read_session_factory: Callable[[], AsyncSession] | None = None,
+        workers: int = 2,
+        max_attempts: int = 5,
+        base_delay: float = 5.0,
+        max_delay: float = 600.0,
+        poll_interval: float = 30.0,
+        batch_size: int = 50,
+        shutdown_timeout: float = 10.0,
+        lease_timeout: float = 900.0,
+    ) -> None:
+        self.session_factory = session_factory
+        # Polling and the per-entry lookups only read, so they stay off the single writer
+        # connection that order and user writes queue for.
+        self.read_session_factory = read_session_factory or session_factory
+        self.notification_service = notification_service
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.shutdown_timeout = shutdown_timeout
+        # How long a claimed entry stays with this process; it must outlast one delivery,
+        # including Telegram's retry_after waits.
+        self.lease_timeout = lease_timeout
+        self._queue: asyncio.Queue[int | None] | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._in_flight: set[int] = set()
+        self._tasks: list[asyncio.Task[None]] = []
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._in_flight)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._dispatch_loop(), name="outbox-dispatcher")]
+        self._tasks.extend(
+            asyncio.create_task(self._worker_loop(), name=f"outbox-worker-{index}")
+            for index in range(self.workers)
+        )
+
+    def wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        if not tasks:
+            return
+        # Cancelling a task in the middle of a statement can leave its pooled aiosqlite
+        # connection behind, so let the loops finish their current step and exit.
+        self._stopping = True
+        self.wake()
+        await asyncio.wait(tasks[:1], timeout=self.shutdown_timeout)
+        queue = self._queue
+        if queue is not None:
+            while not queue.empty():
+                queue.get_nowait()
+                queue.task_done()
+            for _ in tasks[1:]:
+                queue.put_nowait(None)
+            await asyncio.wait(tasks[1:], timeout=self.shutdown_timeout)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._in_flight.clear()
+        self._queue = None
+        self._wakeup = None
+
+    def backoff(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** max(attempts - 1, 0))
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _dispatch_loop(self) -> None:
+        assert self._wakeup is not None
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                delay = await self._dispatch_due()
+            except Exception:
+                logger.exception("Failed to read notification outbox")
+                delay = self.poll_interval
+            if self._stopping:
+                break
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dispatch_due(self) -> float:
+        assert self._queue is not None
+        now = datetime.now()
+        async with self.read_session_factory() as session:
+            repo = OutboxRepository(session)
+            entries = await repo.list_due(now, self.batch_size, exclude_ids=self._in_flight)
+            next_attempt_at = await repo.next_attempt_at(now)
+
+        for entry in entries:
+            self._in_flight.add(entry.id)
+            self._queue.put_nowait(entry.id)
+
+        if next_attempt_at is None:
+            return self.poll_interval
+        return min(self.poll_interval, max((next_attempt_at - now).total_seconds(), 0.0))
+
+    async def _worker_loop(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            entry_id = await queue.get()
+            if entry_id is None:
+                queue.task_done()
+                return
+            try:
+                status = await self.deliver(entry_id)
+            except Exception:
+                OUTBOX_DELIVERIES.inc(status="error")
+                logger.exception("Failed to deliver outbox entry %s", entry_id)
+            else:
+                if status is not None:
+                    OUTBOX_DELIVERIES.inc(status=status)
+            finally:
+                self._in_flight.discard(entry_id)
+                queue.task_done()
+                if queue.empty():
+                    self.wake()
+
+    async def deliver(self, entry_id: int) -> str | None:
+        # _in_flight only protects against this process; the claim protects against the others.
+        now = datetime.now()
+        lease_until = now + timedelta(seconds=self.lease_timeout)
+        async with self.session_factory() as session:
+            entry = await OutboxRepository(session).claim(entry_id, now, lease_until)
+        if entry is None:
+            return None
+        attempts = entry.attempts
+        pending_recipients = entry.pending_recipients
+        async with self.read_session_factory() as session:
+            order = await OrderRepository(session).get_view(entry.order_id)
+
+        if order is None or not self.notification_service.is_configured:
+            reason = "order deleted" if order is None else "BOT_TOKEN is not configured"
+            await self._update(entry_id, lease_until, status="skipped", last_error=reason)
+            return "skipped"
+
+        if pending_recipients is None:
+            recipients = await self.notification_service.recipients()
+        else:
+            recipients = [int(chat_id) for chat_id in json.loads(pending_recipients)]
+        failed = await self.notification_service.send_order(order, recipients)
+        attempts += 1
+        if not failed:
+            await self._update(
+                entry_id,
+                lease_until,
+                status="sent",
+                attempts=attempts,
+                pending_recipients=None,
+                last_error=None,
+            )
+            return "sent"
+
+        status = "failed" if attempts >= self.max_attempts else "pending"
+        if status == "failed":
+            logger.error("Giving up on outbox entry %s after %s attempts", entry_id, attempts)
+        await self._update(
+            entry_id,
+            lease_until,
+            status=status,
+            attempts=attempts,
+            pending_recipients=json.dumps(failed),
+            last_error=f"Failed recipients: {', '.join(str(chat_id) for chat_id in failed)}",
+            next_attempt_at=datetime.now() + timedelta(seconds=self.backoff(attempts)),
+        )
+        return status
+
+    async def _update(self, entry_id: int, lease_until: datetime, **values: object) -> None:
+        async with self.session_factory() as session:
+            updated = await OutboxRepository(session).update_entry(entry_id, lease_until=lease_until, **values)
+        if not updated:
+            # The lease ran out mid-delivery and the entry may already be with another worker.
+            logger.warning("Lost the lease on outbox entry %s before recording its result", entry_id)
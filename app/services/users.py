@@ -6,54 +6,101 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import UserRole
 from app.db.repositories import UserRepository
+from app.db.session import read_scope, write_scope
+from app.services.cache import TTLCache, VersionStamp
 
 
 ROLE_PRIORITY: dict[str, int] = {"user": 1, "admin": 2, "developer": 3}
 
 
 class UserService:
-    def __init__(self, session_factory: Callable[[], AsyncSession]) -> None:
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        read_session_factory: Callable[[], AsyncSession] | None = None,
+        *,
+        version_stamp: VersionStamp | None = None,
+        recipients_ttl: float = 300.0,
+        role_ttl: float = 300.0,
+        guest_ttl: float = 30.0,
+        role_cache_size: int = 4096,
+    ) -> None:
         self.session_factory = session_factory
+        self.read_session_factory = read_session_factory or session_factory
+        self.version_stamp = version_stamp or VersionStamp()
+        self.guest_ttl = guest_ttl
+        self._recipients: TTLCache[tuple[str, ...], list[int]] = TTLCache(maxsize=16, ttl=recipients_ttl)
+        self._roles: TTLCache[int, str] = TTLCache(maxsize=role_cache_size, ttl=role_ttl)
+
+    def invalidate(self) -> None:
+        self._recipients.clear()
+        self._roles.clear()
+        self.version_stamp.bump()
+
+    def cache_stats(self) -> dict[str, dict[str, int]]:
+        return {"roles": self._roles.stats(), "recipients": self._recipients.stats()}
+
+    def _sync_caches(self) -> None:
+        version = self.version_stamp.current()
+        self._roles.sync(version)
+        self._recipients.sync(version)
 
     async def get_role(self, telegram_id: int) -> str:
-        async with self.session_factory() as session:
+        self._sync_caches()
+        cached = self._roles.get(telegram_id)
+        if cached is not None:
+            return cached
+
+        async with read_scope(self.read_session_factory) as session:
             repo = UserRepository(session)
-            user = await repo.get_by_telegram_id(telegram_id)
-            if user is None:
-                return "guest"
-            return user.role.value
+            role = await repo.get_role(telegram_id)
+        if role is None:
+            self._roles.set(telegram_id, "guest", ttl=self.guest_ttl)
+            return "guest"
+        self._roles.set(telegram_id, role.value)
+        return role.value
 
     async def list_ids_by_roles(self, roles: Iterable[str]) -> list[int]:
         valid_roles = [UserRole(role) for role in roles]
-        async with self.session_factory() as session:
+        key = tuple(sorted(role.value for role in valid_roles))
+        self._sync_caches()
+        cached = self._recipients.get(key)
+        if cached is not None:
+            return list(cached)
+
+        async with read_scope(self.read_session_factory) as session:
             repo = UserRepository(session)
-            users = await repo.list_by_roles(valid_roles)
-            return [u.telegram_id for u in users]
+            ids = await repo.list_ids_by_roles(valid_roles)
+        self._recipients.set(key, ids)
+        return list(ids)
 
     async def upsert_role(self, telegram_id: int, role: str, *, keep_higher_role: bool = False) -> str:
         if role not in ROLE_PRIORITY:
             raise ValueError("Недопустимая роль")
         new_role = UserRole(role)
-        async with self.session_factory() as session:
+        async with write_scope(self.session_factory) as session:
             repo = UserRepository(session)
-            current = await repo.get_by_telegram_id(telegram_id)
-            if current and keep_higher_role:
-                if ROLE_PRIORITY[current.role.value] >= ROLE_PRIORITY[new_role.value]:
-                    return current.role.value
-            updated = await repo.upsert_role(telegram_id, new_role)
-            return updated.role.value
+            updated = await repo.upsert_role(telegram_id, new_role, only_upgrade=keep_higher_role)
+            if updated is None:
+                current = await repo.get_role(telegram_id)
+                return current.value if current else new_role.value
+        self.invalidate()
+        return updated.role.value
 
     async def revoke(self, telegram_id: int) -> bool:
-        async with self.session_factory() as session:
+        async with write_scope(self.session_factory) as session:
             repo = UserRepository(session)
-            return await repo.delete_user(telegram_id)
+            deleted = await repo.delete_user(telegram_id)
+        if deleted:
+            self.invalidate()
+        return deleted
 
     async def users_by_role(self) -> dict[str, list[int]]:
-        result = {"developer": [], "admin": [], "user": []}
-        async with self.session_factory() as session:
+        result: dict[str, list[int]] = {"developer": [], "admin": [], "user": []}
+        async with read_scope(self.read_session_factory) as session:
             repo = UserRepository(session)
-            for role in (UserRole.developer, UserRole.admin, UserRole.user):
-                users = await repo.list_by_roles([role])
-                result[role.value] = [u.telegram_id for u in users]
+            members = await repo.list_role_members()
+        for role, telegram_id in members:
+            result[role.value].append(telegram_id)
         return result
 
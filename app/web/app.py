@@ -2,25 +2,40 @@ from __future__ import annotations
 
 from litestar import Litestar
 
-from app.container import notification_service, settings
+from app.container import notification_outbox, notification_service, settings
 from app.db.session import close_engine
 from app.logging import configure_logging
+from app.web.routes_export import route_handlers as export_handlers
 from app.web.routes_feedback import route_handlers as feedback_handlers
+from app.web.routes_metrics import MetricsMiddleware
+from app.web.routes_metrics import route_handlers as metrics_handlers
+from app.web.routes_pages import STATIC_PAGES, renderer
 from app.web.routes_pages import route_handlers as pages_handlers
 from app.web.routes_static import route_handlers as static_handlers
 
 
 async def on_startup() -> None:
-    configure_logging(settings.bot_log_path)
+    configure_logging(
+        settings.bot_log_path,
+        max_bytes=settings.log_max_bytes,
+        backup_count=settings.log_backup_count,
+        rotate_interval=settings.log_rotate_interval_hours * 3600,
+        log_format=settings.log_format,
+        rotate=False,
+    )
+    renderer.warm_pages(STATIC_PAGES.values())
+    await notification_outbox.start()
 
 
 async def on_shutdown() -> None:
+    await notification_outbox.stop()
     await notification_service.close()
     await close_engine()
 
 
 app = Litestar(
-    route_handlers=[*pages_handlers, *feedback_handlers, *static_handlers],
+    route_handlers=[*pages_handlers, *feedback_handlers, *export_handlers, *metrics_handlers, *static_handlers],
+    middleware=[MetricsMiddleware],
     on_startup=[on_startup],
     on_shutdown=[on_shutdown],
 )
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from app.web.compression import ENCODING_SUFFIXES
+
+
+logger = logging.getLogger(__name__)
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+IMAGE_MANIFEST_NAME = "image-manifest.json"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+HASH_LENGTH = 8
+
+
+def fingerprint(path: Path) -> str:
+    with path.open("rb") as file_obj:
+        return hashlib.file_digest(file_obj, "sha256").hexdigest()[:HASH_LENGTH]
+
+
+def hashed_name(name: str, digest: str) -> str:
+    path = Path(name)
+    if not path.suffix:
+        return f"{name}.{digest}"
+    return path.with_name(f"{path.stem}.{digest}{path.suffix}").as_posix()
+
+
+@lru_cache(maxsize=1024)
+def _current_fingerprint(path: Path, mtime_ns: int, size: int) -> str:
+    # Keyed by mtime and size, so every asset is hashed once per change rather than per request.
+    return fingerprint(path)
+
+
+def matches_hashed_name(path: Path, name: str, hashed: str) -> bool:
+    # False when the file changed after the manifest was built or an old hash is requested.
+    try:
+        stat = path.stat()
+    except OSError:
+        return False
+    return hashed_name(name, _current_fingerprint(path, stat.st_mtime_ns, stat.st_size)) == hashed
+
+
+class JsonManifest(ABC):
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.version = ""
+        self.mtime_ns = 0
+        self._loaded = False
+        self.refresh()
+
+    def refresh(self) -> None:
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        if self._loaded and mtime_ns == self.mtime_ns:
+            return
+
+        data: dict[str, Any] = {}
+        if mtime_ns:
+            try:
+                data = self._parse(json.loads(self.path.read_text(encoding="utf-8")))
+            except (OSError, ValueError, KeyError, AttributeError, TypeError):
+                logger.exception("Failed to load manifest %s", self.path)
+                data = {}
+        self._apply(data)
+        self.mtime_ns = mtime_ns
+        self.version = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        self._loaded = True
+
+    @abstractmethod
+    def _parse(self, raw: Any) -> dict[str, Any]: ...
+
+    @abstractmethod
+    def _apply(self, data: dict[str, Any]) -> None: ...
+
+    def _write(self, payload: dict[str, Any]) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp_path.replace(self.path)
+        self._loaded = False
+        self.refresh()
+
+
+class AssetManifest(JsonManifest):
+    def __init__(self, static_dir: Path, manifest_path: Path | None = None) -> None:
+        self.static_dir = static_dir
+        self._files: dict[str, str] = {}
+        self._originals: dict[str, str] = {}
+        super().__init__(manifest_path or static_dir / ASSET_MANIFEST_NAME)
+
+    def _parse(self, raw: Any) -> dict[str, Any]:
+        return {str(key): str(value) for key, value in raw["files"].items()}
+
+    def _apply(self, data: dict[str, Any]) -> None:
+        self._files = data
+        self._originals = {hashed: original for original, hashed in data.items()}
+
+    def url(self, filename: str) -> str:
+        name = filename.lstrip("/")
+        return f"/assets/{self._files.get(name, name)}"
+
+    def original_name(self, filename: str) -> str | None:
+        return self._originals.get(filename.lstrip("/"))
+
+    def build(self) -> dict[str, str]:
+        files: dict[str, str] = {}
+        skipped_suffixes = set(ENCODING_SUFFIXES.values())
+        # Only the manifests themselves are skipped; any other *.json is a regular asset.
+        manifests = {self.path, self.static_dir / ASSET_MANIFEST_NAME, self.static_dir / IMAGE_MANIFEST_NAME}
+        for path in sorted(self.static_dir.rglob("*")):
+            if not path.is_file() or path in manifests or path.suffix in skipped_suffixes:
+                continue
+            name = path.relative_to(self.static_dir).as_posix()
+            files[name] = hashed_name(name, fingerprint(path))
+
+        self._write({"files": files})
+        return files
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import gzip
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+MIN_COMPRESS_SIZE = 1024
+COMPRESSIBLE_SUFFIXES = frozenset({".css", ".js", ".html", ".svg", ".json", ".txt", ".xml", ".map"})
+ENCODING_SUFFIXES: dict[str, str] = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass(frozen=True, slots=True)
+class CompressionResult:
+    name: str
+    raw_size: int
+    sizes: dict[str, int]
+    elapsed_ms: dict[str, float]
+
+    def saved(self, encoding: str) -> int:
+        size = self.sizes.get(encoding)
+        return 0 if size is None else self.raw_size - size
+
+
+def supported_encodings() -> tuple[str, ...]:
+    if brotli is None:
+        return ("gzip",)
+    return ("br", "gzip")
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=11)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def parse_accept_encoding(header: str | None) -> dict[str, float]:
+    accepted: dict[str, float] = {}
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding: str | None, available: Iterable[str]) -> str | None:
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best: str | None = None
+    best_quality = 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(path: Path) -> bool:
+    return path.suffix.lower() in COMPRESSIBLE_SUFFIXES
+
+
+def sidecar_path(path: Path, encoding: str) -> Path:
+    return path.with_name(path.name + ENCODING_SUFFIXES[encoding])
+
+
+def fresh_sidecars(path: Path, source_mtime_ns: int) -> list[str]:
+    encodings: list[str] = []
+    for encoding in supported_encodings():
+        try:
+            stat = sidecar_path(path, encoding).stat()
+        except OSError:
+            continue
+        if stat.st_mtime_ns >= source_mtime_ns:
+            encodings.append(encoding)
+    return encodings
+
+
+def measure(name: str, data: bytes, encodings: Iterable[str] | None = None) -> tuple[CompressionResult, dict[str, bytes]]:
+    sizes: dict[str, int] = {}
+    elapsed_ms: dict[str, float] = {}
+    bodies: dict[str, bytes] = {}
+    for encoding in encodings or supported_encodings():
+        started = time.perf_counter()
+        body = compress(data, encoding)
+        elapsed_ms[encoding] = (time.perf_counter() - started) * 1000
+        sizes[encoding] = len(body)
+        bodies[encoding] = body
+    return CompressionResult(name=name, raw_size=len(data), sizes=sizes, elapsed_ms=elapsed_ms), bodies
+
+
+def precompress_file(path: Path, root: Path | None = None) -> CompressionResult:
+    data = path.read_bytes()
+    name = path.relative_to(root).as_posix() if root is not None else path.name
+    result, bodies = measure(name, data)
+    for encoding, body in bodies.items():
+        target = sidecar_path(path, encoding)
+        if len(body) >= len(data):
+            target.unlink(missing_ok=True)
+            continue
+        target.write_bytes(body)
+    return result
+
+
+def iter_compressible_files(root: Path) -> Iterator[Path]:
+    for path in sorted(root.rglob("*")):
+        if path.is_file() and is_compressible(path) and path.stat().st_size >= MIN_COMPRESS_SIZE:
+            yield path
+
+
+def precompress_directory(root: Path) -> list[CompressionResult]:
+    return [precompress_file(path, root) for path in iter_compressible_files(root)]
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from app.web.assets import IMAGE_MANIFEST_NAME, JsonManifest
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # pragma: no cover - Pillow is only needed to build derivatives
+    Image = None
+    ImageOps = None
+    features = None
+
+
+DERIVED_DIR_NAME = "derived"
+DERIVATIVE_WIDTHS = (480, 960, 1600)
+SOURCE_SUFFIXES = frozenset({".jpg", ".jpeg", ".png"})
+GALLERY_SIZES = "(max-width: 640px) 100vw, (max-width: 1024px) 50vw, 33vw"
+
+FORMAT_MEDIA_TYPES: dict[str, str] = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+}
+FORMAT_SUFFIXES: dict[str, str] = {"avif": ".avif", "webp": ".webp", "jpeg": ".jpg", "png": ".png"}
+FORMAT_OPTIONS: dict[str, dict[str, Any]] = {
+    "avif": {"quality": 55},
+    "webp": {"quality": 78, "method": 6},
+    "jpeg": {"quality": 80, "optimize": True, "progressive": True},
+    "png": {"optimize": True},
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ResponsiveImage:
+    src: str
+    srcset: str
+    sizes: str
+    width: int
+    height: int
+    largest: str
+    sources: tuple[tuple[str, str], ...]
+
+
+def fallback_format(path: Path) -> str:
+    return "png" if path.suffix.lower() == ".png" else "jpeg"
+
+
+def modern_formats() -> tuple[str, ...]:
+    if features is None:
+        return ()
+    return tuple(fmt for fmt in ("avif", "webp") if features.check(fmt))
+
+
+def derivative_name(name: str, width: int, fmt: str) -> str:
+    path = Path(DERIVED_DIR_NAME) / name
+    return path.with_name(f"{path.stem}-{width}{FORMAT_SUFFIXES[fmt]}").as_posix()
+
+
+def iter_source_images(root: Path) -> Iterator[Path]:
+    for path in sorted(root.rglob("*")):
+        if DERIVED_DIR_NAME in path.relative_to(root).parts:
+            continue
+        if path.is_file() and path.suffix.lower() in SOURCE_SUFFIXES:
+            yield path
+
+
+class ImageManifest(JsonManifest):
+    def __init__(self, static_dir: Path, manifest_path: Path | None = None) -> None:
+        self.static_dir = static_dir
+        self._images: dict[str, dict[str, Any]] = {}
+        super().__init__(manifest_path or static_dir / IMAGE_MANIFEST_NAME)
+
+    def _parse(self, raw: Any) -> dict[str, Any]:
+        return dict(raw["images"])
+
+    def _apply(self, data: dict[str, Any]) -> None:
+        self._images = data
+
+    def responsive(
+        self,
+        src: str,
+        url: Callable[[str], str],
+        *,
+        sizes: str = GALLERY_SIZES,
+    ) -> ResponsiveImage | None:
+        entry = self._images.get(src.removeprefix("/assets/").lstrip("/"))
+        if entry is None:
+            return None
+
+        variants: dict[str, list[list[Any]]] = entry["variants"]
+        fallback = variants[entry["fallback"]]
+
+        def srcset(items: list[list[Any]]) -> str:
+            return ", ".join(f"{url(name)} {width}w" for width, name in items)
+
+        sources = tuple(
+            (FORMAT_MEDIA_TYPES[fmt], srcset(items))
+            for fmt, items in variants.items()
+            if fmt != entry["fallback"]
+        )
+        return ResponsiveImage(
+            src=url(fallback[0][1]),
+            srcset=srcset(fallback),
+            sizes=sizes,
+            width=int(entry["width"]),
+            height=int(entry["height"]),
+            largest=url(fallback[-1][1]),
+            sources=sources,
+        )
+
+    def build(
+        self,
+        sources: Iterable[Path],
+        *,
+        widths: Iterable[int] = DERIVATIVE_WIDTHS,
+        formats: Iterable[str] | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        if Image is None:
+            raise RuntimeError("Pillow is required to build image derivatives")
+
+        widths = tuple(sorted(set(widths)))
+        formats = tuple(modern_formats() if formats is None else formats)
+        images: dict[str, dict[str, Any]] = {}
+        for path in sources:
+            name = path.relative_to(self.static_dir).as_posix()
+            images[name] = self._build_image(path, name, widths, formats)
+
+        self._write({"images": images})
+        return images
+
+    def _build_image(
+        self,
+        path: Path,
+        name: str,
+        widths: tuple[int, ...],
+        formats: tuple[str, ...],
+    ) -> dict[str, Any]:
+        source_mtime_ns = path.stat().st_mtime_ns
+        fallback = fallback_format(path)
+        with Image.open(path) as opened:
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+
+        width, height = image.size
+        targets = [target for target in widths if target < width] or [width]
+        if width not in targets and width <= widths[-1]:
+            targets.append(width)
+
+        variants: dict[str, list[list[Any]]] = {}
+        for fmt in (*formats, fallback):
+            items: list[list[Any]] = []
+            for target in targets:
+                derived = derivative_name(name, target, fmt)
+                target_path = self.static_dir / derived
+                if not target_path.exists() or target_path.stat().st_mtime_ns < source_mtime_ns:
+                    self._save_variant(image, target_path, target, fmt)
+                items.append([target, derived])
+            variants[fmt] = items
+        return {"width": width, "height": height, "fallback": fallback, "variants": variants}
+
+    @staticmethod
+    def _save_variant(image: Any, target_path: Path, width: int, fmt: str) -> None:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+        if fmt == "jpeg" and resized.mode not in ("RGB", "L"):
+            resized = resized.convert("RGB")
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        resized.save(target_path, format=fmt.upper(), **FORMAT_OPTIONS[fmt])
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import tempfile
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+
+from litestar import Request, get
+from litestar.background_tasks import BackgroundTask
+from litestar.exceptions import HTTPException, TooManyRequestsException, ValidationException
+from litestar.response import File, Response, Stream
+
+from app.auth import check_bearer
+from app.container import order_service, settings
+from app.db.repositories import OrderFilter
+from app.services.export import (
+    EXPORT_CHUNK_SIZE,
+    EXPORT_MEDIA_TYPES,
+    available_formats,
+    export_filename,
+    stream_export,
+    write_export,
+)
+
+
+# Every running export holds a read-pool connection until its last chunk is read, so only
+# half of SQLITE_READ_POOL_SIZE may be busy with exports and pages keep the rest.
+EXPORT_CONCURRENCY = max(1, settings.sqlite_read_pool_size // 2)
+_active_exports = 0
+
+
+def _acquire_export_slot() -> Callable[[], None]:
+    global _active_exports
+
+    if _active_exports >= EXPORT_CONCURRENCY:
+        raise TooManyRequestsException("Too many exports in progress", headers={"Retry-After": "10"})
+    _active_exports += 1
+    released = False
+
+    def release() -> None:
+        global _active_exports
+        nonlocal released
+
+        if not released:
+            released = True
+            _active_exports -= 1
+
+    return release
+
+
+async def _release_after(stream: AsyncIterator[bytes], release: Callable[[], None]) -> AsyncIterator[bytes]:
+    try:
+        async for data in stream:
+            yield data
+    finally:
+        release()
+
+
+def _authorize(request: Request) -> None:
+    # Without EXPORT_TOKEN the endpoint does not exist at all.
+    status = check_bearer(request.headers.get("authorization", ""), settings.export_token)
+    if status is not None:
+        raise HTTPException(status_code=status)
+
+
+@get("/admin/orders/export", name="orders_export")
+async def export_orders(request: Request) -> Response:
+    _authorize(request)
+    fmt = request.query_params.get("format", "csv").lower()
+    if fmt not in available_formats():
+        raise ValidationException(f"Unsupported export format: {fmt}")
+
+    filters = OrderFilter(status=request.query_params.get("status") or None)
+    chunks = order_service.iter_orders(chunk_size=EXPORT_CHUNK_SIZE, filters=filters)
+    headers = {"Cache-Control": "no-store"}
+    filename = export_filename(fmt)
+    release = _acquire_export_slot()
+    if fmt != "xlsx":
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        # The background task frees the slot if the client disconnects before the stream starts.
+        return Stream(
+            _release_after(stream_export(chunks, fmt), release),
+            media_type=EXPORT_MEDIA_TYPES[fmt],
+            headers=headers,
+            background=BackgroundTask(release),
+        )
+
+    # XLSX is a zip archive that can only be written as a whole, so it goes through a temporary file.
+    with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp:
+        path = Path(tmp.name)
+    try:
+        await write_export(path, chunks, fmt)
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+    finally:
+        release()
+    return File(
+        path=path,
+        filename=filename,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers=headers,
+        background=BackgroundTask(path.unlink, missing_ok=True),
+    )
+
+
+route_handlers = [export_orders]
@@ -8,7 +8,7 @@ from typing import Any
 from litestar import Request, post
 from litestar.response import Response
 
-from app.container import notification_service, order_service
+from app.container import notification_outbox, order_service
 from app.schemas.feedback import FeedbackPayload
 from app.web.validation import is_valid_phone, normalize_phone
 
@@ -64,8 +64,8 @@ async def handle_feedback(request: Request) -> Response[str]:
         payload_data["telephone"] = phone
 
         payload = FeedbackPayload.from_payload(payload_data)
-        order = await order_service.create_from_feedback(payload, source="web")
-        await notification_service.notify_new_order(order)
+        await order_service.create_from_feedback(payload, source="web", enqueue_notification=True)
+        notification_outbox.wake()
         return _json_response({"status": "success"})
     except ValueError as exc:
         return _json_response({"status": "error", "message": str(exc)}, status_code=400)
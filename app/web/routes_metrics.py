@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import time
+
+from litestar import Request, get
+from litestar.exceptions import HTTPException
+from litestar.middleware import MiddlewareProtocol
+from litestar.response import Response
+from litestar.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth import check_bearer
+from app.container import settings
+from app.metrics import CONTENT_TYPE, HTTP_REQUEST_DURATION, registry
+
+
+class MetricsMiddleware(MiddlewareProtocol):
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The route template keeps label cardinality bounded, unlike the raw path.
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=scope.get("path_template") or "unmatched",
+                status=str(status),
+            )
+
+
+@get("/metrics", name="metrics", include_in_schema=False)
+async def metrics(request: Request) -> Response:
+    # Without METRICS_TOKEN the endpoint does not exist, like the export.
+    status = check_bearer(request.headers.get("authorization", ""), settings.metrics_token)
+    if status is not None:
+        raise HTTPException(status_code=status)
+    return Response(
+        registry.render(),
+        media_type=CONTENT_TYPE,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+route_handlers = [metrics]
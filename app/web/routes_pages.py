@@ -3,60 +3,82 @@ from __future__ import annotations
 from litestar import Request, get
 from litestar.response import Response
 
-from app.container import settings
+from app.container import asset_manifest, image_manifest, settings
 from app.web.catalog import SERVICES_CATALOG
 from app.web.templates import TemplateRenderer
 
 
-renderer = TemplateRenderer(settings.templates_dir)
+renderer = TemplateRenderer(settings.templates_dir, assets=asset_manifest, images=image_manifest)
+
+STATIC_PAGES: dict[str, str] = {
+    "/": "main.html",
+    "/Price": "Price.html",
+    "/price": "Price.html",
+    "/price1": "price1.html",
+    "/price2": "price2.html",
+    "/price3": "price3.html",
+    "/obrsvaz": "obrsvaz.html",
+    "/privacy": "privacy.html",
+}
 
 
 @get("/", name="main")
-async def main_page(request: Request) -> Response[str]:
-    return renderer.render("main.html", request)
+async def main_page(request: Request) -> Response[bytes]:
+    return renderer.render_page("main.html", request)
 
 
 @get("/Price", name="price_upper")
-async def price_page_upper(request: Request) -> Response[str]:
-    return renderer.render("Price.html", request)
+async def price_page_upper(request: Request) -> Response[bytes]:
+    return renderer.render_page("Price.html", request)
 
 
 @get("/price", name="price")
-async def price_page(request: Request) -> Response[str]:
-    return renderer.render("Price.html", request)
+async def price_page(request: Request) -> Response[bytes]:
+    return renderer.render_page("Price.html", request)
 
 
 @get("/price1", name="price1")
-async def price1_page(request: Request) -> Response[str]:
-    return renderer.render("price1.html", request)
+async def price1_page(request: Request) -> Response[bytes]:
+    return renderer.render_page("price1.html", request)
 
 
 @get("/price2", name="price2")
-async def price2_page(request: Request) -> Response[str]:
-    return renderer.render("price2.html", request)
+async def price2_page(request: Request) -> Response[bytes]:
+    return renderer.render_page("price2.html", request)
 
 
 @get("/price3", name="price3")
-async def price3_page(request: Request) -> Response[str]:
-    return renderer.render("price3.html", request)
+async def price3_page(request: Request) -> Response[bytes]:
+    return renderer.render_page("price3.html", request)
 
 
 @get("/obrsvaz", name="obrsvaz")
-async def obrsvaz_page(request: Request) -> Response[str]:
-    return renderer.render("obrsvaz.html", request)
+async def obrsvaz_page(request: Request) -> Response[bytes]:
+    return renderer.render_page("obrsvaz.html", request)
 
 
 @get("/privacy", name="privacy")
-async def privacy_page(request: Request) -> Response[str]:
-    return renderer.render("privacy.html", request)
+async def privacy_page(request: Request) -> Response[bytes]:
+    return renderer.render_page("privacy.html", request)
 
 
 @get("/services/{slug:str}", name="service_detail")
-async def service_detail_page(request: Request, slug: str) -> Response[str]:
+async def service_detail_page(request: Request, slug: str) -> Response[bytes]:
     service = SERVICES_CATALOG.get(slug)
     if service is None:
-        return renderer.render("service_detail.html", request, {"service": None}, status_code=404)
-    return renderer.render("service_detail.html", request, {"service": service})
+        return renderer.render_page(
+            "service_detail.html",
+            request,
+            {"service": None},
+            cache_key="service_detail:",
+            status_code=404,
+        )
+    return renderer.render_page(
+        "service_detail.html",
+        request,
+        {"service": service},
+        cache_key=f"service_detail:{slug}",
+    )
 
 
 @get("/static/{filename:path}", name="static")
@@ -1,11 +1,68 @@
 from __future__ import annotations
 
-from litestar.static_files import create_static_files_router
+import mimetypes
+from pathlib import Path
 
-from app.container import settings
+from litestar import Request, get, head
+from litestar.exceptions import NotFoundException
+from litestar.response import File
 
+from app.container import asset_manifest, settings
+from app.web.assets import IMMUTABLE_CACHE_CONTROL, matches_hashed_name
+from app.web.compression import choose_encoding, fresh_sidecars, is_compressible, sidecar_path
 
-route_handlers = [
-    create_static_files_router(path="/assets", directories=[settings.static_dir], name="assets"),
-]
 
+STATIC_ROOT = settings.static_dir.resolve()
+
+
+def _resolve_asset(filename: str) -> Path:
+    path = (STATIC_ROOT / filename.lstrip("/")).resolve()
+    if not path.is_relative_to(STATIC_ROOT) or not path.is_file():
+        raise NotFoundException(f"Asset not found: {filename}")
+    return path
+
+
+def asset_response(request: Request, filename: str) -> File:
+    headers: dict[str, str] = {}
+    hashed = filename.lstrip("/")
+    original_name = asset_manifest.original_name(hashed)
+    if original_name is not None:
+        filename = original_name
+
+    path = _resolve_asset(filename)
+    # A hashed URL is cached for a year, so it is only marked immutable while the file still
+    # has the content the hash was taken from; otherwise it is served like the plain name.
+    if original_name is not None and matches_hashed_name(path, original_name, hashed):
+        headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if not is_compressible(path):
+        return File(path=path, media_type=media_type, content_disposition_type="inline", headers=headers)
+
+    encodings = fresh_sidecars(path, path.stat().st_mtime_ns)
+    encoding = choose_encoding(request.headers.get("accept-encoding"), encodings)
+    headers["Vary"] = "Accept-Encoding"
+    if encoding is None:
+        return File(path=path, media_type=media_type, content_disposition_type="inline", headers=headers)
+
+    headers["Content-Encoding"] = encoding
+    return File(
+        path=sidecar_path(path, encoding),
+        filename=path.name,
+        media_type=media_type,
+        content_disposition_type="inline",
+        headers=headers,
+    )
+
+
+@get("/assets/{filename:path}", name="assets")
+async def serve_asset(request: Request, filename: str) -> File:
+    return asset_response(request, filename)
+
+
+@head("/assets/{filename:path}", name="assets/head")
+async def serve_asset_head(request: Request, filename: str) -> File:
+    return asset_response(request, filename)
+
+
+route_handlers = [serve_asset, serve_asset_head]
@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import hashlib
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from pathlib import Path
 from typing import Any
 
@@ -7,30 +12,207 @@ from jinja2 import Environment, FileSystemLoader, select_autoescape
 from litestar.connection import Request
 from litestar.response import Response
 
+from app.web.assets import AssetManifest
+from app.web.compression import MIN_COMPRESS_SIZE, choose_encoding, compress, supported_encodings
+from app.web.images import GALLERY_SIZES, ImageManifest, ResponsiveImage
+
+
+HTML_MEDIA_TYPE = "text/html; charset=utf-8"
+PAGE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+
+@dataclass(frozen=True, slots=True)
+class CachedPage:
+    template_name: str
+    body: bytes
+    mtime_ns: int
+    etag: str
+    last_modified: datetime
+    assets_version: str = ""
+    encoded: dict[str, bytes] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def build(
+        cls,
+        template_name: str,
+        body: bytes,
+        mtime_ns: int,
+        *,
+        assets_version: str = "",
+        assets_mtime_ns: int = 0,
+    ) -> "CachedPage":
+        modified_ns = max(mtime_ns, assets_mtime_ns)
+        last_modified = datetime.fromtimestamp(modified_ns // 1_000_000_000, tz=timezone.utc)
+        return cls(
+            template_name=template_name,
+            body=body,
+            mtime_ns=mtime_ns,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            last_modified=last_modified,
+            assets_version=assets_version,
+        )
+
+    def negotiate_encoding(self, accept_encoding: str | None) -> str | None:
+        if len(self.body) < MIN_COMPRESS_SIZE:
+            return None
+        return choose_encoding(accept_encoding, supported_encodings())
+
+    def body_for(self, encoding: str | None) -> bytes:
+        if encoding is None:
+            return self.body
+        body = self.encoded.get(encoding)
+        if body is None:
+            body = compress(self.body, encoding)
+            self.encoded[encoding] = body
+        return body
+
+    def etag_for(self, encoding: str | None) -> str:
+        if encoding is None:
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+    def headers(self, encoding: str | None = None) -> dict[str, str]:
+        headers = {
+            "ETag": self.etag_for(encoding),
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            "Cache-Control": PAGE_CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return headers
+
+    def is_fresh_for(self, request: Request[Any, Any, Any]) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if "*" in tags:
+                return True
+            return any(self.etag_for(encoding) in tags for encoding in (None, *supported_encodings()))
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if not if_modified_since:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return self.last_modified <= since
+
 
 class TemplateRenderer:
-    def __init__(self, templates_dir: Path) -> None:
+    def __init__(
+        self,
+        templates_dir: Path,
+        *,
+        cache_pages: bool = True,
+        assets: AssetManifest | None = None,
+        images: ImageManifest | None = None,
+    ) -> None:
+        self.templates_dir = templates_dir
+        self.cache_pages = cache_pages
+        self.assets = assets
+        self.images = images
         self.env = Environment(
             loader=FileSystemLoader(str(templates_dir)),
             autoescape=select_autoescape(("html", "xml")),
         )
+        self._pages: dict[str, CachedPage] = {}
 
-    def render(
+    def render_page(
         self,
         template_name: str,
         request: Request[Any, Any, Any],
         context: dict[str, Any] | None = None,
         *,
+        cache_key: str | None = None,
         status_code: int = 200,
-    ) -> Response[str]:
+    ) -> Response[bytes]:
+        page = self.get_page(template_name, context, cache_key=cache_key)
+        if status_code != 200:
+            return Response(content=page.body, media_type=HTML_MEDIA_TYPE, status_code=status_code)
+
+        encoding = page.negotiate_encoding(request.headers.get("accept-encoding"))
+        headers = page.headers(encoding)
+        if page.is_fresh_for(request):
+            headers.pop("Content-Encoding", None)
+            return Response(content=b"", status_code=304, headers=headers)
+        return Response(
+            content=page.body_for(encoding),
+            media_type=HTML_MEDIA_TYPE,
+            status_code=status_code,
+            headers=headers,
+        )
+
+    def get_page(
+        self,
+        template_name: str,
+        context: dict[str, Any] | None = None,
+        *,
+        cache_key: str | None = None,
+    ) -> CachedPage:
+        # Cached pages are rendered without a request, so templates served
+        # through the cache must only depend on the given context.
+        key = cache_key or template_name
+        mtime_ns = self._template_mtime_ns(template_name)
+        assets_version, assets_mtime_ns = self._manifests_state()
+        page = self._pages.get(key)
+        if page is not None and page.mtime_ns == mtime_ns and page.assets_version == assets_version:
+            return page
+
         payload = dict(context or {})
-        payload["request"] = request
         payload["url_for"] = self.url_for
+        payload["responsive_image"] = self.responsive_image
         html = self.env.get_template(template_name).render(**payload)
-        return Response(content=html, media_type="text/html; charset=utf-8", status_code=status_code)
+        page = CachedPage.build(
+            template_name,
+            html.encode("utf-8"),
+            mtime_ns,
+            assets_version=assets_version,
+            assets_mtime_ns=assets_mtime_ns,
+        )
+        if self.cache_pages:
+            self._pages[key] = page
+        return page
+
+    def warm_pages(self, template_names: Iterable[str]) -> None:
+        for template_name in template_names:
+            page = self.get_page(template_name)
+            if len(page.body) >= MIN_COMPRESS_SIZE:
+                for encoding in supported_encodings():
+                    page.body_for(encoding)
+
+    def clear_pages(self) -> None:
+        self._pages.clear()
+
+    def responsive_image(self, src: str, sizes: str = GALLERY_SIZES) -> ResponsiveImage | None:
+        if self.images is None:
+            return None
+        return self.images.responsive(src, self._static_url, sizes=sizes)
+
+    def _static_url(self, filename: str) -> str:
+        return self.url_for("static", filename=filename)
+
+    def _manifests_state(self) -> tuple[str, int]:
+        versions: list[str] = []
+        mtime_ns = 0
+        for manifest in (self.assets, self.images):
+            if manifest is None:
+                continue
+            manifest.refresh()
+            versions.append(manifest.version)
+            mtime_ns = max(mtime_ns, manifest.mtime_ns)
+        return ":".join(versions), mtime_ns
+
+    def _template_mtime_ns(self, template_name: str) -> int:
+        try:
+            return (self.templates_dir / template_name).stat().st_mtime_ns
+        except OSError:
+            return 0
 
-    @staticmethod
-    def url_for(route_name: str, **params: Any) -> str:
+    def url_for(self, route_name: str, **params: Any) -> str:
         routes: dict[str, str] = {
             "main": "/",
             "price": "/price",
@@ -45,6 +227,8 @@ class TemplateRenderer:
             return f"/services/{slug}"
         if route_name == "static":
             filename = params.get("filename", "")
+            if self.assets is not None:
+                return self.assets.url(filename)
             return f"/assets/{filename}"
         if route_name in routes:
             return routes[route_name]
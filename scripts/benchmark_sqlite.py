@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Sequence
+from dataclasses import replace
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.config import get_settings
+from app.db.base import Base
+from app.db.session import build_engine
+from app.schemas.feedback import FeedbackPayload
+from app.services.orders import OrderService
+from app.services.users import UserService
+
+
+PROFILES = ("default", "tuned")
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run concurrent feedback inserts and bot reads against SQLite with and without the tuning profile",
+    )
+    parser.add_argument("--profile", choices=(*PROFILES, "both"), default="both")
+    parser.add_argument("--writers", type=int, default=2, help="Processes inserting orders and updating their status")
+    parser.add_argument("--readers", type=int, default=2, help="Processes browsing orders like the bot")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run")
+    return parser.parse_args(argv)
+
+
+def _engine(profile: str, database_url: str) -> AsyncEngine:
+    if profile == "default":
+        return create_async_engine(database_url)
+    return build_engine(replace(get_settings(), database_url=database_url))
+
+
+async def _work(kind: str, profile: str, database_url: str, seconds: float) -> tuple[int, int, int, list[float]]:
+    engine = _engine(profile, database_url)
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count_statement(*args: object) -> None:
+        nonlocal statements
+        statements += 1
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    orders = OrderService(session_factory)
+    users = UserService(session_factory, recipients_ttl=0, role_ttl=0, guest_ttl=0)
+    payload = FeedbackPayload(
+        name="Benchmark",
+        telephone="+79990000000",
+        email="bench@example.com",
+        subject="Benchmark",
+        message="Concurrent insert",
+    )
+    done = errors = 0
+    latencies: list[float] = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            if kind == "writer":
+                order = await orders.create_from_feedback(payload, enqueue_notification=True)
+                await orders.update_order_status(order.id, "in_progress")
+            else:
+                await orders.list_orders_page(limit=10)
+                await orders.get_stats()
+                await users.get_role(1)
+        except OperationalError as exc:
+            if "locked" not in str(exc):
+                raise
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+        done += 1
+    await engine.dispose()
+    return done, errors, statements, latencies
+
+
+def _run_worker(args: tuple[str, str, str, float]) -> tuple[str, int, int, int, list[float]]:
+    kind, profile, database_url, seconds = args
+    done, errors, statements, latencies = asyncio.run(_work(kind, profile, database_url, seconds))
+    return kind, done, errors, statements, latencies
+
+
+async def _prepare(profile: str, database_url: str) -> None:
+    engine = _engine(profile, database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+def run_profile(profile: str, writers: int, readers: int, seconds: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = f"sqlite+aiosqlite:///{Path(tmp_dir) / 'bench.db'}"
+        asyncio.run(_prepare(profile, database_url))
+        jobs = [("writer", profile, database_url, seconds)] * writers + [("reader", profile, database_url, seconds)] * readers
+        with multiprocessing.Pool(len(jobs)) as pool:
+            results = pool.map(_run_worker, jobs)
+
+    print(f"[{profile}]")
+    for kind in ("writer", "reader"):
+        rows = [result for result in results if result[0] == kind]
+        done = sum(row[1] for row in rows)
+        errors = sum(row[2] for row in rows)
+        statements = sum(row[3] for row in rows)
+        latencies = sorted(value for row in rows for value in row[4])
+        if latencies:
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            timing = f"median {statistics.median(latencies):.2f} ms, p95 {p95:.2f} ms"
+        else:
+            timing = "no successful operations"
+        per_op = statements / done if done else 0.0
+        print(
+            f"  {kind}s: {done / seconds:.0f} ops/s, {per_op:.1f} statements/op, locked errors: {errors}, {timing}"
+        )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    profiles = PROFILES if args.profile == "both" else (args.profile,)
+    for profile in profiles:
+        run_profile(profile, args.writers, args.readers, args.seconds)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
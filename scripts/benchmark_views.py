@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models import Order
+from app.db.repositories import OrderRepository
+from app.schemas.order import OrderView
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare ORM and Core materialisation of order listings")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args(argv)
+
+
+async def orm_views(session: AsyncSession) -> list[OrderView]:
+    result = await session.scalars(select(Order).order_by(Order.created_at.asc(), Order.id.asc()))
+    return [OrderView.from_model(order) for order in result]
+
+
+async def core_views(session: AsyncSession) -> list[OrderView]:
+    return await OrderRepository(session).list_views()
+
+
+async def _seed(session_factory: async_sessionmaker[AsyncSession], rows: int) -> None:
+    started_at = datetime(2024, 1, 1)
+    values = [
+        {
+            "id": f"bench-{index:06d}",
+            "name": f"Client {index}",
+            "telephone": f"+7999{index:07d}",
+            "email": f"client{index}@example.com",
+            "subject": "Benchmark",
+            "message": "Row materialisation benchmark",
+            "status": "new",
+            "source": "web",
+            "created_at": started_at + timedelta(seconds=index),
+            "updated_at": started_at + timedelta(seconds=index),
+        }
+        for index in range(rows)
+    ]
+    async with session_factory() as session:
+        await session.execute(insert(Order), values)
+        await session.commit()
+
+
+async def _measure(
+    session_factory: async_sessionmaker[AsyncSession],
+    load: Callable[[AsyncSession], Awaitable[list[OrderView]]],
+    repeat: int,
+) -> list[float]:
+    timings: list[float] = []
+    for _ in range(repeat):
+        # A fresh session per run so the ORM path always pays for a cold identity map.
+        async with session_factory() as session:
+            started = time.perf_counter()
+            views = await load(session)
+            timings.append((time.perf_counter() - started) * 1000)
+        assert views
+    return timings
+
+
+async def run(rows: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp_dir) / 'views.db'}")
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await _seed(session_factory, rows)
+
+        for label, load in (("orm", orm_views), ("core", core_views)):
+            timings = await _measure(session_factory, load, repeat)
+            print(
+                f"{label:>4}: median {statistics.median(timings):.1f} ms, "
+                f"best {min(timings):.1f} ms for {rows} rows"
+            )
+        await engine.dispose()
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    asyncio.run(run(args.rows, args.repeat))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.config import get_settings
+from app.web.assets import AssetManifest
+
+
+def main() -> int:
+    settings = get_settings()
+    manifest = AssetManifest(settings.static_dir)
+    files = manifest.build()
+    for original, hashed in files.items():
+        print(f"{original} -> {hashed}")
+    print(f"Manifest written: {manifest.path} ({len(files)} files)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.config import get_settings
+from app.web.images import DERIVATIVE_WIDTHS, ImageManifest, iter_source_images
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build resized WebP/AVIF/JPEG derivatives for static images")
+    parser.add_argument("--source", default="img", help="Directory inside static/ to scan for images")
+    parser.add_argument(
+        "--widths",
+        type=int,
+        nargs="+",
+        default=list(DERIVATIVE_WIDTHS),
+        help="Target widths in pixels",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    settings = get_settings()
+    static_dir = settings.static_dir
+    manifest = ImageManifest(static_dir)
+
+    sources = list(iter_source_images(static_dir / args.source))
+    started = time.perf_counter()
+    images = manifest.build(sources, widths=args.widths)
+    elapsed = time.perf_counter() - started
+
+    original_bytes = sum(path.stat().st_size for path in sources)
+    for name, entry in images.items():
+        variants = ", ".join(
+            f"{fmt}: {' '.join(str(width) for width, _ in items)}" for fmt, items in entry["variants"].items()
+        )
+        print(f"{name} ({entry['width']}x{entry['height']}) -> {variants}")
+
+    print(f"Images: {len(images)}, original size: {original_bytes} bytes, built in {elapsed:.1f}s")
+    for width in sorted(set(args.widths)):
+        total = 0
+        for entry in images.values():
+            for items in entry["variants"].values():
+                total += sum((static_dir / name).stat().st_size for item_width, name in items if item_width == width)
+        print(f"  {width}w derivatives: {total} bytes")
+    print(f"Manifest written: {manifest.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
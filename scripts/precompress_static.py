@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.config import get_settings
+from app.web.compression import CompressionResult, measure, precompress_directory, supported_encodings
+from app.web.routes_pages import STATIC_PAGES
+from app.web.templates import TemplateRenderer
+
+
+def report_pages(templates_dir: Path, pages: dict[str, str]) -> list[CompressionResult]:
+    renderer = TemplateRenderer(templates_dir, cache_pages=False)
+    results: list[CompressionResult] = []
+    for route, template_name in pages.items():
+        body = renderer.get_page(template_name).body
+        result, _ = measure(route, body)
+        results.append(result)
+    return results
+
+
+def format_report(title: str, results: Sequence[CompressionResult]) -> str:
+    encodings = supported_encodings()
+    header = f"{'name':<40} {'raw':>9}" + "".join(f" {enc:>9} {enc + ' ms':>8} {enc + ' saved':>10}" for enc in encodings)
+    lines = [title, header]
+    total_raw = 0
+    total_saved = {encoding: 0 for encoding in encodings}
+    for result in results:
+        total_raw += result.raw_size
+        row = f"{result.name:<40} {result.raw_size:>9}"
+        for encoding in encodings:
+            total_saved[encoding] += result.saved(encoding)
+            row += (
+                f" {result.sizes[encoding]:>9}"
+                f" {result.elapsed_ms[encoding]:>8.2f}"
+                f" {result.saved(encoding):>10}"
+            )
+        lines.append(row)
+    totals = ", ".join(f"{encoding}: {total_saved[encoding]} bytes" for encoding in encodings)
+    lines.append(f"Total raw: {total_raw} bytes; saved {totals}")
+    return "\n".join(lines)
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build .gz/.br sidecars for static assets")
+    parser.add_argument("--report-only", action="store_true", help="Only print the page size report")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
+    settings = get_settings()
+
+    if not args.report_only:
+        asset_results = precompress_directory(settings.static_dir)
+        print(format_report("Static assets (/assets):", asset_results))
+        print()
+
+    page_results = report_pages(settings.templates_dir, STATIC_PAGES)
+    print(format_report("Rendered pages (compressed on first request):", page_results))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from litestar.testing import TestClient
+
+from app.web import routes_static
+from app.web.app import app
+from app.web.assets import IMMUTABLE_CACHE_CONTROL, AssetManifest, hashed_name
+from app.web.templates import TemplateRenderer
+
+
+def test_hashed_name_keeps_directory_and_suffix() -> None:
+    assert hashed_name("img/logo/home.png", "abcd1234") == "img/logo/home.abcd1234.png"
+    assert hashed_name("LICENSE", "abcd1234") == "LICENSE.abcd1234"
+
+
+def test_manifest_build_rewrites_static_urls(tmp_path) -> None:
+    static_dir = tmp_path / "static"
+    templates_dir = tmp_path / "templates"
+    static_dir.mkdir()
+    templates_dir.mkdir()
+    (static_dir / "main.css").write_text("body {}", encoding="utf-8")
+    (static_dir / "main.css.gz").write_bytes(b"sidecar")
+    (static_dir / "site.webmanifest.json").write_text("{}", encoding="utf-8")
+    (static_dir / "image-manifest.json").write_text("{}", encoding="utf-8")
+    (templates_dir / "page.html").write_text("{{ url_for('static', filename='main.css') }}", encoding="utf-8")
+
+    manifest = AssetManifest(static_dir)
+    renderer = TemplateRenderer(templates_dir, assets=manifest)
+    assert renderer.get_page("page.html").body == b"/assets/main.css"
+
+    files = manifest.build()
+
+    assert list(files) == ["main.css", "site.webmanifest.json"]
+    hashed = files["main.css"]
+    assert hashed.startswith("main.") and hashed.endswith(".css")
+    assert manifest.original_name(hashed) == "main.css"
+    assert renderer.get_page("page.html").body == f"/assets/{hashed}".encode()
+    assert AssetManifest(static_dir).url("main.css") == f"/assets/{hashed}"
+
+
+def test_hashed_asset_is_served_as_immutable(tmp_path, monkeypatch) -> None:
+    (tmp_path / "main.js").write_text("console.log(1);", encoding="utf-8")
+    manifest = AssetManifest(tmp_path)
+    hashed = manifest.build()["main.js"]
+    monkeypatch.setattr(routes_static, "STATIC_ROOT", tmp_path.resolve())
+    monkeypatch.setattr(routes_static, "asset_manifest", manifest)
+
+    with TestClient(app=app) as client:
+        resp = client.get(f"/assets/{hashed}")
+        assert resp.status_code == 200
+        assert resp.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        assert resp.text == "console.log(1);"
+
+        plain = client.get("/assets/main.js")
+        assert plain.status_code == 200
+        assert "cache-control" not in plain.headers
+
+        # The file changed after the manifest was built: same URL, but no longer immutable.
+        (tmp_path / "main.js").write_text("console.log(2);", encoding="utf-8")
+        stale = client.get(f"/assets/{hashed}")
+        assert stale.status_code == 200
+        assert "cache-control" not in stale.headers
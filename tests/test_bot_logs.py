@@ -1,20 +1,21 @@
 from __future__ import annotations
 
+import gzip
+from dataclasses import replace
+from datetime import datetime, timedelta
 from pathlib import Path
 from types import SimpleNamespace
 
 import pytest
 
 from app.bot.routers import admin
-
-
-class DummyUserService:
-    async def get_role(self, telegram_id: int) -> str:
-        return "developer"
+from app.services import logs
+from app.services.logs import LogFilter, LogLineIndex, parse_log_filter, scan_log
 
 
 class DummyMessage:
     def __init__(self) -> None:
+        self.text: str | None = None
         self.answers: list[tuple[str, object | None]] = []
 
     async def answer(self, text: str, reply_markup: object | None = None) -> None:
@@ -49,11 +50,177 @@ def test_read_log_page_reads_latest_lines_from_large_file(tmp_path) -> None:
     assert older_page[-1].strip() == "line 169"
 
 
+def test_log_index_follows_appends_and_rotation(tmp_path) -> None:
+    log_path = tmp_path / "bot.log"
+    _write_log(log_path, 20_000)
+    index = LogLineIndex(log_path)
+
+    deep_page = index.read_page(10_000, 30)
+    assert [line.strip() for line in deep_page] == [f"line {i}" for i in range(9_970, 10_000)]
+    assert index.read_page(19_990, 30)[0].strip() == "line 0"
+    assert index.read_page(20_000, 30) == []
+
+    # Appends, including a line that is still being written, are picked up incrementally.
+    with log_path.open("a", encoding="utf-8") as file_obj:
+        file_obj.write("line 20000\nline 200")
+    assert [line.strip() for line in index.read_page(0, 2)] == ["line 20000", "line 200"]
+    with log_path.open("a", encoding="utf-8") as file_obj:
+        file_obj.write("01\n")
+    assert [line.strip() for line in index.read_page(0, 2)] == ["line 20000", "line 20001"]
+    assert index.read_page(10_002, 1)[0].strip() == "line 9999"
+
+    # A rotated (replaced) file is indexed from scratch.
+    rotated = tmp_path / "bot.log.new"
+    _write_log(rotated, 3)
+    rotated.replace(log_path)
+    assert [line.strip() for line in index.read_page(0, 30)] == ["line 0", "line 1", "line 2"]
+
+
+def test_rotated_segment_pages_are_read_by_offset(tmp_path) -> None:
+    log_path = tmp_path / "bot.log"
+    _write_log(log_path, 3)
+    with gzip.open(tmp_path / "bot.log.1.gz", "wt", encoding="utf-8") as file_obj:
+        file_obj.write("".join(f"old {i}\n" for i in range(5_000)))
+    index = LogLineIndex(log_path)
+
+    page = logs.read_log_page(index, 2_000, 5)
+    assert [line.strip() for line in page] == [f"old {i}" for i in range(2_998, 3_003)]
+
+    # Only line offsets are cached for the segment, not its decoded text.
+    segment = tmp_path / "bot.log.1.gz"
+    stat = segment.stat()
+    line_ends = logs._segment_line_ends(segment, stat.st_mtime_ns, stat.st_size)
+    assert len(line_ends) == 5_000 and line_ends[0] == len("old 0\n")
+
+
 @pytest.mark.asyncio
 async def test_logs_more_rejects_invalid_offset() -> None:
     call = DummyCallback("logs_more:not-a-number", DummyMessage())
 
-    await admin.cb_logs_more(call, DummyUserService())
+    await admin.cb_logs_more(call)
 
     assert call.answers[-1] == ("Некорректная пагинация логов", True)
     assert call.message.answers == []
+
+
+def _write_records(path: Path, start: datetime, count: int) -> None:
+    lines: list[str] = []
+    for index in range(count):
+        stamp = (start + timedelta(minutes=index)).strftime("%Y-%m-%d %H:%M:%S")
+        level = "ERROR" if index % 10 == 0 else "INFO"
+        name = "app.bot.runner" if index % 2 else "app.services.outbox"
+        lines.append(f"{stamp},000 [{level}] {name}: event {index}\n")
+        if level == "ERROR":
+            lines.append("Traceback (most recent call last):\n")
+            lines.append(f"RuntimeError: boom {index}\n")
+    path.write_text("".join(lines), encoding="utf-8")
+
+
+def test_scan_log_filters_records_and_pages_into_rotated_segments(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(logs, "LOG_SCAN_CHUNK_SIZE", 256)
+    log_path = tmp_path / "bot.log"
+    _write_records(log_path, datetime(2024, 5, 1, 12, 0), 60)
+    with gzip.open(tmp_path / "bot.log.1.gz", "wb") as file_obj:
+        older = tmp_path / "older.log"
+        _write_records(older, datetime(2024, 5, 1, 10, 0), 60)
+        file_obj.write(older.read_bytes())
+
+    errors = parse_log_filter(["level=error"])
+    records, cursor = scan_log(log_path, errors, limit=4)
+    assert [record.splitlines()[0][-8:] for record in records] == ["event 20", "event 30", "event 40", "event 50"]
+    # Tracebacks stay attached to the record they belong to.
+    assert records[-1].splitlines()[1:] == ["Traceback (most recent call last):", "RuntimeError: boom 50"]
+
+    records, cursor = scan_log(log_path, errors, limit=4, cursor=cursor)
+    assert [record.split(",")[0] for record in records] == [
+        "2024-05-01 10:40:00",
+        "2024-05-01 10:50:00",
+        "2024-05-01 12:00:00",
+        "2024-05-01 12:10:00",
+    ]
+    assert cursor is not None
+
+    records, _ = scan_log(log_path, parse_log_filter(["logger=app.bot", "re=event 5[0-9]$"]), limit=100)
+    assert [record[-8:] for record in records] == [f"event {index}" for index in range(51, 60, 2)] * 2
+
+    # Everything older than `since` is never read.
+    now = datetime(2024, 5, 1, 13, 0)
+    records, cursor = scan_log(log_path, parse_log_filter(["since=5m", "boom"], now=now), limit=100)
+    assert (records, cursor) == ([], None)
+    records, _ = scan_log(log_path, parse_log_filter(["since=5m"], now=now), limit=100)
+    assert [record[-8:] for record in records] == [f"event {index}" for index in range(55, 60)]
+
+
+def _rotate(log_path: Path) -> None:
+    # What CompressedRotatingFileHandler does with backup_count=2.
+    segment = log_path.with_name(f"{log_path.name}.1.gz")
+    if segment.exists():
+        segment.rename(log_path.with_name(f"{log_path.name}.2.gz"))
+    with gzip.open(segment, "wb") as file_obj:
+        file_obj.write(log_path.read_bytes())
+    log_path.unlink()
+
+
+def test_scan_log_cursor_survives_rotation(tmp_path) -> None:
+    log_path = tmp_path / "bot.log"
+    _write_records(log_path, datetime(2024, 5, 1, 10, 0), 20)
+    _rotate(log_path)
+    _write_records(log_path, datetime(2024, 5, 1, 12, 0), 20)
+    errors = parse_log_filter(["level=error"])
+
+    records, cursor = scan_log(log_path, errors, limit=3)
+    assert [record[:19] for record in records] == ["2024-05-01 10:10:00", "2024-05-01 12:00:00", "2024-05-01 12:10:00"]
+    assert cursor is not None and cursor.source == 1
+
+    # The segment the cursor points into is now bot.log.2.gz; the scan continues there.
+    _rotate(log_path)
+    _write_records(log_path, datetime(2024, 5, 1, 14, 0), 20)
+    records, cursor = scan_log(log_path, errors, limit=3, cursor=cursor)
+    assert [record[:19] for record in records] == ["2024-05-01 10:00:00"]
+    assert cursor is None
+
+    # A cursor into bot.log cannot follow it into the compressed copy, so the scan restarts.
+    records, cursor = scan_log(log_path, errors, limit=1)
+    assert cursor is not None and cursor.source == 0
+    _rotate(log_path)
+    _write_records(log_path, datetime(2024, 5, 1, 16, 0), 20)
+    records, _ = scan_log(log_path, errors, limit=1, cursor=cursor)
+    assert [record[:19] for record in records] == ["2024-05-01 16:10:00"]
+
+
+def test_parse_log_filter_rejects_bad_values() -> None:
+    for args in (["level=loud"], ["since=yesterday"], ["re=("], ["logger="]):
+        with pytest.raises(ValueError):
+            parse_log_filter(args)
+    assert parse_log_filter(["Timeout", "Error"]).text == "timeout error"
+    assert parse_log_filter([]) == LogFilter()
+
+
+@pytest.mark.asyncio
+async def test_logs_command_searches_and_pages(tmp_path, monkeypatch) -> None:
+    log_path = tmp_path / "bot.log"
+    _write_records(log_path, datetime(2024, 5, 1, 12, 0), 200)
+    monkeypatch.setattr(admin, "settings", replace(admin.settings, bot_log_path=log_path))
+
+    message = DummyMessage()
+    message.text = "/logs level=error"
+    await admin.cmd_logs(message)
+    text, keyboard = message.answers[-1]
+    assert text.count("[ERROR]") == admin.LOGS_SEARCH_PAGE_SIZE
+    assert "event 190" in text and "event 90" not in text
+    callback_data = keyboard.inline_keyboard[0][0].callback_data
+    assert callback_data.startswith("logs_find:")
+
+    call = DummyCallback(callback_data, message)
+    await admin.cb_logs_find(call)
+    text, keyboard = message.answers[-1]
+    assert "event 90" in text and "event 190" not in text
+
+    await admin.cb_logs_find(call)
+    assert message.answers[-1] == ("📜 Подходящих записей больше нет.", None)
+    await admin.cb_logs_find(call)
+    assert call.answers[-1] == ("Поиск устарел, повторите команду /logs", True)
+
+    message.text = "/logs level=loud"
+    await admin.cmd_logs(message)
+    assert message.answers[-1][0].startswith("Неизвестный уровень: loud")
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from aiogram.dispatcher.event.handler import HandlerObject
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.bot.deps import requires_role
+from app.bot.middlewares import RoleGuard, RoleMiddleware
+from app.db.base import Base
+from app.services.cache import VersionStamp
+from app.services.users import UserService
+
+
+class CountingSessionFactory:
+    def __init__(self, session_factory) -> None:
+        self.session_factory = session_factory
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.session_factory()
+
+
+class DummyMessage:
+    def __init__(self, chat_id: int) -> None:
+        self.chat = SimpleNamespace(id=chat_id)
+        self.answers: list[str] = []
+
+    async def answer(self, text: str, reply_markup: object | None = None) -> None:
+        self.answers.append(text)
+
+
+async def _noop() -> None:
+    return None
+
+
+@pytest.mark.asyncio
+async def test_role_middleware_resolves_role_once_per_update(tmp_path, monkeypatch) -> None:
+    from app.bot import middlewares
+
+    monkeypatch.setattr(middlewares, "Update", SimpleNamespace)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'middleware.db'}")
+    session_factory = CountingSessionFactory(async_sessionmaker(engine, expire_on_commit=False))
+    read_session_factory = CountingSessionFactory(async_sessionmaker(engine, expire_on_commit=False))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    user_service = UserService(
+        session_factory,
+        read_session_factory,
+        version_stamp=VersionStamp(tmp_path / "users.stamp"),
+    )
+    await user_service.upsert_role(5, "admin")
+    update = SimpleNamespace(message=SimpleNamespace(chat=SimpleNamespace(id=5)), callback_query=None)
+    seen: dict[str, object] = {}
+
+    async def handler(event, data):
+        seen["role"] = data["role"]
+        seen["target"] = await user_service.get_role(6)
+        await user_service.upsert_role(6, "user")
+        return "handled"
+
+    reads, writes = read_session_factory.calls, session_factory.calls
+    assert await RoleMiddleware(user_service, read_session_factory)(handler, update, {}) == "handled"
+
+    assert seen == {"role": "admin", "target": "guest"}
+    assert read_session_factory.calls == reads + 1
+    assert session_factory.calls == writes + 1
+    assert await user_service.get_role(6) == "user"
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_role_guard_denies_handlers_declaring_roles(monkeypatch) -> None:
+    from app.bot import middlewares
+
+    monkeypatch.setattr(middlewares, "Message", DummyMessage)
+    handler_object = HandlerObject(callback=_noop, flags=requires_role("developer", denied_text="Нет доступа."))
+    called: list[str] = []
+
+    async def handler(event, data):
+        called.append(data["role"])
+
+    denied = DummyMessage(1)
+    await RoleGuard()(handler, denied, {"handler": handler_object, "role": "admin", "user_service": None})
+    allowed = DummyMessage(2)
+    await RoleGuard()(handler, allowed, {"handler": handler_object, "role": "developer", "user_service": None})
+
+    assert denied.answers == ["Нет доступа."]
+    assert allowed.answers == []
+    assert called == ["developer"]
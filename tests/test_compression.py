@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import gzip
+
+from app.web.compression import choose_encoding, precompress_file, sidecar_path
+
+
+def test_choose_encoding_respects_quality_values() -> None:
+    assert choose_encoding("gzip, br", ("br", "gzip")) == "br"
+    assert choose_encoding("br;q=0, gzip", ("br", "gzip")) == "gzip"
+    assert choose_encoding("gzip;q=0.5, br;q=0.8", ("br", "gzip")) == "br"
+    assert choose_encoding("identity", ("br", "gzip")) is None
+    assert choose_encoding("*", ("gzip",)) == "gzip"
+    assert choose_encoding(None, ("gzip",)) is None
+
+
+def test_precompress_file_writes_gzip_sidecar(tmp_path) -> None:
+    asset = tmp_path / "main.js"
+    asset.write_text("console.log('hello');\n" * 100, encoding="utf-8")
+
+    result = precompress_file(asset, tmp_path)
+
+    gz_path = sidecar_path(asset, "gzip")
+    assert gz_path.exists()
+    assert gzip.decompress(gz_path.read_bytes()) == asset.read_bytes()
+    assert result.name == "main.js"
+    assert result.saved("gzip") > 0
@@ -12,3 +12,65 @@ def test_default_database_url_is_absolute(monkeypatch) -> None:
         assert settings.database_url == f"sqlite+aiosqlite:///{expected_path}"
     finally:
         config.get_settings.cache_clear()
+
+
+def test_sqlite_pragmas_are_applied_on_connect(tmp_path, monkeypatch) -> None:
+    import asyncio
+    from dataclasses import replace
+
+    from sqlalchemy import text
+
+    from app.db.session import build_engine
+
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "1234")
+    monkeypatch.setenv("SQLITE_SYNCHRONOUS", "bogus")
+    config.get_settings.cache_clear()
+    try:
+        settings = replace(config.get_settings(), database_url=f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}")
+    finally:
+        config.get_settings.cache_clear()
+
+    async def read_pragmas() -> dict[str, object]:
+        engine = build_engine(settings)
+        try:
+            async with engine.connect() as conn:
+                return {
+                    name: await conn.scalar(text(f"PRAGMA {name}"))
+                    for name in ("journal_mode", "synchronous", "busy_timeout", "temp_store", "cache_size")
+                }
+        finally:
+            await engine.dispose()
+
+    pragmas = asyncio.run(read_pragmas())
+    assert pragmas == {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 1234, "temp_store": 2, "cache_size": -64000}
+
+
+def test_read_engine_is_query_only_and_writer_is_serialized(tmp_path) -> None:
+    import asyncio
+    from dataclasses import replace
+
+    import pytest
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    from app.db.session import build_engine
+
+    settings = replace(config.get_settings(), database_url=f"sqlite+aiosqlite:///{tmp_path / 'split.db'}")
+
+    async def run() -> None:
+        writer = build_engine(settings, role="write")
+        reader = build_engine(settings, role="read")
+        try:
+            assert writer.pool.size() == 1
+            async with writer.begin() as conn:
+                await conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+                await conn.execute(text("INSERT INTO items (id) VALUES (1)"))
+            async with reader.connect() as conn:
+                assert await conn.scalar(text("SELECT COUNT(*) FROM items")) == 1
+                with pytest.raises(OperationalError):
+                    await conn.execute(text("INSERT INTO items (id) VALUES (2)"))
+        finally:
+            await writer.dispose()
+            await reader.dispose()
+
+    asyncio.run(run())
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import json
+from dataclasses import replace
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from litestar.testing import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.bot.routers import orders as orders_router
+from app.db.base import Base
+from app.db.models import Order
+from app.schemas.order import OrderView
+from app.services import export
+from app.services.export import encode_csv, encode_jsonl, write_export
+from app.services.orders import OrderService
+from app.web import routes_export
+from app.web.app import app
+
+
+async def _seed(tmp_path, rows: int = 5) -> tuple[object, OrderService]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'export.db'}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as session:
+        for index in range(rows):
+            session.add(
+                Order(
+                    id=f"export-{index}",
+                    name=f"Иван, \"{index}\"",
+                    telephone="+79991234567",
+                    email="mail@example.com",
+                    subject="Subj",
+                    message="Строка 1\nСтрока 2",
+                    status="done" if index % 2 else "new",
+                    source="web",
+                    created_at=datetime(2024, 1, 1 + index, 12, 30),
+                    updated_at=datetime(2024, 1, 1 + index, 12, 30),
+                )
+            )
+        await session.commit()
+    return engine, OrderService(session_factory)
+
+
+async def _collect(stream) -> bytes:
+    return b"".join([data async for data in stream])
+
+
+@pytest.mark.asyncio
+async def test_orders_are_streamed_in_chunks(tmp_path) -> None:
+    engine, service = await _seed(tmp_path)
+
+    chunks = [chunk async for chunk in service.iter_orders(chunk_size=2)]
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [order.id for chunk in chunks for order in chunk][0] == "export-0"
+
+    csv_data = (await _collect(encode_csv(service.iter_orders(chunk_size=2)))).decode("utf-8")
+    assert csv_data.startswith("\ufeffid,name,telephone")
+    assert '"Иван, ""3"""' in csv_data
+    assert "2024-01-04 12:30:00" in csv_data
+
+    lines = (await _collect(encode_jsonl(service.iter_orders(chunk_size=2)))).decode("utf-8").splitlines()
+    assert len(lines) == 5
+    assert json.loads(lines[1])["message"] == "Строка 1\nСтрока 2"
+
+    path = tmp_path / "orders.jsonl"
+    assert await write_export(path, service.iter_orders(chunk_size=2), "jsonl") == 5
+    assert path.read_text(encoding="utf-8").count("\n") == 5
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_spreadsheet_cells_cannot_start_formulas() -> None:
+    stamp = datetime(2024, 1, 1, 12, 30)
+    order = OrderView(
+        id="formula",
+        name='=HYPERLINK("http://evil","x")',
+        telephone="+79991234567",
+        email="@mail",
+        subject="-1",
+        message="\tcmd",
+        status="new",
+        source="web",
+        created_at=stamp,
+        updated_at=stamp,
+    )
+
+    async def chunks():
+        yield [order]
+
+    rows = list(csv.reader(io.StringIO((await _collect(encode_csv(chunks()))).decode("utf-8-sig"))))
+    assert rows[1][:6] == ["formula", '\'=HYPERLINK("http://evil","x")', "'+79991234567", "'@mail", "'-1", "'\tcmd"]
+
+    # openpyxl is optional, so the XLSX row writer is checked against a stand-in sheet.
+    sheet = SimpleNamespace(rows=[])
+    sheet.append = sheet.rows.append
+    export._append_rows(sheet, [order])
+    assert sheet.rows == [rows[1]]
+
+    line = (await _collect(encode_jsonl(chunks()))).decode("utf-8")
+    assert json.loads(line)["name"] == '=HYPERLINK("http://evil","x")'
+
+
+def test_export_endpoint_requires_token(tmp_path, monkeypatch) -> None:
+    engine, service = asyncio.run(_seed(tmp_path))
+    monkeypatch.setattr(routes_export, "order_service", service)
+
+    with TestClient(app=app) as client:
+        assert client.get("/admin/orders/export").status_code == 404
+
+        monkeypatch.setattr(routes_export, "settings", replace(routes_export.settings, export_token="secret"))
+        assert client.get("/admin/orders/export").status_code == 401
+        assert client.get("/admin/orders/export", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+        headers = {"Authorization": "Bearer secret"}
+        resp = client.get("/admin/orders/export?format=jsonl&status=done", headers=headers)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        assert 'filename="orders-' in resp.headers["content-disposition"]
+        assert [json.loads(line)["id"] for line in resp.text.splitlines()] == ["export-1", "export-3"]
+
+        assert client.get("/admin/orders/export?format=pdf", headers=headers).status_code == 400
+        assert routes_export._active_exports == 0
+
+        monkeypatch.setattr(routes_export, "_active_exports", routes_export.EXPORT_CONCURRENCY)
+        resp = client.get("/admin/orders/export", headers=headers)
+        assert resp.status_code == 429
+        assert resp.headers["retry-after"] == "10"
+
+    asyncio.run(engine.dispose())
+
+
+class DummyMessage:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.answers: list[str] = []
+        self.documents: list[tuple[str, bytes, str]] = []
+
+    async def answer(self, text: str, reply_markup: object | None = None) -> None:
+        self.answers.append(text)
+
+    async def answer_document(self, document, caption: str | None = None) -> None:
+        self.documents.append((document.filename, document.path.read_bytes(), caption))
+
+
+@pytest.mark.asyncio
+async def test_export_command_sends_document(tmp_path) -> None:
+    engine, service = await _seed(tmp_path)
+
+    message = DummyMessage("/export csv")
+    await orders_router.cmd_export(message, service)
+    filename, data, caption = message.documents[0]
+    assert filename.endswith(".csv")
+    assert data.decode("utf-8").count("export-") == 5
+    assert caption == "Выгружено заказов: 5"
+
+    message = DummyMessage("/export pdf")
+    await orders_router.cmd_export(message, service)
+    assert message.documents == []
+    assert message.answers[0].startswith("Использование: /export")
+
+    await engine.dispose()
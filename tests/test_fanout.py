@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from app.services.fanout import FanOut, TokenBucket
+from app.services.notifications import NotificationService
+
+
+class FakeBot:
+    def __init__(self, latency: float = 0.02, retry_after: dict[int, int] | None = None) -> None:
+        self.latency = latency
+        self.retry_after = dict(retry_after or {})
+        self.sent: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.retry_after.pop(chat_id, None) is not None:
+                raise TelegramRetryAfter(
+                    method=SendMessage(chat_id=chat_id, text=text),
+                    message="Too Many Requests",
+                    retry_after=0,
+                )
+            if chat_id < 0:
+                raise RuntimeError("chat not found")
+            self.sent.append(chat_id)
+        finally:
+            self.in_flight -= 1
+
+
+class LockstepBot:
+    # A fake clock for the bot: every send takes one tick, and the clock only ticks once all
+    # sends that can run at the same time have started. Delivering N messages therefore
+    # takes ceil(N / concurrency) ticks when sends overlap and N ticks when they do not.
+    def __init__(self, recipients: int, concurrency: int) -> None:
+        self.remaining = recipients
+        self.concurrency = concurrency
+        self.ticks = 0
+        self.sent: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._waiting: list[asyncio.Future[None]] = []
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.append(future)
+        if len(self._waiting) == min(self.remaining, self.concurrency):
+            self.ticks += 1
+            self.remaining -= len(self._waiting)
+            for waiting in self._waiting:
+                waiting.set_result(None)
+            self._waiting = []
+        await future
+        self.in_flight -= 1
+        self.sent.append(chat_id)
+
+
+def _service(bot: FakeBot | LockstepBot, fanout: FanOut) -> NotificationService:
+    service = NotificationService(SimpleNamespace(bot_token="token"), user_service=None, fanout=fanout)
+    service._bot = bot
+    return service
+
+
+def _order() -> SimpleNamespace:
+    return SimpleNamespace(
+        id="order-1",
+        name="Ivan",
+        telephone="+79991234567",
+        email="-",
+        subject="-",
+        message="-",
+        created_at=datetime.now(),
+        status="new",
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("recipients", [1, 10, 100])
+async def test_fan_out_time_for_recipients(recipients: int) -> None:
+    bot = LockstepBot(recipients, concurrency=20)
+    service = _service(bot, FanOut(concurrency=20, global_rate=10_000))
+
+    # Sends that never overlap would leave the fake clock stuck instead of taking longer.
+    report = await asyncio.wait_for(service.fan_out_order(_order(), list(range(1, recipients + 1))), timeout=5)
+
+    assert sorted(report.sent) == list(range(1, recipients + 1))
+    assert bot.max_in_flight <= 20
+    assert bot.ticks == -(-recipients // 20)
+
+
+@pytest.mark.asyncio
+async def test_fan_out_reschedules_retry_after_and_reports_failures() -> None:
+    bot = FakeBot(latency=0.0, retry_after={2: 0})
+    service = _service(bot, FanOut(concurrency=5, global_rate=10_000, per_chat_rate=1000))
+
+    report = await service.fan_out_order(_order(), [1, 2, -3, 2])
+
+    results = {result.chat_id: result for result in report.results}
+    assert results[1].ok and results[1].attempts == 1
+    assert results[2].ok and results[2].attempts == 2
+    assert not results[-3].ok and results[-3].error == "chat not found"
+    assert report.failed == [-3]
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate() -> None:
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    started = time.perf_counter()
+    for _ in range(6):
+        await bucket.acquire()
+
+    assert time.perf_counter() - started >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_per_chat_buckets_are_evicted() -> None:
+    fanout = FanOut(global_rate=10_000, per_chat_rate=1000, max_tracked_chats=3)
+
+    async def send(chat_id: int) -> None:
+        return None
+
+    await fanout.send([1, 2, 3], send)
+    await asyncio.sleep(0.01)
+    # The idle buckets are full again, so they are dropped instead of growing the dict.
+    await fanout.send([4], send)
+    assert list(fanout._per_chat) == [4]
+
+    slow = FanOut(global_rate=10_000, per_chat_rate=0.001, max_tracked_chats=3)
+    await slow.send([1, 2, 3, 4, 5], send)
+    assert list(slow._per_chat) == [3, 4, 5]
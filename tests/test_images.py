@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pytest
+
+from app.web.images import ImageManifest, derivative_name
+from app.web.templates import TemplateRenderer
+
+
+def test_derivative_name_lives_under_derived_dir() -> None:
+    assert derivative_name("img/otopl/otop1.jpg", 480, "webp") == "derived/img/otopl/otop1-480.webp"
+
+
+def test_build_derivatives_and_render_srcset(tmp_path) -> None:
+    image_module = pytest.importorskip("PIL.Image")
+    static_dir = tmp_path / "static"
+    templates_dir = tmp_path / "templates"
+    (static_dir / "img").mkdir(parents=True)
+    templates_dir.mkdir()
+    source = static_dir / "img" / "photo.jpg"
+    image_module.new("RGB", (1200, 800), color=(200, 100, 50)).save(source, format="JPEG")
+    (templates_dir / "page.html").write_text(
+        "{% set image = responsive_image('/assets/img/photo.jpg') %}"
+        "{{ image.srcset }}|{{ image.sources[0][0] }}|{{ image.width }}",
+        encoding="utf-8",
+    )
+
+    manifest = ImageManifest(static_dir)
+    images = manifest.build([source], widths=(480, 960), formats=("webp",))
+
+    entry = images["img/photo.jpg"]
+    assert entry["fallback"] == "jpeg"
+    assert [width for width, _ in entry["variants"]["webp"]] == [480, 960]
+    for items in entry["variants"].values():
+        for _, name in items:
+            assert (static_dir / name).exists()
+
+    renderer = TemplateRenderer(templates_dir, images=manifest)
+    body = renderer.get_page("page.html").body.decode()
+    assert body == (
+        "/assets/derived/img/photo-480.jpg 480w, /assets/derived/img/photo-960.jpg 960w|image/webp|1200"
+    )
+
+
+def test_responsive_image_is_none_without_manifest_entry(tmp_path) -> None:
+    manifest = ImageManifest(tmp_path)
+
+    assert manifest.responsive("/assets/img/missing.jpg", lambda name: name) is None
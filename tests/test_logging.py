@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import gzip
 import io
+import json
 import logging
-from pathlib import Path
+import threading
+from logging.handlers import QueueHandler, WatchedFileHandler
 
-from app.logging import configure_logging
+from app import logging as app_logging
+from app.bot.routers import admin
+from app.logging import CompressedRotatingFileHandler, configure_logging, shutdown_logging
 
 
 def test_configure_logging_adds_file_handler_when_root_already_configured(tmp_path) -> None:
@@ -22,19 +27,19 @@ def test_configure_logging_adds_file_handler_when_root_already_configured(tmp_pa
 
     try:
         configure_logging(log_path)
+        configure_logging(log_path)
 
-        matching_file_handlers = [
-            handler
-            for handler in root.handlers
-            if isinstance(handler, logging.FileHandler)
-            and Path(getattr(handler, "baseFilename", "")).resolve() == log_path.resolve()
-        ]
-        assert matching_file_handlers
+        # Records only go through a queue on the caller's thread; files are written by the listener.
+        queue_handlers = [handler for handler in root.handlers if isinstance(handler, QueueHandler)]
+        assert len(queue_handlers) == 1
+        assert not any(isinstance(handler, logging.FileHandler) for handler in root.handlers)
 
         root.info("test-log-line")
+        shutdown_logging()
         assert log_path.exists()
         assert "test-log-line" in log_path.read_text(encoding="utf-8")
     finally:
+        shutdown_logging()
         new_handlers = [handler for handler in list(root.handlers) if handler not in old_handlers]
         for handler in new_handlers:
             root.removeHandler(handler)
@@ -47,3 +52,140 @@ def test_configure_logging_adds_file_handler_when_root_already_configured(tmp_pa
             root.addHandler(handler)
 
         root.setLevel(old_level)
+
+
+def test_rotated_segments_are_compressed_and_paged(tmp_path) -> None:
+    log_path = tmp_path / "bot.log"
+    handler = CompressedRotatingFileHandler(log_path, max_bytes=200, backup_count=3)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger("tests.rotation")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for index in range(120):
+            logger.warning("line %03d", index)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+        logger.propagate = True
+
+    segments = sorted(path.name for path in tmp_path.iterdir())
+    assert segments == ["bot.log", "bot.log.1.gz", "bot.log.2.gz", "bot.log.3.gz"]
+    with gzip.open(tmp_path / "bot.log.1.gz", "rt", encoding="utf-8") as file_obj:
+        assert file_obj.read().startswith("line ")
+
+    current = log_path.read_text(encoding="utf-8").splitlines()
+    page = admin._read_log_page(log_path, 0, page_size=len(current) + 5)
+    assert [line.strip() for line in page[-len(current) :]] == current
+    numbers = [int(line.split()[-1]) for line in page]
+    assert numbers == list(range(numbers[0], 120))
+
+    # Paging past the oldest kept segment simply runs out of lines.
+    assert admin._read_log_page(log_path, 1_000) == []
+
+
+def test_json_lines_format(tmp_path) -> None:
+    log_path = tmp_path / "bot.json.log"
+    root = logging.getLogger()
+    old_level = root.level
+    try:
+        configure_logging(log_path, log_format="json")
+        logger = logging.getLogger("tests.json")
+        logger.warning("Привет %s", "мир")
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            logger.exception("Failed to deliver %s", 42)
+    finally:
+        shutdown_logging()
+        root.setLevel(old_level)
+
+    warning, failure = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()[-2:]]
+    assert warning["level"] == "WARNING"
+    assert warning["logger"] == "tests.json"
+    assert warning["message"] == "Привет мир"
+    assert "ts" in warning and "exc" not in warning
+    # The traceback stays a separate field instead of being folded into the message.
+    assert failure["message"] == "Failed to deliver 42"
+    assert failure["exc"].startswith("Traceback (most recent call last):")
+    assert failure["exc"].endswith("RuntimeError: boom")
+
+
+def test_messages_are_interpolated_at_the_call(tmp_path) -> None:
+    formatted_on: list[str] = []
+
+    class Boom(Exception):
+        def __str__(self) -> str:
+            formatted_on.append(threading.current_thread().name)
+            return "boom"
+
+    log_path = tmp_path / "bot.log"
+    root = logging.getLogger()
+    old_level = root.level
+    # pytest's capture handlers format on the calling thread; only the queue path is checked.
+    old_handlers = list(root.handlers)
+    for handler in old_handlers:
+        root.removeHandler(handler)
+    try:
+        configure_logging(log_path)
+        log = logging.getLogger("tests.thread")
+        items = ["before"]
+        log.warning("items=%s", items)
+        items.append("after")
+        try:
+            raise Boom()
+        except Boom:
+            log.exception("failed")
+    finally:
+        shutdown_logging()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in old_handlers:
+            root.addHandler(handler)
+        root.setLevel(old_level)
+
+    text = log_path.read_text(encoding="utf-8")
+    assert "items=['before']" in text
+    assert "Boom: boom" in text
+    # The traceback is still formatted by the listener thread.
+    assert formatted_on and threading.main_thread().name not in formatted_on
+
+
+def test_shared_log_survives_rotation_by_another_handler(tmp_path) -> None:
+    # The bot process rotates bot.log while the web process keeps appending to it.
+    log_path = tmp_path / "bot.log"
+    rotating = CompressedRotatingFileHandler(log_path, max_bytes=200, backup_count=50)
+    watched = WatchedFileHandler(log_path, encoding="utf-8")
+    for handler in (rotating, watched):
+        handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        for index in range(40):
+            handler = rotating if index % 2 else watched
+            handler.handle(logging.LogRecord("tests", logging.INFO, "", 0, "line %02d", (index,), None))
+    finally:
+        rotating.close()
+        watched.close()
+
+    lines = log_path.read_text(encoding="utf-8").splitlines()
+    for segment in tmp_path.glob("bot.log.*.gz"):
+        with gzip.open(segment, "rt", encoding="utf-8") as file_obj:
+            lines.extend(file_obj.read().splitlines())
+    assert sorted(lines) == [f"line {index:02d}" for index in range(40)]
+
+
+def test_bot_configuration_takes_over_rotation_in_one_process(tmp_path) -> None:
+    # main.py --mode all configures logging from the web app and the bot in one process.
+    log_path = tmp_path / "bot.log"
+    root = logging.getLogger()
+    old_level = root.level
+    try:
+        configure_logging(log_path, rotate=False)
+        watched = app_logging._queue_handler
+        configure_logging(log_path, rotate=True)
+        rotating = app_logging._queue_handler
+        configure_logging(log_path, rotate=False)
+        assert app_logging._queue_handler is rotating is not watched
+        assert watched not in root.handlers and rotating in root.handlers
+    finally:
+        shutdown_logging()
+        root.setLevel(old_level)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+from litestar.testing import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.bot import runner
+from app.bot.middlewares import MetricsMiddleware
+from app.db.session import init_models, instrument_engine
+from app.metrics import (
+    BOT_UPDATE_DURATION,
+    BOT_UPDATE_ERRORS,
+    DB_QUERY_DURATION,
+    HTTP_REQUEST_DURATION,
+    MetricsRegistry,
+)
+from app.web import routes_metrics
+from app.web.app import app
+
+
+def test_registry_renders_prometheus_text() -> None:
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("path",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    depth = registry.gauge("depth", "Depth.")
+
+    requests.inc(path='/a"b')
+    requests.inc(2, path='/a"b')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(3)
+    depth.track(lambda: 7)
+
+    assert registry.counter("requests_total", "Requests.", ("path",)) is requests
+    with pytest.raises(ValueError):
+        registry.gauge("requests_total", "Requests.")
+    with pytest.raises(ValueError):
+        requests.inc(route="/")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{path="/a\\"b"} 3' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_sum 3.55" in lines
+    assert "latency_seconds_count 3" in lines
+    assert "depth 7" in lines
+
+
+def test_web_metrics_endpoint(monkeypatch) -> None:
+    asyncio.run(init_models())
+    before = HTTP_REQUEST_DURATION.count(method="GET", route="/services/{slug}", status="200")
+    with TestClient(app=app) as client:
+        assert client.get("/services/vent").status_code == 200
+        monkeypatch.setattr(routes_metrics, "settings", replace(routes_metrics.settings, metrics_token=""))
+        assert client.get("/metrics").status_code == 404
+
+        monkeypatch.setattr(routes_metrics, "settings", replace(routes_metrics.settings, metrics_token="secret"))
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        resp = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'queue_depth{queue="notification_outbox"} 0' in resp.text
+
+    after = HTTP_REQUEST_DURATION.count(method="GET", route="/services/{slug}", status="200")
+    assert after == before + 1
+
+
+@pytest.mark.asyncio
+async def test_webhook_metrics_handler(monkeypatch) -> None:
+    monkeypatch.setattr(runner, "settings", replace(runner.settings, metrics_token=""))
+    with pytest.raises(web.HTTPNotFound):
+        await runner.metrics_handler(make_mocked_request("GET", "/metrics"))
+
+    monkeypatch.setattr(runner, "settings", replace(runner.settings, metrics_token="secret"))
+    with pytest.raises(web.HTTPUnauthorized):
+        await runner.metrics_handler(make_mocked_request("GET", "/metrics"))
+
+    request = make_mocked_request("GET", "/metrics", headers={"Authorization": "Bearer secret"})
+    response = await runner.metrics_handler(request)
+    assert response.status == 200
+    assert b"# TYPE bot_update_duration_seconds histogram" in response.body
+
+
+@pytest.mark.asyncio
+async def test_bot_middleware_times_handlers() -> None:
+    async def cmd_sample(event: object, data: dict) -> str:
+        return "ok"
+
+    async def cmd_broken(event: object, data: dict) -> None:
+        raise RuntimeError("boom")
+
+    middleware = MetricsMiddleware()
+    update = SimpleNamespace(event_type="message")
+    labels = {"event": "message", "handler": "cmd_sample"}
+    before = BOT_UPDATE_DURATION.count(**labels)
+    data = {"handler": SimpleNamespace(callback=cmd_sample), "event_update": update}
+    assert await middleware(cmd_sample, object(), data) == "ok"
+    assert BOT_UPDATE_DURATION.count(**labels) == before + 1
+
+    errors = BOT_UPDATE_ERRORS.value(event="message", handler="cmd_broken")
+    data = {"handler": SimpleNamespace(callback=cmd_broken), "event_update": update}
+    with pytest.raises(RuntimeError):
+        await middleware(cmd_broken, object(), data)
+    assert BOT_UPDATE_ERRORS.value(event="message", handler="cmd_broken") == errors + 1
+
+
+@pytest.mark.asyncio
+async def test_engine_queries_are_timed(tmp_path) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'metrics.db'}")
+    instrument_engine(engine, "test")
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        await conn.execute(text("SELECT 2"))
+        with pytest.raises(Exception):
+            await conn.execute(text("SELECT * FROM missing"))
+        await conn.execute(text("CREATE TABLE t (id INTEGER)"))
+    await engine.dispose()
+
+    assert DB_QUERY_DURATION.count(engine="test", statement="select") == 2
+    assert DB_QUERY_DURATION.count(engine="test", statement="other") == 1
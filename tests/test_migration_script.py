@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import json
+from datetime import datetime
 from importlib.util import module_from_spec, spec_from_file_location
 from pathlib import Path
 
 import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models import Order
+from app.db.repositories import BULK_INSERT_TRIGGERS, OrderRepository
+from app.services.users import UserService
 
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -96,3 +105,115 @@ async def test_main_backups_only_imported_source(monkeypatch, tmp_path) -> None:
     await module.main()
 
     assert backups == [orders_file]
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_streams_and_deduplicates(monkeypatch, tmp_path) -> None:
+    module = load_migration_module()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'import.db'}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(module, "SessionFactory", session_factory)
+    monkeypatch.setattr(module, "UserService", lambda *args, **kwargs: UserService(session_factory))
+
+    rows = [
+        {"id": f"legacy-{index}", "name": f"Клиент {index}", "created_at": "2023-05-01 10:00:00"}
+        for index in range(7)
+    ]
+    rows.insert(3, {"id": "legacy-1", "name": "Duplicate"})
+    rows.insert(0, {"name": "Without id"})
+    orders_file = tmp_path / "orders.json"
+    orders_file.write_text(json.dumps(rows, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    async with session_factory() as session:
+        session.add(
+            Order(
+                id="legacy-0",
+                name="Existing",
+                telephone="+79991234567",
+                email="-",
+                subject="-",
+                message="-",
+                status="done",
+                source="web",
+                created_at=datetime.now(),
+                updated_at=datetime.now(),
+            )
+        )
+        await session.commit()
+    await UserService(session_factory).upsert_role(1, "user")
+    await UserService(session_factory).upsert_role(2, "developer")
+
+    imported = await module.migrate_orders(module._iter_json_array(orders_file, chunk_size=16), batch_size=2)
+    assert imported == 6
+    users = await module.migrate_users({"USERS": [2, 3], "ADMINS": [1, "bad"], "DEVELOPERS": [3]})
+    assert users == 1
+
+    async with session_factory() as session:
+        repo = OrderRepository(session)
+        assert len(await repo.list_ids()) == 7
+        existing = await repo.get_view("legacy-0")
+        duplicate = await repo.get_view("legacy-1")
+        found = await repo.search("Клиент")
+        stats = await repo.stats()
+    assert existing is not None and existing.name == "Existing"
+    assert duplicate is not None and duplicate.name == "Клиент 1"
+    assert duplicate.created_at == datetime(2023, 5, 1, 10, 0)
+    assert found.total == 6
+    assert stats.total == 7
+    assert stats.by_source == {"legacy_json": 6, "web": 1}
+    assert await UserService(session_factory).users_by_role() == {"developer": [2, 3], "admin": [1], "user": []}
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_failed_bulk_import_keeps_triggers(monkeypatch, tmp_path) -> None:
+    module = load_migration_module()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'import.db'}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(module, "SessionFactory", session_factory)
+
+    insert_many = OrderRepository.insert_many
+    calls = 0
+
+    async def failing_insert_many(self, rows):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("disk full")
+        await insert_many(self, rows)
+
+    monkeypatch.setattr(OrderRepository, "insert_many", failing_insert_many)
+    rows = [{"id": f"legacy-{index}", "name": f"Клиент {index}"} for index in range(5)]
+    with pytest.raises(RuntimeError):
+        await module.migrate_orders(rows, batch_size=2)
+
+    async with engine.connect() as conn:
+        triggers = set((await conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))).scalars())
+        assert set(BULK_INSERT_TRIGGERS) <= triggers
+        assert (await conn.execute(text("SELECT count(*) FROM orders"))).scalar() == 0
+
+    # The restored triggers still index orders written later.
+    async with session_factory() as session:
+        await OrderRepository(session).create(
+            Order(
+                id="after-failure",
+                name="Новый клиент",
+                telephone="+79991234567",
+                email="-",
+                subject="-",
+                message="-",
+                status="new",
+                source="web",
+            )
+        )
+    async with engine.connect() as conn:
+        assert (await conn.execute(text("SELECT count(*) FROM orders_fts"))).scalar() == 1
+        assert (await conn.execute(text("SELECT count FROM order_stats WHERE dimension = 'total'"))).scalar() == 1
+    await engine.dispose()
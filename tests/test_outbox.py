@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models import OutboxEntry
+from app.db.repositories import OutboxRepository
+from app.schemas.feedback import FeedbackPayload
+from app.services.orders import OrderService
+from app.services.outbox import NotificationOutbox
+
+
+class FakeNotificationService:
+    is_configured = True
+
+    def __init__(self, failures: dict[int, int] | None = None) -> None:
+        self.failures = dict(failures or {})
+        self.sent: list[tuple[str, int]] = []
+
+    async def recipients(self) -> list[int]:
+        return [1, 2]
+
+    async def send_order(self, order, recipients: list[int]) -> list[int]:
+        failed: list[int] = []
+        for chat_id in recipients:
+            if self.failures.get(chat_id, 0) > 0:
+                self.failures[chat_id] -= 1
+                failed.append(chat_id)
+                continue
+            self.sent.append((order.id, chat_id))
+        return failed
+
+
+def _payload() -> FeedbackPayload:
+    return FeedbackPayload(name="Ivan", telephone="+79991234567", email="-", subject="-", message="-")
+
+
+async def _setup(tmp_path, name: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, session_factory
+
+
+@pytest.mark.asyncio
+async def test_create_from_feedback_enqueues_outbox_entry(tmp_path) -> None:
+    engine, session_factory = await _setup(tmp_path, "outbox_enqueue.db")
+
+    order = await OrderService(session_factory).create_from_feedback(_payload(), enqueue_notification=True)
+
+    async with session_factory() as session:
+        entries = await OutboxRepository(session).list_due(datetime.now(), limit=10)
+    assert [entry.order_id for entry in entries] == [order.id]
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_deliver_retries_only_failed_recipients(tmp_path) -> None:
+    engine, session_factory = await _setup(tmp_path, "outbox_retry.db")
+    order = await OrderService(session_factory).create_from_feedback(_payload(), enqueue_notification=True)
+    notifications = FakeNotificationService(failures={2: 1})
+    outbox = NotificationOutbox(session_factory, notifications, base_delay=0.0)
+
+    assert await outbox.deliver(1) == "pending"
+    assert await outbox.deliver(1) == "sent"
+
+    assert notifications.sent == [(order.id, 1), (order.id, 2)]
+    async with session_factory() as session:
+        entry = await session.get(OutboxEntry, 1)
+        assert entry is not None
+        assert entry.attempts == 2
+        assert entry.pending_recipients is None
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_deliver_gives_up_after_max_attempts(tmp_path) -> None:
+    engine, session_factory = await _setup(tmp_path, "outbox_failed.db")
+    await OrderService(session_factory).create_from_feedback(_payload(), enqueue_notification=True)
+    outbox = NotificationOutbox(
+        session_factory,
+        FakeNotificationService(failures={1: 10}),
+        max_attempts=2,
+        base_delay=0.0,
+    )
+
+    assert await outbox.deliver(1) == "pending"
+    assert await outbox.deliver(1) == "failed"
+    assert await outbox.deliver(1) is None
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_workers_drain_outbox_in_background(tmp_path) -> None:
+    engine, session_factory = await _setup(tmp_path, "outbox_workers.db")
+    service = OrderService(session_factory)
+    notifications = FakeNotificationService()
+    reads = 0
+
+    def read_session_factory():
+        nonlocal reads
+        reads += 1
+        return session_factory()
+
+    outbox = NotificationOutbox(
+        session_factory,
+        notifications,
+        read_session_factory=read_session_factory,
+        workers=3,
+        poll_interval=0.05,
+    )
+
+    await outbox.start()
+    try:
+        for _ in range(5):
+            await service.create_from_feedback(_payload(), enqueue_notification=True)
+            outbox.wake()
+        for _ in range(100):
+            if len(notifications.sent) == 10:
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        await outbox.stop()
+
+    assert len(notifications.sent) == 10
+    # One poll at start plus one lookup per delivered entry, at least.
+    assert reads >= 6
+    async with session_factory() as session:
+        assert await OutboxRepository(session).count_pending() == 0
+
+    await engine.dispose()
+
+
+class SlowNotificationService(FakeNotificationService):
+    def __init__(self) -> None:
+        super().__init__()
+        self.started = asyncio.Event()
+
+    async def send_order(self, order, recipients: list[int]) -> list[int]:
+        self.started.set()
+        await asyncio.sleep(0.1)
+        return await super().send_order(order, recipients)
+
+
+@pytest.mark.asyncio
+async def test_stop_lets_in_flight_delivery_finish(tmp_path) -> None:
+    engine, session_factory = await _setup(tmp_path, "outbox_stop.db")
+    await OrderService(session_factory).create_from_feedback(_payload(), enqueue_notification=True)
+    notifications = SlowNotificationService()
+    outbox = NotificationOutbox(session_factory, notifications, workers=2, poll_interval=0.05)
+
+    await outbox.start()
+    await asyncio.wait_for(notifications.started.wait(), timeout=5)
+    await outbox.stop()
+
+    assert not outbox.running
+    assert len(notifications.sent) == 2
+    async with session_factory() as session:
+        assert await OutboxRepository(session).count_pending() == 0
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_entry_is_claimed_by_one_worker_only(tmp_path) -> None:
+    engine, session_factory = await _setup(tmp_path, "outbox_claim.db")
+    order = await OrderService(session_factory).create_from_feedback(_payload(), enqueue_notification=True)
+    notifications = SlowNotificationService()
+    # Two dispatchers stand in for two web worker processes sharing the database.
+    first = NotificationOutbox(session_factory, notifications)
+    second = NotificationOutbox(session_factory, notifications)
+
+    assert sorted(await asyncio.gather(first.deliver(1), second.deliver(1)), key=str) == [None, "sent"]
+    assert notifications.sent == [(order.id, 1), (order.id, 2)]
+
+    # A claim whose lease has run out (the worker died mid-send) is delivered again.
+    await OrderService(session_factory).create_from_feedback(_payload(), enqueue_notification=True)
+    async with session_factory() as session:
+        repo = OutboxRepository(session)
+        assert await repo.claim(2, datetime.now(), datetime(2000, 1, 1)) is not None
+        assert [entry.id for entry in await repo.list_due(datetime.now(), limit=10)] == [2]
+    assert await first.deliver(2) == "sent"
+    assert len(notifications.sent) == 4
+
+    await engine.dispose()
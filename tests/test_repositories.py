@@ -3,11 +3,14 @@ from __future__ import annotations
 from datetime import datetime
 
 import pytest
+from sqlalchemy import event, text
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from app.db.base import Base
 from app.db.models import Order, UserRole
-from app.db.repositories import OrderRepository, UserRepository
+from app.db.repositories import OrderFilter, OrderRepository, UserRepository
+from app.schemas.order import OrderView
 
 
 @pytest.mark.asyncio
@@ -73,3 +76,303 @@ async def test_user_repository_upsert_and_delete(tmp_path) -> None:
 
     await engine.dispose()
 
+
+@pytest.mark.asyncio
+async def test_order_repository_keyset_pages(tmp_path) -> None:
+    db_path = tmp_path / "repo_pages.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with session_factory() as session:
+        for index in range(7):
+            # Pairs of orders share a timestamp so the id tie-breaker is exercised.
+            created_at = datetime(2024, 1, 1, 12, index // 2)
+            session.add(
+                Order(
+                    id=f"order-{index}",
+                    name=f"Name {index}",
+                    telephone="+79991234567",
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+            )
+        await session.commit()
+
+        repo = OrderRepository(session)
+        first = await repo.page(3)
+        assert [item.id for item in first.items] == ["order-6", "order-5", "order-4"]
+        assert (first.total, first.has_newer, first.has_older) == (7, False, True)
+
+        second = await repo.page(3, anchor_id=first.items[-1].id)
+        assert [item.id for item in second.items] == ["order-3", "order-2", "order-1"]
+        assert (second.has_newer, second.has_older) == (True, True)
+
+        last = await repo.page(3, anchor_id=second.items[-1].id)
+        assert [item.id for item in last.items] == ["order-0"]
+        assert (last.has_newer, last.has_older) == (True, False)
+
+        back = await repo.page(3, anchor_id=second.items[0].id, direction="newer")
+        assert [item.id for item in back.items] == ["order-6", "order-5", "order-4"]
+        assert (back.has_newer, back.has_older) == (False, True)
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_order_stats_follow_writes(tmp_path) -> None:
+    db_path = tmp_path / "repo_stats.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with session_factory() as session:
+        repo = OrderRepository(session)
+        for index, source in enumerate(("web", "web", "telegram")):
+            await repo.create(
+                Order(
+                    id=f"stats-{index}",
+                    name="Name",
+                    telephone="+79991234567",
+                    status="new",
+                    source=source,
+                    created_at=datetime.now(),
+                    updated_at=datetime.now(),
+                )
+            )
+        await repo.update_status("stats-0", "done")
+        await repo.delete("stats-2")
+
+        stats = await repo.stats()
+        assert stats.total == 2
+        assert stats.by_status == {"done": 1, "new": 1}
+        assert stats.by_source == {"web": 2}
+        assert await repo.count() == 2
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_filtered_order_listings_use_composite_indexes(tmp_path) -> None:
+    db_path = tmp_path / "repo_plans.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    cases = {
+        "ix_orders_created_at_id": (OrderFilter(), None),
+        "ix_orders_status_created_at": (OrderFilter(status="new"), (datetime(2024, 1, 1), "anchor")),
+        "ix_orders_source_created_at": (OrderFilter(source="web", since=datetime(2024, 1, 1)), None),
+    }
+    async with session_factory() as session:
+        for index_name, (filters, anchor) in cases.items():
+            stmt = OrderRepository.page_statement(11, anchor=anchor, filters=filters)
+            sql = str(stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+            plan = " ".join(row[-1] for row in await session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+            assert f"USING INDEX {index_name}" in plan
+            assert "TEMP B-TREE" not in plan
+
+        for index in range(4):
+            session.add(
+                Order(
+                    id=f"filter-{index}",
+                    name="Name",
+                    telephone="+79991234567",
+                    status="new" if index % 2 else "done",
+                    source="web",
+                    created_at=datetime(2024, 1, index + 1),
+                    updated_at=datetime(2024, 1, index + 1),
+                )
+            )
+        await session.commit()
+
+        repo = OrderRepository(session)
+        listed = await repo.list_filtered(OrderFilter(status="new", until=datetime(2024, 1, 4)))
+        assert [item.id for item in listed] == ["filter-1"]
+        assert await repo.count(OrderFilter(status="new")) == 2
+        assert await repo.count(OrderFilter(status="new", since=datetime(2024, 1, 3))) == 1
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_order_search_matches_fragments(tmp_path) -> None:
+    db_path = tmp_path / "repo_search.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with session_factory() as session:
+        repo = OrderRepository(session)
+        await repo.create(
+            Order(
+                id="search-1",
+                name="Иван Петров",
+                telephone="+7 (999) 123-45-67",
+                email="ivan@example.com",
+                subject="Ремонт",
+                message="Нужна замена труб",
+                created_at=datetime.now(),
+                updated_at=datetime.now(),
+            )
+        )
+
+        assert [item.id for item in (await repo.search("иван")).items] == ["search-1"]
+        assert (await repo.search("1234567")).total == 1
+        assert (await repo.search("Петров труб")).total == 1
+        assert (await repo.search("Петров сантехник")).total == 0
+        assert (await repo.search("ив")).total == 0
+
+        await repo.delete("search-1")
+        assert (await repo.search("иван")).total == 0
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_order_search_triggers_work_by_rowid(tmp_path) -> None:
+    db_path = tmp_path / "repo_search_rowid.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        plan = (await conn.execute(text("EXPLAIN QUERY PLAN DELETE FROM orders_fts WHERE rowid = 1"))).all()
+        assert plan[-1][-1].endswith("INDEX 0:=")
+
+    async with session_factory() as session:
+        repo = OrderRepository(session)
+        for number in range(3):
+            await repo.create(
+                Order(
+                    id=f"rowid-{number}",
+                    name=f"Клиент {number}",
+                    telephone=f"+7 900 000-00-0{number}",
+                    message="Замена труб",
+                    created_at=datetime.now(),
+                    updated_at=datetime.now(),
+                )
+            )
+
+        await session.execute(text("UPDATE orders SET message = 'Монтаж котла' WHERE id = 'rowid-1'"))
+        await session.commit()
+        assert [item.id for item in (await repo.search("котла")).items] == ["rowid-1"]
+        assert (await repo.search("труб")).total == 2
+
+        await repo.delete("rowid-0")
+        assert [item.id for item in (await repo.search("труб")).items] == ["rowid-2"]
+        assert (await session.execute(text("SELECT count(*) FROM orders_fts"))).scalar() == 2
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_repository_writes_are_single_statements(tmp_path) -> None:
+    db_path = tmp_path / "repo_returning.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    statements: list[str] = []
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement.split()[0].upper())
+
+    async with session_factory() as session:
+        orders = OrderRepository(session)
+        users = UserRepository(session)
+        order = Order(
+            id="one-shot",
+            name="Name",
+            telephone="+79991234567",
+            email="mail@example.com",
+            subject="Subj",
+            message="Body",
+            status="new",
+            source="web",
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+        )
+
+        await orders.create(order)
+        assert statements == ["INSERT"]
+
+        statements.clear()
+        updated = await orders.update_status("one-shot", "done")
+        assert updated is order and order.status == "done"
+        assert statements == ["UPDATE"]
+
+        statements.clear()
+        assert await orders.update_status("missing", "done") is None
+        assert await orders.delete("one-shot") is True
+        assert await orders.delete("one-shot") is False
+        assert statements == ["UPDATE", "DELETE", "DELETE"]
+
+        statements.clear()
+        user = await users.upsert_role(7, UserRole.admin)
+        assert user is not None and user.role == UserRole.admin
+        assert await users.upsert_role(7, UserRole.user, only_upgrade=True) is None
+        user = await users.upsert_role(7, UserRole.developer, only_upgrade=True)
+        assert user is not None and user.role == UserRole.developer
+        user = await users.upsert_role(7, UserRole.user)
+        assert user is not None and user.role == UserRole.user
+        assert statements == ["INSERT"] * 4
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_view_reads_skip_the_identity_map(tmp_path) -> None:
+    db_path = tmp_path / "repo_views.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with session_factory() as session:
+        for index in range(3):
+            session.add(
+                Order(
+                    id=f"view-{index}",
+                    name=f"Name {index}",
+                    telephone="+79991234567",
+                    email="mail@example.com",
+                    subject="Subj",
+                    message="Body",
+                    status="new",
+                    source="web",
+                    created_at=datetime(2024, 1, 1 + index),
+                    updated_at=datetime(2024, 1, 1 + index),
+                )
+            )
+        await UserRepository(session).upsert_role(5, UserRole.admin)
+        await UserRepository(session).upsert_role(6, UserRole.user)
+
+    async with session_factory() as session:
+        orders = OrderRepository(session)
+        users = UserRepository(session)
+
+        view = await orders.get_view("view-1")
+        assert isinstance(view, OrderView)
+        assert (view.name, view.created_at) == ("Name 1", datetime(2024, 1, 2))
+        assert await orders.get_view("missing") is None
+        assert [item.id for item in await orders.list_views(2, newest_first=True)] == ["view-2", "view-1"]
+        assert [item.id for item in await orders.list_views()] == ["view-0", "view-1", "view-2"]
+
+        assert [(item.telegram_id, item.role) for item in await users.list_views()] == [(5, "admin"), (6, "user")]
+        assert [item.telegram_id for item in await users.list_views([UserRole.user])] == [6]
+        assert await users.get_role(5) == UserRole.admin
+        assert len(session.identity_map) == 0
+
+    await engine.dispose()
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import os
+
+from app.web.templates import TemplateRenderer
+
+
+def _write_template(path, text: str, mtime_ns: int) -> None:
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_get_page_reuses_rendered_body(tmp_path) -> None:
+    _write_template(tmp_path / "page.html", "<a href=\"{{ url_for('main') }}\">home</a>", 1_000_000_000)
+    renderer = TemplateRenderer(tmp_path)
+
+    first = renderer.get_page("page.html")
+    second = renderer.get_page("page.html")
+
+    assert first.body == b'<a href="/">home</a>'
+    assert second is first
+
+
+def test_get_page_rerenders_when_template_changes(tmp_path) -> None:
+    template_path = tmp_path / "page.html"
+    _write_template(template_path, "old", 1_000_000_000)
+    renderer = TemplateRenderer(tmp_path)
+    renderer.warm_pages(["page.html"])
+
+    _write_template(template_path, "new", 2_000_000_000)
+
+    assert renderer.get_page("page.html").body == b"new"
+
+
+def test_get_page_without_cache_always_renders(tmp_path) -> None:
+    _write_template(tmp_path / "page.html", "body", 1_000_000_000)
+    renderer = TemplateRenderer(tmp_path, cache_pages=False)
+
+    first = renderer.get_page("page.html")
+    second = renderer.get_page("page.html")
+
+    assert first.body == second.body == b"body"
+    assert second is not first
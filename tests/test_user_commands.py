@@ -35,11 +35,6 @@ class DummyCallback:
         self.answers.append((text, show_alert))
 
 
-class DummyUserService:
-    async def get_role(self, telegram_id: int) -> str:
-        return "admin"
-
-
 @pytest.mark.asyncio
 async def test_resolve_target_accepts_user_id() -> None:
     resolved = await users._resolve_target("123456", DummyMessage())
@@ -70,7 +65,7 @@ def test_main_menu_shows_access_button_for_admin() -> None:
 async def test_users_menu_callback_opens_keyboard() -> None:
     call = DummyCallback()
 
-    await users.cb_users_menu(call, DummyUserService())
+    await users.cb_users_menu(call, "admin")
 
     assert call.answers[-1] == ("", False)
     assert call.message.answers
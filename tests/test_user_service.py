@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import pytest
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from app.db.base import Base
+from app.services.cache import VersionStamp
 from app.services.users import UserService
 
 
@@ -45,3 +47,111 @@ async def test_user_service_lists_notification_recipients(tmp_path) -> None:
     assert recipients == [22, 33]
 
     await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_users_by_role_groups_in_one_query(tmp_path) -> None:
+    db_path = tmp_path / "service_groups.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    service = UserService(session_factory)
+    for telegram_id, role in ((44, "user"), (33, "developer"), (11, "user"), (22, "admin")):
+        await service.upsert_role(telegram_id, role)
+
+    statements: list[str] = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    groups = await service.users_by_role()
+
+    assert groups == {"developer": [33], "admin": [22], "user": [11, 44]}
+    assert len(statements) == 1
+
+    await engine.dispose()
+
+
+class CountingSessionFactory:
+    def __init__(self, session_factory) -> None:
+        self.session_factory = session_factory
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.session_factory()
+
+
+@pytest.mark.asyncio
+async def test_recipients_are_cached_until_roles_change(tmp_path) -> None:
+    db_path = tmp_path / "service_recipients_cache.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = CountingSessionFactory(async_sessionmaker(engine, expire_on_commit=False))
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    stamp_path = tmp_path / "users.stamp"
+    web_service = UserService(session_factory, version_stamp=VersionStamp(stamp_path))
+    bot_service = UserService(session_factory, version_stamp=VersionStamp(stamp_path))
+    await bot_service.upsert_role(22, "admin")
+
+    assert await web_service.list_ids_by_roles(("admin", "developer")) == [22]
+    calls = session_factory.calls
+    assert await web_service.list_ids_by_roles(("developer", "admin")) == [22]
+    assert session_factory.calls == calls
+
+    await bot_service.upsert_role(33, "developer")
+    assert await web_service.list_ids_by_roles(("admin", "developer")) == [22, 33]
+
+    await bot_service.revoke(22)
+    assert await web_service.list_ids_by_roles(("admin", "developer")) == [33]
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_roles_are_cached_with_negative_entries(tmp_path) -> None:
+    db_path = tmp_path / "service_roles_cache.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = CountingSessionFactory(async_sessionmaker(engine, expire_on_commit=False))
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    service = UserService(session_factory, version_stamp=VersionStamp(tmp_path / "users.stamp"))
+    await service.upsert_role(22, "admin")
+
+    calls = session_factory.calls
+    assert await service.get_role(22) == "admin"
+    assert await service.get_role(22) == "admin"
+    assert await service.get_role(99) == "guest"
+    assert await service.get_role(99) == "guest"
+    assert session_factory.calls == calls + 2
+    assert service.cache_stats()["roles"] == {"hits": 2, "misses": 2, "size": 2}
+
+    await service.upsert_role(99, "user")
+    assert await service.get_role(99) == "user"
+    await service.revoke(22)
+    assert await service.get_role(22) == "guest"
+
+    await engine.dispose()
+
+
+def test_ttl_cache_expires_and_evicts(monkeypatch) -> None:
+    from app.services import cache
+
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    lru = cache.TTLCache(maxsize=2, ttl=10.0)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+
+    now[0] += 11
+    assert lru.get("a") is None
+    assert len(lru) == 1
@@ -135,3 +135,64 @@ def test_feedback_requires_personal_data_consent() -> None:
         resp = client.post("/feedback", json=payload)
         assert resp.status_code == 400
         assert resp.json()["status"] == "error"
+
+
+def test_pages_return_not_modified_for_matching_etag() -> None:
+    asyncio.run(init_models())
+    with TestClient(app=app) as client:
+        for path in ["/", "/privacy", "/services/water"]:
+            first = client.get(path)
+            etag = first.headers["etag"]
+            assert first.headers["cache-control"]
+            assert first.headers["last-modified"]
+
+            second = client.get(path, headers={"If-None-Match": etag})
+            assert second.status_code == 304
+            assert second.content == b""
+            assert second.headers["etag"] == etag
+
+
+def test_pages_honour_if_modified_since() -> None:
+    asyncio.run(init_models())
+    with TestClient(app=app) as client:
+        first = client.get("/price1")
+        last_modified = first.headers["last-modified"]
+
+        assert client.get("/price1", headers={"If-Modified-Since": last_modified}).status_code == 304
+        stale = client.get("/price1", headers={"If-None-Match": '"stale"', "If-Modified-Since": last_modified})
+        assert stale.status_code == 200
+
+
+def test_pages_are_compressed_for_gzip_clients() -> None:
+    asyncio.run(init_models())
+    with TestClient(app=app) as client:
+        resp = client.get("/privacy", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.headers["vary"] == "Accept-Encoding"
+        assert "panasenkovs@gmail.com" in resp.text
+
+        plain = client.get("/privacy", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert plain.headers["etag"] != resp.headers["etag"]
+
+
+def test_assets_serve_precompressed_sidecar(tmp_path, monkeypatch) -> None:
+    from app.web import routes_static
+    from app.web.compression import precompress_file
+
+    asset = tmp_path / "site.css"
+    asset.write_text("body { color: red; }\n" * 200, encoding="utf-8")
+    precompress_file(asset)
+    monkeypatch.setattr(routes_static, "STATIC_ROOT", tmp_path.resolve())
+
+    with TestClient(app=app) as client:
+        compressed = client.get("/assets/site.css", headers={"Accept-Encoding": "gzip"})
+        assert compressed.status_code == 200
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.headers["content-type"].startswith("text/css")
+        assert compressed.text == asset.read_text(encoding="utf-8")
+
+        plain = client.get("/assets/site.css", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+
+        assert client.get("/assets/../secret.txt").status_code == 404